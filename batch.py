@@ -0,0 +1,255 @@
+"""
+Пакетное интегрирование: тысячи заданий (expr, a, b, method, n) за один вызов.
+
+Задания с общим выражением, методом и n объединяются в группу: выражение
+компилируется один раз, а узлы всех отрезков группы вычисляются одним
+векторным вызовом (матрица «задание × узел»). Остальные методы считаются
+по одному заданию, но тоже через общий кэш компиляции.
+
+Задание — словарь с ключами expr, a, b, method и (по методу) n, mode,
+samples, seed, rtol, atol; необязательный id возвращается в результате.
+Ошибочное задание (или нечитаемая строка JSONL) даёт результат с полем
+error и не прерывает пакет.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, TextIO, Tuple
+
+from integrators import (
+    _DEFAULT_BLOCK,
+    _RULE_NODES,
+    _as_callable,
+    _eval_nodes,
+    integrate_adaptive,
+    integrate_monte_carlo,
+    integrate_rectangle,
+    integrate_romberg,
+    integrate_simpson,
+    integrate_trapezoidal,
+)
+
+try:  # Без NumPy все задания считаются по одному
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+BATCH_METHODS = ("trapezoid", "simpson", "rect", "mc", "adaptive", "romberg")
+
+# Сколько заданий читать и группировать за раз при потоковой обработке
+DEFAULT_WINDOW = 1024
+
+# Поля CSV, которые нужно привести к числам
+_INT_FIELDS = ("n", "samples", "seed")
+_FLOAT_FIELDS = ("a", "b", "rtol", "atol")
+
+
+@dataclass
+class _BadLine:
+    """Строка JSONL, которую не удалось прочитать как задание."""
+
+    line: int
+    error: str
+
+
+def _normalize(job: Mapping[str, Any]) -> Dict[str, Any]:
+    """Проверяет задание и приводит типы (CSV даёт строки)."""
+    if not isinstance(job, Mapping):
+        raise TypeError(f"Задание должно быть словарём, а не {type(job).__name__}")
+    out = {k: v for k, v in job.items() if v not in (None, "")}
+    for key in ("expr", "a", "b", "method"):
+        if key not in out:
+            raise ValueError(f"В задании нет поля '{key}'")
+    if out["method"] not in BATCH_METHODS:
+        raise ValueError("method должен быть одним из: " + ", ".join(BATCH_METHODS))
+    for key in _INT_FIELDS:
+        if key in out:
+            out[key] = int(out[key])
+    for key in _FLOAT_FIELDS:
+        if key in out:
+            out[key] = float(out[key])
+    if out["method"] in ("trapezoid", "simpson", "rect") and "n" not in out:
+        raise ValueError("Для выбранного метода требуется поле n")
+    if out["method"] == "simpson" and (out["n"] <= 0 or out["n"] % 2):
+        raise ValueError("Для метода Симпсона n должно быть положительным чётным")
+    if out["method"] in ("trapezoid", "rect") and out["n"] <= 0:
+        raise ValueError("n должно быть положительным")
+    if out["method"] == "rect":
+        out.setdefault("mode", "left")
+        if out["mode"] not in {"left", "right", "midpoint"}:
+            raise ValueError("mode должен быть одним из: left, right, midpoint")
+    return out
+
+
+def _group_key(job: Dict[str, Any]) -> Optional[Tuple[str, str, int]]:
+    """Ключ группы для векторного счёта или None, если задание считается отдельно."""
+    if np is None or job["method"] not in ("trapezoid", "simpson", "rect"):
+        return None
+    if job["n"] + 1 > _DEFAULT_BLOCK:
+        # Одно задание уже больше блока — пусть его считает потоковый режим
+        return None
+    if not (math.isfinite(job["a"]) and math.isfinite(job["b"])):
+        # Бесконечный предел — замена переменной в обычном интеграторе
+        return None
+    rule = job["mode"] if job["method"] == "rect" else job["method"]
+    return job["expr"], rule, job["n"]
+
+
+def _grid_values(
+    expr: str, rule: str, n: int, jobs: List[Dict[str, Any]]
+) -> List[float]:
+    """Значения правила rule с n отрезками для всех отрезков группы сразу."""
+    f = _as_callable(expr)
+    first, last, shift = _RULE_NODES[rule]
+    idx = np.arange(first, n + last + 1)
+    weights = np.where(idx % 2 == 1, 4.0, 2.0) if rule == "simpson" else None
+    rows = max(1, _DEFAULT_BLOCK // (n + 1))
+    out: List[float] = []
+    # Неконечные значения не ошибка: такие задания пересчитает _single
+    with np.errstate(all="ignore"):
+        for start in range(0, len(jobs), rows):
+            part = jobs[start : start + rows]
+            a = np.array([job["a"] for job in part])
+            b = np.array([job["b"] for job in part])
+            h = (b - a) / float(n)
+            xs = a[:, None] + (idx + shift) * h[:, None]
+            terms = _eval_nodes(f, xs.ravel()).reshape(xs.shape)
+            if weights is not None:
+                terms = weights * terms
+            s = np.sum(terms, axis=1)
+            if rule == "trapezoid":
+                s = 0.5 * (_eval_nodes(f, a) + _eval_nodes(f, b)) + s
+                values = h * s
+            elif rule == "simpson":
+                s = (_eval_nodes(f, a) + _eval_nodes(f, b)) + s
+                values = (h / 3.0) * s
+            else:
+                values = h * s
+            out.extend(values.tolist())
+    return out
+
+
+def _single(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Результат одного задания обычным интегратором."""
+    expr, a, b, method = job["expr"], job["a"], job["b"], job["method"]
+    if method == "trapezoid":
+        return {"value": integrate_trapezoidal(expr, a, b, job["n"])[0]}
+    if method == "simpson":
+        return {"value": integrate_simpson(expr, a, b, job["n"])[0]}
+    if method == "rect":
+        return {"value": integrate_rectangle(expr, a, b, job["n"], mode=job["mode"])[0]}
+    if method == "mc":
+        res = integrate_monte_carlo(
+            expr, a, b, samples=job.get("samples", 10_000), seed=job.get("seed")
+        )
+        return {"value": res.value, "stderr": res.stderr}
+    tol = {k: job[k] for k in ("rtol", "atol") if k in job}
+    if method == "adaptive":
+        res = integrate_adaptive(expr, a, b, **tol)
+    else:
+        res = integrate_romberg(expr, a, b, **tol)
+    return {"value": res.value, "error_estimate": res.error, "evals": res.evals}
+
+
+def _with_id(
+    index: int, job: Mapping[str, Any], result: Dict[str, Any]
+) -> Dict[str, Any]:
+    return {"id": job.get("id", index), **result}
+
+
+def _run_window(
+    window: List[Tuple[int, Mapping[str, Any]]],
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    groups: Dict[Tuple[str, str, int], List[Tuple[int, Dict[str, Any]]]] = {}
+    singles: List[Tuple[int, Dict[str, Any]]] = []
+    for index, raw in window:
+        if isinstance(raw, _BadLine):
+            yield index, {"id": index, "line": raw.line, "error": raw.error}
+            continue
+        try:
+            job = _normalize(raw)
+        except Exception as exc:
+            ident = raw if isinstance(raw, Mapping) else {}
+            yield index, _with_id(index, ident, {"error": str(exc)})
+            continue
+        key = _group_key(job)
+        if key is None:
+            singles.append((index, job))
+        else:
+            groups.setdefault(key, []).append((index, job))
+
+    for (expr, rule, n), members in groups.items():
+        try:
+            values = _grid_values(expr, rule, n, [job for _, job in members])
+        except Exception as exc:
+            for index, job in members:
+                yield index, _with_id(index, job, {"error": str(exc)})
+            continue
+        for (index, job), value in zip(members, values):
+            if not math.isfinite(value):
+                # Неконечное значение f на конце отрезка: обычный интегратор
+                # сам переходит к замене tanh-sinh
+                singles.append((index, job))
+                continue
+            yield index, _with_id(index, job, {"value": value})
+
+    for index, job in singles:
+        try:
+            result = _single(job)
+        except Exception as exc:
+            result = {"error": str(exc)}
+        yield index, _with_id(index, job, result)
+
+
+def iter_many(
+    jobs: Iterable[Mapping[str, Any]], *, window: int = DEFAULT_WINDOW
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Потоково считает задания: (номер задания, результат) по мере готовности.
+
+    Задания читаются окнами по window штук и группируются внутри окна, так
+    что память не зависит от длины входа. Ошибка в задании не прерывает
+    пакет: результат содержит поле error с сообщением.
+    """
+    if window <= 0:
+        raise ValueError("window должно быть положительным")
+    buffer: List[Tuple[int, Mapping[str, Any]]] = []
+    for index, job in enumerate(jobs):
+        buffer.append((index, job))
+        if len(buffer) >= window:
+            yield from _run_window(buffer)
+            buffer = []
+    if buffer:
+        yield from _run_window(buffer)
+
+
+def integrate_many(
+    jobs: Iterable[Mapping[str, Any]], *, window: int = DEFAULT_WINDOW
+) -> List[Dict[str, Any]]:
+    """Считает все задания; результаты — в порядке заданий."""
+    results = dict(iter_many(jobs, window=window))
+    return [results[i] for i in range(len(results))]
+
+
+def read_jobs(stream: TextIO, fmt: str = "jsonl") -> Iterator[Any]:
+    """Читает задания из JSONL (объект на строку) или CSV с заголовком.
+
+    Строка JSONL с синтаксической ошибкой не прерывает чтение: вместо
+    задания выдаётся запись, которая в результатах станет ошибкой с полем
+    line — номером строки во входе.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    if fmt != "jsonl":
+        raise ValueError("fmt должен быть jsonl или csv")
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield _BadLine(lineno, f"Строка {lineno}: некорректный JSON ({exc})")
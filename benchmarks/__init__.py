@@ -0,0 +1,11 @@
+"""
+Бенчмарки интеграторов: время, вычисления в секунду, пиковая память и
+погрешность относительно точного значения.
+
+Запуск: python -m benchmarks run --out results.json
+Сравнение: python -m benchmarks compare old.json new.json --threshold 0.2
+"""
+
+from benchmarks.suite import compare_results, run_suite
+
+__all__ = ["compare_results", "run_suite"]
@@ -0,0 +1,102 @@
+"""
+CLI бенчмарков.
+
+Примеры:
+  python -m benchmarks run --out results.json
+  python -m benchmarks run --full --methods simpson trapezoid --problems default
+  python -m benchmarks compare baseline.json results.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from benchmarks.suite import (
+    DEFAULT_SIZES,
+    FULL_SIZES,
+    METHODS,
+    PROBLEMS,
+    BenchResult,
+    compare_results,
+    run_suite,
+)
+
+
+def _print_result(result: BenchResult) -> None:
+    peak = f"{result.peak_bytes / 2**20:>9.2f} MiB" if result.peak_bytes else " " * 13
+    print(
+        f"{result.name:<42} {result.seconds:>10.4f} s "
+        f"{result.evals_per_sec:>12.3e} ev/s {peak} err={result.abs_error:.2e}",
+        flush=True,
+    )
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(prog="python -m benchmarks", description="Бенчмарки")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Прогнать матрицу бенчмарков")
+    run.add_argument("--out", help="Записать результаты в JSON")
+    run.add_argument(
+        "--full", action="store_true", help="n от 10^2 до 10^8 (по умолчанию до 10^6)"
+    )
+    run.add_argument("--sizes", type=int, nargs="+", help="Свои значения n")
+    run.add_argument("--methods", nargs="+", choices=sorted(METHODS))
+    run.add_argument("--problems", nargs="+", choices=[p.name for p in PROBLEMS])
+    run.add_argument("--repeat", type=int, default=3, help="Повторов на случай")
+    run.add_argument(
+        "--no-memory", action="store_true", help="Не замерять пиковую память"
+    )
+    run.add_argument(
+        "--no-accumulation",
+        action="store_true",
+        help="Не прогонять режимы сложения (naive, neumaier, pairwise, float32)",
+    )
+
+    cmp = sub.add_parser("compare", help="Сравнить два JSON-отчёта")
+    cmp.add_argument("old")
+    cmp.add_argument("new")
+    cmp.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Допустимое замедление (доля, 0.2 = 20%%)",
+    )
+
+    args = p.parse_args()
+
+    if args.command == "run":
+        sizes = args.sizes or (FULL_SIZES if args.full else DEFAULT_SIZES)
+        report = run_suite(
+            sizes,
+            methods=args.methods,
+            problems=args.problems,
+            repeat=args.repeat,
+            memory=not args.no_memory,
+            accumulation=not args.no_accumulation,
+            progress=_print_result,
+        )
+        if args.out:
+            with open(args.out, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=2)
+        return
+
+    with open(args.old, encoding="utf-8") as fh:
+        old = json.load(fh)
+    with open(args.new, encoding="utf-8") as fh:
+        new = json.load(fh)
+    regressions = compare_results(old, new, args.threshold)
+    for reg in regressions:
+        print(
+            f"REGRESSION {reg['name']}: {reg['old_seconds']:.4f} s -> "
+            f"{reg['new_seconds']:.4f} s (x{reg['ratio']:.2f})"
+        )
+    if regressions:
+        sys.exit(1)
+    print("No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Матрица бенчмарков: метод × выражение × n × вид подынтегральной функции.
+
+Каждый случай сначала замеряется по времени (лучшее из repeat запусков),
+затем отдельно запускается под tracemalloc для пиковой памяти — чтобы
+трассировка выделений не искажала время.
+"""
+
+from __future__ import annotations
+
+import math
+import platform
+import time
+import timeit
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from integrators import (
+    _ALLOWED_NAMES,
+    DEFAULT_EXPR,
+    compile_expr,
+    integrate_monte_carlo,
+    integrate_rectangle,
+    integrate_simpson,
+    integrate_trapezoidal,
+    np,
+    safe_eval_expr,
+)
+
+
+@dataclass(frozen=True)
+class Problem:
+    name: str
+    expr: str
+    func: Callable[[float], float]
+    a: float
+    b: float
+    exact: float
+    # Особенность на концах: годятся только методы без узлов в концах
+    singular: bool = False
+
+
+PROBLEMS = (
+    Problem(
+        "poly",
+        "x**2 + 3*x + 1",
+        lambda x: x**2 + 3 * x + 1,
+        0.0,
+        1.0,
+        1.0 / 3.0 + 1.5 + 1.0,
+    ),
+    Problem(
+        "default",
+        DEFAULT_EXPR,
+        lambda x: math.exp(x) / (1 + math.exp(2 * x)),
+        0.0,
+        1.0,
+        math.atan(math.e) - math.pi / 4,
+    ),
+    Problem(
+        "oscillatory",
+        "sin(50*x)*exp(-x)",
+        lambda x: math.sin(50 * x) * math.exp(-x),
+        0.0,
+        1.0,
+        (50 - math.exp(-1.0) * (math.sin(50.0) + 50 * math.cos(50.0))) / 2501,
+    ),
+    Problem(
+        "singular",
+        "1/sqrt(x)",
+        lambda x: 1 / math.sqrt(x),
+        0.0,
+        1.0,
+        2.0,
+        singular=True,
+    ),
+)
+
+# Методы: имя → (вызов (f, problem, n) → значение, годится ли для особенностей)
+# Вызов принимает и режим сложения (ACCUMULATION_MODES) как **kw
+METHODS: Dict[str, Any] = {
+    "trapezoid": (
+        lambda f, p, n, **kw: integrate_trapezoidal(f, p.a, p.b, n, **kw)[0],
+        False,
+    ),
+    "simpson": (
+        lambda f, p, n, **kw: integrate_simpson(f, p.a, p.b, n, **kw)[0],
+        False,
+    ),
+    "rect-left": (
+        lambda f, p, n, **kw: integrate_rectangle(f, p.a, p.b, n, mode="left", **kw)[0],
+        False,
+    ),
+    "rect-right": (
+        lambda f, p, n, **kw: integrate_rectangle(f, p.a, p.b, n, mode="right", **kw)[
+            0
+        ],
+        False,
+    ),
+    "rect-midpoint": (
+        lambda f, p, n, **kw: integrate_rectangle(
+            f, p.a, p.b, n, mode="midpoint", **kw
+        )[0],
+        True,
+    ),
+    "mc": (
+        lambda f, p, n, **kw: integrate_monte_carlo(
+            f, p.a, p.b, samples=n, seed=0, **kw
+        ).value,
+        True,
+    ),
+}
+
+# Режимы сложения и точности: для строковых выражений каждый случай
+# повторяется с ними (имя метода — "simpson[neumaier]"), чтобы сравнить
+# время и погрешность с обычным прогоном
+ACCUMULATION_MODES: Dict[str, Dict[str, str]] = {
+    "naive": {"accumulator": "naive"},
+    "neumaier": {"accumulator": "neumaier"},
+    "pairwise": {"accumulator": "pairwise"},
+}
+if np is not None:
+    ACCUMULATION_MODES["float32"] = {"precision": "float32"}
+
+DEFAULT_SIZES = (10**2, 10**4, 10**6)
+FULL_SIZES = (10**2, 10**3, 10**4, 10**5, 10**6, 10**7, 10**8)
+
+# Выше этого n поточечные callable-функции не замеряются (минуты на случай)
+CALLABLE_MAX_N = 10**6
+
+
+@dataclass
+class BenchResult:
+    name: str
+    method: str
+    problem: str
+    kind: str
+    n: int
+    seconds: float
+    evals_per_sec: float
+    peak_bytes: Optional[int]
+    abs_error: float
+
+
+def _measure(
+    run: Callable[[], float], repeat: int, memory: bool
+) -> tuple[float, float, Optional[int]]:
+    """(лучшее время, значение, пиковая память или None)."""
+    best = math.inf
+    value = math.nan
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = run()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, value, peak
+
+
+def iter_cases(
+    sizes: Sequence[int],
+    methods: Optional[Sequence[str]] = None,
+    problems: Optional[Sequence[str]] = None,
+) -> Iterator[tuple[str, Problem, str, int]]:
+    """(метод, задача, вид функции, n) для всех применимых сочетаний."""
+    for method, (_, singular_ok) in METHODS.items():
+        if methods and method not in methods:
+            continue
+        for problem in PROBLEMS:
+            if problems and problem.name not in problems:
+                continue
+            if problem.singular and not singular_ok:
+                continue
+            for kind in ("str", "callable"):
+                for n in sizes:
+                    if kind == "callable" and n > CALLABLE_MAX_N:
+                        continue
+                    yield method, problem, kind, n
+
+
+def _eval_cases(expr: str) -> Dict[str, Callable[[], float]]:
+    """Способы вычислить выражение в одной точке: имя → вызов."""
+    compiled = compile_expr(expr)
+    # Неоптимизированное дерево через eval — точка отсчёта для eval-optimized
+    code = compile(compiled.tree, filename="<expr>", mode="eval")
+    scope = {"__builtins__": {}, **_ALLOWED_NAMES}
+
+    def plain() -> float:
+        env = {"x": 0.5, "y": 0.0, "z": 0.0}
+        return float(eval(code, scope, env))
+
+    return {
+        "safe_eval_expr": lambda: safe_eval_expr(expr, x=0.5),
+        "eval-plain": plain,
+        "eval-optimized": lambda: compiled(0.5),
+    }
+
+
+def _plain_value(expr: str) -> float:
+    """Значение неоптимизированного дерева в x = 0.5 (эталон для eval-*)."""
+    return _eval_cases(expr)["eval-plain"]()
+
+
+def run_suite(
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    *,
+    methods: Optional[Sequence[str]] = None,
+    problems: Optional[Sequence[str]] = None,
+    repeat: int = 3,
+    memory: bool = True,
+    accumulation: bool = True,
+    progress: Optional[Callable[[BenchResult], None]] = None,
+) -> Dict[str, Any]:
+    """Прогоняет матрицу и возвращает JSON-совместимый отчёт.
+
+    accumulation добавляет к строковым случаям прогоны с режимами
+    ACCUMULATION_MODES.
+    """
+    results: List[Dict[str, Any]] = []
+    for method, problem, kind, n in iter_cases(sizes, methods, problems):
+        call = METHODS[method][0]
+        f = problem.expr if kind == "str" else problem.func
+        # Значение n для Симпсона должно быть чётным
+        steps = n + n % 2 if method == "simpson" else n
+        modes: Dict[str, Dict[str, str]] = {"": {}}
+        if accumulation and kind == "str":
+            modes.update((f"[{mode}]", kw) for mode, kw in ACCUMULATION_MODES.items())
+        for suffix, kw in modes.items():
+            seconds, value, peak = _measure(
+                lambda: call(f, problem, steps, **kw), repeat, memory
+            )
+            result = BenchResult(
+                name=f"{method}{suffix}/{problem.name}/{kind}/n={steps}",
+                method=method + suffix,
+                problem=problem.name,
+                kind=kind,
+                n=steps,
+                seconds=seconds,
+                evals_per_sec=(steps + 1) / seconds if seconds > 0 else math.inf,
+                peak_bytes=peak,
+                abs_error=abs(value - problem.exact),
+            )
+            results.append(asdict(result))
+            if progress is not None:
+                progress(result)
+
+    # Стоимость одного вычисления выражения (разбор берётся из кэша):
+    # eval-plain — проверенное дерево как есть (как до оптимизатора),
+    # eval-optimized — сгенерированная функция CompiledExpr
+    for problem in PROBLEMS:
+        if problems and problem.name not in problems:
+            continue
+        number = 20_000
+        for method, run in _eval_cases(problem.expr).items():
+            seconds = min(timeit.repeat(run, number=number, repeat=repeat))
+            result = BenchResult(
+                name=f"{method}/{problem.name}",
+                method=method,
+                problem=problem.name,
+                kind="str",
+                n=number,
+                seconds=seconds,
+                evals_per_sec=number / seconds,
+                peak_bytes=None,
+                abs_error=abs(run() - _plain_value(problem.expr)),
+            )
+            results.append(asdict(result))
+            if progress is not None:
+                progress(result)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__ if np is not None else None,
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(
+    old: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.2
+) -> List[Dict[str, Any]]:
+    """Случаи, которые в new медленнее, чем в old, более чем на threshold (доля)."""
+    before = {r["name"]: r for r in old["results"]}
+    regressions = []
+    for result in new["results"]:
+        prev = before.get(result["name"])
+        if prev is None or prev["seconds"] <= 0:
+            continue
+        ratio = result["seconds"] / prev["seconds"]
+        if ratio > 1.0 + threshold:
+            regressions.append(
+                {
+                    "name": result["name"],
+                    "old_seconds": prev["seconds"],
+                    "new_seconds": result["seconds"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
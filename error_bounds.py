@@ -0,0 +1,213 @@
+"""
+Выбор n для правил с фиксированным шагом по классическим оценкам ошибки.
+
+    трапеции        (b − a)·h²/12·max|f''|
+    средние         (b − a)·h²/24·max|f''|
+    левые, правые   (b − a)·h/2·max|f'|
+    Симпсон         (b − a)·h⁴/180·max|f⁽⁴⁾|
+
+choose_n находит наименьшее n, при котором оценка не больше tol (для
+Симпсона — чётное). Максимум производной ищется по равномерной сетке:
+производная берётся символьно (integrand_utils.derivative_function,
+вычисляется через to_numeric), а если это невозможно (нет SymPy, f —
+функция Python, замена переменной) — конечными разностями на грубой
+сетке. Это оценка, а не строгая граница: между узлами сетки производная
+может быть больше.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from integrators import (
+    _RULE_ENDPOINTS,
+    FuncOrExpr,
+    Number,
+    _eval_nodes,
+    _prepare_interval,
+    np,
+)
+from transforms import MappedIntegrand
+
+# Правило → (порядок производной и степень h, коэффициент оценки)
+RULE_BOUNDS = {
+    "trapezoid": (2, 1.0 / 12.0),
+    "midpoint": (2, 1.0 / 24.0),
+    "left": (1, 0.5),
+    "right": (1, 0.5),
+    "simpson": (4, 1.0 / 180.0),
+}
+
+# Отрезков сетки для поиска максимума символьной производной
+_GRID = 1024
+
+# Отрезков сетки для конечных разностей (шаг крупнее — меньше шум округления)
+_DIFF_GRID = 256
+
+# Больше узлов не предлагается: tol недостижима за разумное время
+_MAX_N = 10**12
+
+# Бюджет SymPy на производную, секунд (потом — конечные разности)
+_SYMBOLIC_TIMEOUT = 2.0
+
+# Сколько последних выборов n для строковых выражений помнить
+_CHOICE_CACHE_SIZE = 64
+
+
+@dataclass
+class StepChoice:
+    n: int
+    bound: float
+    derivative_max: float
+    order: int
+    source: str  # symbolic | finite-difference
+    # (f, lo, hi, known) из _prepare_interval: интегратор с n="auto" берёт
+    # готовый отрезок и не повторяет подготовку
+    prepared: Any = field(default=None, repr=False, compare=False)
+
+
+def _grid(lo: float, hi: float, m: int) -> Any:
+    if np is not None:
+        return np.linspace(lo, hi, m + 1)
+    return [lo + (hi - lo) * i / m for i in range(m + 1)]
+
+
+def _values(f: Callable[[float], float], xs: Any) -> List[float]:
+    """Значения f в узлах; ошибки math дают nan."""
+    if np is not None:
+        with np.errstate(all="ignore"):
+            try:
+                return _eval_nodes(f, xs).tolist()
+            except (ArithmeticError, ValueError):
+                pass
+    out = []
+    for x in xs:
+        try:
+            out.append(float(f(float(x))))
+        except (ArithmeticError, ValueError):
+            out.append(math.nan)
+    return out
+
+
+def _max_abs(values: List[float]) -> float:
+    """max|v|; inf, если среди значений есть неконечные."""
+    out = 0.0
+    for v in values:
+        if not math.isfinite(v):
+            return math.inf
+        out = max(out, abs(v))
+    return out
+
+
+def _symbolic_max(expr: str, order: int, lo: float, hi: float) -> Optional[float]:
+    """max|f⁽ᵒʳᵈᵉʳ⁾| по сетке через SymPy или None, если посчитать не удалось."""
+    try:
+        from integrand_utils import symbolic_derivative, to_numeric
+
+        d = symbolic_derivative(expr, order, timeout=_SYMBOLIC_TIMEOUT)
+        if d is None:
+            return None
+        values = _values(to_numeric(d), _grid(lo, hi, _GRID))
+    except Exception:
+        # Нет SymPy, в производной остались свободные символы или она не
+        # вычисляется численно — будут конечные разности
+        return None
+    return _max_abs(values)
+
+
+def _difference_max(
+    f: Callable[[float], float], order: int, lo: float, hi: float
+) -> float:
+    """max|f⁽ᵒʳᵈᵉʳ⁾| по конечным разностям порядка order на грубой сетке."""
+    step = (hi - lo) / _DIFF_GRID
+    ys = _values(f, _grid(lo, hi, _DIFF_GRID))
+    for _ in range(order):
+        ys = [right - left for left, right in zip(ys, ys[1:])]
+    return _max_abs(ys) / abs(step) ** order
+
+
+def error_bound(rule: str, length: float, derivative_max: float, n: int) -> float:
+    """Классическая оценка ошибки правила rule с n отрезками на отрезке длины length."""
+    order, coef = RULE_BOUNDS[rule]
+    return coef * derivative_max * length ** (order + 1) / float(n) ** order
+
+
+def choose_n(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    rule: str = "simpson",
+    tol: float = 1e-8,
+    *,
+    transform: Optional[str] = None,
+) -> StepChoice:
+    """Наименьшее n, при котором оценка ошибки правила rule не больше tol.
+
+    rule: trapezoid | simpson | left | right | midpoint. Отрезок
+    подготавливается так же, как в integrate_* (бесконечные пределы и
+    особенности на концах — через замену переменной transform), и оценка
+    относится к правилу по t после замены. Для строки выражения выбор
+    запоминается: integrate_* с n="auto" после такого вызова (как в CLI)
+    не ищет производную и не готовит отрезок заново.
+    """
+    if rule not in RULE_BOUNDS:
+        raise ValueError("rule должен быть одним из: " + ", ".join(RULE_BOUNDS))
+    if not tol > 0:
+        raise ValueError("tol должно быть положительным")
+    if isinstance(func_or_expr, str):
+        return _choose_expr(func_or_expr, float(a), float(b), rule, tol, transform)
+    return _choose(func_or_expr, a, b, rule, tol, transform)
+
+
+def _choose(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    rule: str,
+    tol: float,
+    transform: Optional[str],
+) -> StepChoice:
+    prepared = _prepare_interval(func_or_expr, a, b, transform, _RULE_ENDPOINTS[rule])
+    f, lo, hi, _ = prepared
+    order, _ = RULE_BOUNDS[rule]
+    step_n = 2 if rule == "simpson" else 1
+    length = abs(hi - lo)
+    if length == 0:
+        return StepChoice(step_n, 0.0, 0.0, order, "symbolic", prepared)
+
+    m: Optional[float] = None
+    source = "symbolic"
+    if isinstance(func_or_expr, str) and not isinstance(f, MappedIntegrand):
+        m = _symbolic_max(func_or_expr, order, min(lo, hi), max(lo, hi))
+    if m is None:
+        m = _difference_max(f, order, lo, hi)
+        source = "finite-difference"
+    if not math.isfinite(m):
+        raise ValueError(
+            f"Производная порядка {order} не ограничена на отрезке: "
+            "оценка ошибки неприменима (используйте transform= или adaptive)"
+        )
+
+    n = _smallest_n(rule, length, m, tol, step_n)
+    return StepChoice(n, error_bound(rule, length, m, n), m, order, source, prepared)
+
+
+_choose_expr = functools.lru_cache(maxsize=_CHOICE_CACHE_SIZE)(_choose)
+
+
+def _smallest_n(rule: str, length: float, m: float, tol: float, step_n: int) -> int:
+    order, coef = RULE_BOUNDS[rule]
+    estimate = (coef * m * length ** (order + 1) / tol) ** (1.0 / order)
+    if estimate > _MAX_N:
+        raise ValueError(f"Для tol={tol:g} нужно больше {_MAX_N} отрезков")
+    n = max(step_n, math.ceil(estimate))
+    n += -n % step_n
+    # Поправка на округление в степени 1/order
+    while n > step_n and error_bound(rule, length, m, n - step_n) <= tol:
+        n -= step_n
+    while error_bound(rule, length, m, n) > tol:
+        n += step_n
+    return n
@@ -0,0 +1,321 @@
+"""
+Оптимизация проверенного AST выражения и генерация специализированного кода.
+
+optimize() — проходы над деревом (исходное не меняется):
+  * свёртка констант: pi, e и поддеревья из одних чисел (2*pi, sqrt(2))
+    вычисляются один раз при компиляции;
+  * степени: x**2 → x*x, x**3, x**4 — умножениями, x**0.5 → sqrt(x),
+    x**-1 → 1.0/x, e**u → exp(u);
+  * exp(2·u) → exp(u)·exp(u), если exp(u) в выражении уже есть;
+  * общие подвыражения: повторяющиеся поддеревья (exp(x) в
+    exp(x)/(1+exp(x))) вычисляются один раз во временную переменную.
+
+generate() собирает из дерева функцию f(x, y=0.0, z=0.0), в которой
+разрешённые функции — локальные имена (аргументы по умолчанию), а не
+поиск в словаре глобальных на каждом вызове. generate_kernel() — цикл
+правила целиком: узел, значение, вес и накопление без вызова функции на
+каждый узел (для счёта без NumPy).
+
+Выражения с x*x вместо x**2 и sqrt вместо **0.5 дают те же значения;
+x**3, x**4, exp(u) вместо e**u и exp(u)·exp(u) вместо exp(2·u) могут
+отличаться в последних знаках.
+Модуль не зависит от integrators: окружение имён передаётся явно.
+"""
+
+from __future__ import annotations
+
+import ast
+import collections
+import copy
+import math
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+_VARIABLES = ("x", "y", "z")
+
+# Показатели, которые заменяются умножениями, и чем
+# (копии поддерева — отдельные узлы, их объединит вынос общих подвыражений)
+_POWERS: Dict[float, Callable[[ast.expr], ast.expr]] = {
+    1: lambda b: b,
+    2: lambda b: _mul(b, _copy(b)),
+    3: lambda b: _mul(_mul(b, _copy(b)), _copy(b)),
+    4: lambda b: _mul(_mul(b, _copy(b)), _mul(_copy(b), _copy(b))),
+    -1: lambda b: _div(ast.Constant(1.0), b),
+    -2: lambda b: _div(ast.Constant(1.0), _mul(b, _copy(b))),
+    0.5: lambda b: _call("sqrt", b),
+}
+
+# Больше этого целый показатель при свёртке не вычисляется (10**10**10)
+_MAX_INT_EXPONENT = 1024
+
+_OPS = {
+    ast.Add: lambda l, r: l + r,
+    ast.Sub: lambda l, r: l - r,
+    ast.Mult: lambda l, r: l * r,
+    ast.Div: lambda l, r: l / r,
+    ast.FloorDiv: lambda l, r: l // r,
+    ast.Mod: lambda l, r: l % r,
+    ast.Pow: lambda l, r: l**r,
+}
+
+
+_copy = copy.deepcopy
+
+
+def _mul(left: ast.expr, right: ast.expr) -> ast.expr:
+    return ast.BinOp(left=left, op=ast.Mult(), right=right)
+
+
+def _div(left: ast.expr, right: ast.expr) -> ast.expr:
+    return ast.BinOp(left=left, op=ast.Div(), right=right)
+
+
+def _call(name: str, arg: ast.expr) -> ast.expr:
+    return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[arg], keywords=[])
+
+
+def _number(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, (int, float))
+        and not isinstance(node.value, bool)
+    )
+
+
+def _constant(value: Any) -> ast.expr | None:
+    """Узел-константа для результата свёртки или None, если сворачивать нельзя."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return ast.Constant(value)
+
+
+class _Fold(ast.NodeTransformer):
+    """Свёртка констант и замена степеней."""
+
+    def __init__(self, names: Dict[str, Any]) -> None:
+        self.names = names
+
+    def visit_Name(self, node: ast.Name) -> ast.expr:  # noqa: N802
+        value = self.names.get(node.id)
+        if node.id not in _VARIABLES and isinstance(value, (int, float)):
+            return ast.Constant(value)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.expr:  # noqa: N802
+        self.generic_visit(node)
+        if _number(node.operand):
+            value = node.operand.value
+            folded = _constant(-value if isinstance(node.op, ast.USub) else +value)
+            if folded is not None:
+                return folded
+        if isinstance(node.op, ast.UAdd):
+            return node.operand
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.expr:  # noqa: N802
+        self.generic_visit(node)
+        left, right = node.left, node.right
+        if _number(left) and _number(right):
+            big_power = (
+                isinstance(node.op, ast.Pow)
+                and isinstance(right.value, int)
+                and abs(right.value) > _MAX_INT_EXPONENT
+            )
+            if not big_power:
+                try:
+                    folded = _constant(_OPS[type(node.op)](left.value, right.value))
+                except (ArithmeticError, ValueError, TypeError):
+                    folded = None
+                if folded is not None:
+                    return folded
+        if isinstance(node.op, ast.Pow):
+            if _number(left) and left.value == math.e and "exp" in self.names:
+                return _call("exp", right)
+            if _number(right) and not _number(left) and right.value in _POWERS:
+                rewrite = _POWERS[right.value]
+                if right.value != 0.5 or "sqrt" in self.names:
+                    return rewrite(left)
+        return node
+
+    def visit_Call(self, node: ast.Call) -> ast.expr:  # noqa: N802
+        self.generic_visit(node)
+        func = self.names.get(node.func.id) if isinstance(node.func, ast.Name) else None
+        if func is not None and not node.keywords and all(map(_number, node.args)):
+            try:
+                folded = _constant(func(*(arg.value for arg in node.args)))
+            except (ArithmeticError, ValueError, TypeError):
+                folded = None
+            if folded is not None:
+                return folded
+        return node
+
+
+class _ShareExp(ast.NodeTransformer):
+    """exp(k·u) → exp(u)·…·exp(u) (k = 2, 3, 4), если exp(u) уже вычисляется.
+
+    Тогда exp(u) выносится как общее подвыражение, и вместо двух вызовов
+    exp остаётся один и умножения (DEFAULT_EXPR: exp(x)/(1+exp(2*x))).
+    """
+
+    def __init__(self, calls: Set[str]) -> None:
+        self.calls = calls
+
+    def visit_Call(self, node: ast.Call) -> ast.expr:  # noqa: N802
+        self.generic_visit(node)
+        arg = node.args[0] if _is_exp(node) else None
+        if not (isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mult)):
+            return node
+        for k, u in ((arg.left, arg.right), (arg.right, arg.left)):
+            if _number(k) and k.value in (2, 3, 4):
+                inner = _call("exp", _copy(u))
+                if ast.dump(inner) in self.calls:
+                    return _POWERS[k.value](inner)
+        return node
+
+
+def _is_exp(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Name)
+        and node.func.id == "exp"
+        and len(node.args) == 1
+        and not node.keywords
+    )
+
+
+class _Hoist(ast.NodeTransformer):
+    """Выносит повторяющиеся поддеревья во временные переменные _t0, _t1, ..."""
+
+    def __init__(self, repeated: Set[str]) -> None:
+        self.repeated = repeated
+        self.temps: Dict[str, str] = {}
+        self.assignments: List[Tuple[str, ast.expr]] = []
+
+    def _compound(self, node: ast.expr) -> ast.expr:
+        key = ast.dump(node)
+        # Сначала дети: внутренние временные определяются раньше внешних
+        node = self.generic_visit(node)
+        if key not in self.repeated:
+            return node
+        if key not in self.temps:
+            name = f"_t{len(self.temps)}"
+            self.temps[key] = name
+            self.assignments.append((name, node))
+        return ast.Name(id=self.temps[key], ctx=ast.Load())
+
+    visit_BinOp = visit_UnaryOp = visit_Call = _compound
+
+
+def _compound_nodes(tree: ast.AST) -> List[ast.expr]:
+    return [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Call))
+    ]
+
+
+class Optimized:
+    """Оптимизированное выражение: присваивания временных и итоговое выражение."""
+
+    __slots__ = ("assignments", "body")
+
+    def __init__(self, assignments: List[Tuple[str, ast.expr]], body: ast.expr):
+        self.assignments = assignments
+        self.body = body
+
+    def names(self) -> Set[str]:
+        """Имена функций и констант окружения, нужные коду."""
+        temps = {name for name, _ in self.assignments}
+        exprs = [value for _, value in self.assignments] + [self.body]
+        return {
+            node.id
+            for expr in exprs
+            for node in ast.walk(expr)
+            if isinstance(node, ast.Name)
+            and node.id not in _VARIABLES
+            and node.id not in temps
+        }
+
+    def statements(self, indent: str) -> List[str]:
+        return [
+            f"{indent}{name} = {ast.unparse(value)}" for name, value in self.assignments
+        ]
+
+    def source(self) -> str:
+        """Текст оптимизированного выражения (для отладки и тестов)."""
+        lines = [f"{name} = {ast.unparse(value)}" for name, value in self.assignments]
+        return "\n".join(lines + [ast.unparse(self.body)])
+
+
+def optimize(tree: ast.Expression, names: Dict[str, Any]) -> Optimized:
+    """Свёртка констант, замена степеней и вынос общих подвыражений.
+
+    names — окружение вычисления (имя → функция или константа); по нему
+    сворачиваются вызовы с числовыми аргументами.
+    """
+    body = _Fold(names).visit(copy.deepcopy(tree)).body
+    exp_calls = {ast.dump(node) for node in ast.walk(body) if _is_exp(node)}
+    if exp_calls:
+        body = _ShareExp(exp_calls).visit(body)
+    counts = collections.Counter(ast.dump(node) for node in _compound_nodes(body))
+    repeated = {key for key, count in counts.items() if count > 1}
+    hoist = _Hoist(repeated)
+    body = hoist.visit(body)
+    return Optimized(hoist.assignments, ast.fix_missing_locations(body))
+
+
+def _build(source: str, name: str, env: Dict[str, Any]) -> Callable[..., Any]:
+    namespace: Dict[str, Any] = {}
+    # Код собран из проверенного дерева: только числа, x, y, z и имена env
+    exec(compile(source, f"<{name}>", "exec"), {"__builtins__": {}, **env}, namespace)
+    return namespace[name]
+
+
+def _signature(
+    params: str, opt: Optimized, env: Dict[str, Any], extra: Tuple[str, ...] = ()
+) -> str:
+    """params и имена окружения как аргументы по умолчанию (локальные имена)."""
+    used = sorted(opt.names() | set(extra))
+    missing = [name for name in used if name not in env]
+    if missing:
+        raise ValueError(f"Имя '{missing[0]}' не разрешено")
+    if not used:
+        return params
+    return params + ", *, " + ", ".join(f"{name}={name}" for name in used)
+
+
+def generate(opt: Optimized, env: Dict[str, Any]) -> Callable[..., Any]:
+    """Функция f(x, y=0.0, z=0.0) с именами env, привязанными как локальные."""
+    lines = [f"def _expr({_signature('x, y=0.0, z=0.0', opt, env)}):"]
+    lines += opt.statements("    ")
+    lines.append(f"    return {ast.unparse(opt.body)}")
+    return _build("\n".join(lines) + "\n", "_expr", env)
+
+
+def generate_kernel(opt: Optimized, env: Dict[str, Any]) -> Callable[..., float]:
+    """Цикл составного правила: kernel(a, h, shift, lo, hi, simpson) → сумма.
+
+    Для i из [lo, hi) узел x = a + (i + shift)·h, значение — float(f(x)),
+    при simpson умноженное на вес 4 (нечётные i) или 2; слагаемые
+    складываются math.fsum. Значение совпадает с поточечным вычислением.
+    """
+    env = {**env, "_fsum": math.fsum, "_float": float, "_range": range}
+    params = "_a, _h, _shift, _lo, _hi, _simpson"
+    signature = _signature(params, opt, env, ("_fsum", "_float", "_range"))
+    lines = [
+        f"def _kernel({signature}):",
+        "    y = 0.0",
+        "    z = 0.0",
+        "    _terms = []",
+        "    _append = _terms.append",
+        "    for _i in _range(_lo, _hi):",
+        "        x = _a + (_i + _shift) * _h",
+        *opt.statements("        "),
+        f"        _v = _float({ast.unparse(opt.body)})",
+        "        if _simpson:",
+        "            _v = (4.0 if _i % 2 == 1 else 2.0) * _v",
+        "        _append(_v)",
+        "    return _fsum(_terms)",
+    ]
+    return _build("\n".join(lines) + "\n", "_kernel", env)
@@ -0,0 +1,174 @@
+"""
+Квадратуры Гаусса: Лежандр, Чебышёв, Лагерр ([a, ∞)) и Эрмит ((-∞, ∞)).
+
+Узлы и веса порядка n вычисляются один раз (Голуб–Уэлш: собственные числа
+матрицы Якоби, для Лежандра — с уточнением Ньютоном) и хранятся в кэше
+процесса; при заданном каталоге кэша они также сохраняются в .npz, так что
+повторные запуски не пересчитывают их. Требуется NumPy.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from integrators import (
+    FuncOrExpr,
+    Number,
+    _as_callable,
+    _eval_nodes,
+    _result_cache,
+)
+
+# Каталог дискового кэша по умолчанию (если не передан cache_dir)
+CACHE_DIR_ENV = "NUMINT_GAUSS_CACHE"
+
+# Вес, при котором правило точно: ∫ W(x) p(x) dx на своей области
+_KINDS = {
+    "legendre": "1 на [-1, 1]",
+    "chebyshev": "1/sqrt(1-x^2) на [-1, 1]",
+    "laguerre": "exp(-x) на [0, ∞)",
+    "hermite": "exp(-x^2) на (-∞, ∞)",
+}
+
+
+def _golub_welsch(
+    diag: np.ndarray, offdiag: np.ndarray, mu0: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Узлы — собственные числа матрицы Якоби, веса — mu0·(первая компонента)²."""
+    jacobi = np.diag(diag) + np.diag(offdiag, 1) + np.diag(offdiag, -1)
+    nodes, vectors = np.linalg.eigh(jacobi)
+    return nodes, mu0 * vectors[0, :] ** 2
+
+
+def _legendre(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    k = np.arange(1, n)
+    x, _ = _golub_welsch(np.zeros(n), k / np.sqrt(4.0 * k * k - 1.0), 2.0)
+    # Уточнение Ньютоном по рекуррентности P_k; веса — по производной P_n
+    for _ in range(3):
+        p_prev, p = np.ones_like(x), x.copy()
+        for j in range(2, n + 1):
+            p_prev, p = p, ((2 * j - 1) * x * p - (j - 1) * p_prev) / j
+        dp = n * (x * p - p_prev) / (x * x - 1.0)
+        x = x - p / dp
+    return x, 2.0 / ((1.0 - x * x) * dp * dp)
+
+
+def _chebyshev(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    k = np.arange(n, 0, -1)
+    return np.cos((2 * k - 1) * math.pi / (2 * n)), np.full(n, math.pi / n)
+
+
+def _laguerre(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    k = np.arange(1, n)
+    return _golub_welsch(2.0 * np.arange(n) + 1.0, k.astype(float), 1.0)
+
+
+def _hermite(n: int) -> Tuple[np.ndarray, np.ndarray]:
+    k = np.arange(1, n)
+    return _golub_welsch(np.zeros(n), np.sqrt(k / 2.0), math.sqrt(math.pi))
+
+
+_BUILDERS = {
+    "legendre": _legendre,
+    "chebyshev": _chebyshev,
+    "laguerre": _laguerre,
+    "hermite": _hermite,
+}
+
+
+@lru_cache(maxsize=128)
+def _cached_rule(
+    kind: str, n: int, cache_dir: Optional[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    path = Path(cache_dir) / f"gauss_{kind}_{n}.npz" if cache_dir else None
+    if path is not None and path.exists():
+        with np.load(path) as data:
+            nodes, weights = data["nodes"], data["weights"]
+    else:
+        nodes, weights = _BUILDERS[kind](n)
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Пишем во временный файл и переименовываем — параллельные
+            # процессы не увидят недописанный кэш
+            tmp = path.with_suffix(f".{os.getpid()}.tmp.npz")
+            np.savez(tmp, nodes=nodes, weights=weights)
+            os.replace(tmp, path)
+    nodes.setflags(write=False)
+    weights.setflags(write=False)
+    return nodes, weights
+
+
+def gauss_nodes(
+    kind: str, n: int, *, cache_dir: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Узлы и веса правила Гаусса порядка n (массивы только для чтения).
+
+    kind: legendre | chebyshev | laguerre | hermite. cache_dir (или
+    переменная окружения NUMINT_GAUSS_CACHE) включает кэш на диске.
+    """
+    if kind not in _KINDS:
+        raise ValueError("kind должен быть одним из: " + ", ".join(_KINDS))
+    if n <= 0:
+        raise ValueError("n должно быть положительным")
+    return _cached_rule(kind, n, cache_dir or os.environ.get(CACHE_DIR_ENV))
+
+
+@_result_cache()
+def integrate_gauss(
+    func_or_expr: FuncOrExpr,
+    a: Number = -1.0,
+    b: Number = 1.0,
+    n: int = 20,
+    *,
+    kind: str = "legendre",
+    panels: int = 1,
+    weighted: bool = False,
+    cache_dir: Optional[str] = None,
+) -> float:
+    """Квадратура Гаусса порядка n.
+
+    legendre и chebyshev — на [a, b], с panels > 1 отрезок делится на равные
+    панели (составное правило); laguerre — на [a, ∞) (b = inf); hermite — на
+    (-∞, ∞). По умолчанию считается обычный интеграл ∫ f(x) dx: весовая
+    функция правила делится из весов. С weighted=True считается
+    ∫ W(x) f(x) dx с весом правила (см. _KINDS) — так точнее, если
+    множитель W(x) естественно входит в подынтегральное выражение.
+    """
+    if panels <= 0:
+        raise ValueError("panels должно быть положительным")
+    f = _as_callable(func_or_expr)
+    t, w = gauss_nodes(kind, n, cache_dir=cache_dir)
+    a = float(a)
+    b = float(b)
+
+    if kind == "laguerre":
+        if not (math.isfinite(a) and b == math.inf):
+            raise ValueError("Для laguerre нужен отрезок [a, inf)")
+        if not weighted:
+            with np.errstate(divide="ignore"):
+                w = np.exp(np.log(w) + t)
+        return float(np.dot(w, _eval_nodes(f, a + t)))
+    if kind == "hermite":
+        if not (a == -math.inf and b == math.inf):
+            raise ValueError("Для hermite нужен отрезок (-inf, inf)")
+        if not weighted:
+            with np.errstate(divide="ignore"):
+                w = np.exp(np.log(w) + t * t)
+        return float(np.dot(w, _eval_nodes(f, t)))
+
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ValueError(f"Для {kind} пределы должны быть конечными")
+    if kind == "chebyshev" and not weighted:
+        w = w * np.sqrt(1.0 - t * t)
+    # Все панели сразу: узлы формы (panels, n) вычисляются одним вызовом
+    half = 0.5 * (b - a) / panels
+    centers = a + half * (2.0 * np.arange(panels) + 1.0)
+    xs = (centers[:, None] + half * t[None, :]).ravel()
+    ys = _eval_nodes(f, xs).reshape(panels, n)
+    return float(half * np.sum(ys @ w))
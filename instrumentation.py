@@ -0,0 +1,218 @@
+"""
+Необязательная инструментовка горячих путей интеграторов.
+
+Пока сбор не включён (ACTIVE is None), интеграторы выполняют только
+проверку этого флага — на уровне вызова или блока узлов, не отдельной
+точки, — поэтому выключенная инструментовка ничего не стоит.
+
+    with collect() as stats:
+        value, _ = integrate_simpson("exp(x)", 0, 1, 10**6)
+    print(stats.evals, stats.phases["evaluate"].wall)
+
+Счётчики: вычисления подынтегральной функции (считаются в основном
+процессе, в том числе для блоков, ушедших в workers), попадания/промахи
+кэша компиляции выражений и кэша результатов; по фазам (compile,
+evaluate, sum, sample, refine, cache, parse, derivative, solve, symbolic)
+— число входов, время по часам и процессорное время этого процесса.
+
+Хуки вызываются с готовым Stats при выходе из collect(): любая функция
+(callback), json_lines_hook и prometheus_hook; profiled() — обёртка cProfile.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, ContextManager, Dict, Iterator, Optional, TextIO
+
+Hook = Callable[["Stats"], None]
+
+
+@dataclass
+class PhaseTime:
+    calls: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+
+
+@dataclass
+class Stats:
+    evals: int = 0
+    compile_hits: int = 0
+    compile_misses: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    phases: Dict[str, PhaseTime] = field(default_factory=dict)
+
+    def add_phase(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        phase = self.phases.setdefault(name, PhaseTime())
+        phase.calls += calls
+        phase.wall += wall
+        phase.cpu += cpu
+
+    def merge(self, other: "Stats") -> None:
+        """Добавляет счётчики other (вложенный collect) к своим."""
+        self.evals += other.evals
+        self.compile_hits += other.compile_hits
+        self.compile_misses += other.compile_misses
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        for name, phase in other.phases.items():
+            self.add_phase(name, phase.wall, phase.cpu, phase.calls)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# Текущий сборщик; None — инструментовка выключена
+ACTIVE: Optional[Stats] = None
+
+_NULL = contextlib.nullcontext()
+
+
+class _Phase:
+    __slots__ = ("stats", "name", "wall", "cpu")
+
+    def __init__(self, stats: Stats, name: str) -> None:
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stats.add_phase(
+            self.name,
+            time.perf_counter() - self.wall,
+            time.process_time() - self.cpu,
+        )
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Замер фазы name; без активного сбора — пустой контекст."""
+    if ACTIVE is None:
+        return _NULL
+    return _Phase(ACTIVE, name)
+
+
+def add_evals(count: int) -> None:
+    if ACTIVE is not None:
+        ACTIVE.evals += count
+
+
+@contextlib.contextmanager
+def collect(*hooks: Hook) -> Iterator[Stats]:
+    """Включает сбор статистики на время блока with; отдаёт объект Stats.
+
+    Полное время блока записывается в фазу total. Вложенный collect ведёт
+    свой Stats и по выходе добавляет его к внешнему.
+    """
+    global ACTIVE
+    outer = ACTIVE
+    stats = Stats()
+    ACTIVE = stats
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield stats
+    finally:
+        stats.add_phase("total", time.perf_counter() - wall, time.process_time() - cpu)
+        ACTIVE = outer
+        if outer is not None:
+            outer.merge(stats)
+        for hook in hooks:
+            hook(stats)
+
+
+def measure(fn: Callable[..., Any], *args: Any, hooks: tuple = (), **kwargs: Any):
+    """Вызывает fn(*args, **kwargs) под collect(); возвращает (результат, Stats)."""
+    with collect(*hooks) as stats:
+        result = fn(*args, **kwargs)
+    return result, stats
+
+
+@contextlib.contextmanager
+def profiled(path: str) -> Iterator[cProfile.Profile]:
+    """Профилирует блок with через cProfile и сохраняет профиль в path.
+
+    Файл читается pstats или snakeviz: python -m pstats out.prof
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def json_lines_hook(stream: TextIO, **labels: Any) -> Hook:
+    """Хук: пишет статистику одной строкой JSON (с метками labels)."""
+
+    def hook(stats: Stats) -> None:
+        stream.write(json.dumps({**labels, **stats.as_dict()}) + "\n")
+        stream.flush()
+
+    return hook
+
+
+def format_prometheus(
+    stats: Stats, prefix: str = "numint", labels: Optional[Dict[str, Any]] = None
+) -> str:
+    """Статистика в текстовом формате Prometheus (exposition format)."""
+
+    def series(name: str, value: float, extra: Optional[Dict[str, Any]] = None) -> str:
+        merged = {**(labels or {}), **(extra or {})}
+        text = ",".join(f'{key}="{val}"' for key, val in sorted(merged.items()))
+        return (
+            f"{prefix}_{name}{{{text}}} {value}" if text else f"{prefix}_{name} {value}"
+        )
+
+    lines = []
+    for name, value in (
+        ("evals_total", stats.evals),
+        ("compile_cache_hits_total", stats.compile_hits),
+        ("compile_cache_misses_total", stats.compile_misses),
+        ("result_cache_hits_total", stats.cache_hits),
+        ("result_cache_misses_total", stats.cache_misses),
+    ):
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        lines.append(series(name, value))
+    for metric, attr, kind in (
+        ("phase_calls_total", "calls", "counter"),
+        ("phase_wall_seconds", "wall", "gauge"),
+        ("phase_cpu_seconds", "cpu", "gauge"),
+    ):
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, phase_time in sorted(stats.phases.items()):
+            lines.append(series(metric, getattr(phase_time, attr), {"phase": name}))
+    return "\n".join(lines) + "\n"
+
+
+def prometheus_hook(stream: TextIO, prefix: str = "numint", **labels: Any) -> Hook:
+    """Хук: пишет статистику в текстовом формате Prometheus."""
+
+    def hook(stats: Stats) -> None:
+        stream.write(format_prometheus(stats, prefix, labels))
+        stream.flush()
+
+    return hook
+
+
+def format_text(stats: Stats) -> str:
+    """Короткая сводка для человека (CLI --stats)."""
+    lines = [
+        f"Evaluations: {stats.evals}",
+        f"Compile cache: hits={stats.compile_hits} misses={stats.compile_misses}",
+        f"Result cache: hits={stats.cache_hits} misses={stats.cache_misses}",
+        f"{'phase':<12} {'calls':>8} {'wall, s':>12} {'cpu, s':>12}",
+    ]
+    for name, phase_time in sorted(stats.phases.items()):
+        lines.append(
+            f"{name:<12} {phase_time.calls:>8d} "
+            f"{phase_time.wall:>12.6f} {phase_time.cpu:>12.6f}"
+        )
+    return "\n".join(lines)
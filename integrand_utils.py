@@ -2,16 +2,31 @@
 Утилиты для безопасного вычисления выражений f(x[,y,z]) и CAS‑операций.
 
 CAS: используется SymPy (производные и решение уравнений/выражений).
+SymPy импортируется при первой CAS‑операции, а не при импорте модуля
+(импорт SymPy занимает около секунды), поэтому evaluate_function и прочие
+числовые утилиты его не требуют. Разбор, производные и решения
+запоминаются по тексту выражения.
 """
 
 from __future__ import annotations
 
-from typing import List, Optional
+import functools
+import math
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
-# CAS (SymPy)
-import sympy as sp
+import instrumentation as _instr
+from integrators import compile_expr, np
 
-from integrators import safe_eval_expr
+# Сколько разобранных выражений и результатов CAS хранится в памяти
+_CAS_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=None)
+def _sympy() -> Any:
+    import sympy
+
+    return sympy
 
 
 def evaluate_function(
@@ -19,7 +34,7 @@ def evaluate_function(
 ) -> Optional[float]:
     """Безопасно вычисляет выражение над x[,y,z]. Возвращает None при ошибке."""
     try:
-        return safe_eval_expr(func_str, x=float(x), y=float(y), z=float(z))
+        return compile_expr(func_str)(x, y, z)
     except Exception:
         return None
 
@@ -34,13 +49,17 @@ def restore_power_operator(expression: str) -> str:  # type: ignore[no-redef]
     return expression.replace("^", "**")
 
 
-def _sympify(expr: str) -> sp.Expr:
-    expr_py = restore_power_operator(expr)
-    # Ограничиваем доступные имена для sympify (без неожиданных функций)
-    syms = {"x": sp.Symbol("x"), "y": sp.Symbol("y"), "z": sp.Symbol("z")}
-    allowed = {
-        **syms,
+@functools.lru_cache(maxsize=None)
+def _allowed() -> dict:
+    """Имена, доступные в sympify (без неожиданных функций)."""
+    sp = _sympy()
+    return {
+        "x": sp.Symbol("x"),
+        "y": sp.Symbol("y"),
+        "z": sp.Symbol("z"),
         "pi": sp.pi,
+        # e — число Эйлера, как в грамматике compile_expr
+        "e": sp.E,
         "E": sp.E,
         "sin": sp.sin,
         "cos": sp.cos,
@@ -56,15 +75,25 @@ def _sympify(expr: str) -> sp.Expr:
         "sqrt": sp.sqrt,
         "cot": sp.cot,
     }
-    return sp.sympify(expr_py, locals=allowed, convert_xor=False)
 
 
+@functools.lru_cache(maxsize=_CAS_CACHE_SIZE)
+def _sympify(expr: str) -> Any:
+    # Выражения SymPy неизменяемы — кэшированный объект можно отдавать всем
+    expr_py = restore_power_operator(expr)
+    with _instr.phase("parse"):
+        return _sympy().sympify(expr_py, locals=_allowed(), convert_xor=False)
+
+
+@functools.lru_cache(maxsize=_CAS_CACHE_SIZE)
 def derivative_function(func_str: str, var: str = "x") -> str:
     """Возвращает строку производной d/dvar func_str (Python‑совместимую)."""
+    sp = _sympy()
     expr = _sympify(func_str)
     sym = sp.Symbol(var)
-    d = sp.diff(expr, sym)
-    return restore_power_operator(str(sp.simplify(d)))
+    with _instr.phase("derivative"):
+        d = sp.diff(expr, sym)
+        return restore_power_operator(str(sp.simplify(d)))
 
 
 def replace_strings(s: str, target: str, repl: str):
@@ -80,19 +109,27 @@ def replace_strings(s: str, target: str, repl: str):
     return res
 
 
+@functools.lru_cache(maxsize=_CAS_CACHE_SIZE)
+def _solve(left: str, right: Optional[str], var: str) -> Tuple[str, ...]:
+    """Решения left == right (right=None — left == 0) относительно var."""
+    sp = _sympy()
+    rhs = 0 if right is None else _sympify(right)
+    eq = sp.Eq(_sympify(left), rhs)
+    sym = sp.Symbol(var)
+    with _instr.phase("solve"):
+        sols = sp.solve(eq, sym, dict=False)
+        return tuple(
+            restore_power_operator(str(sp.simplify(s)))
+            for s in (sols if isinstance(sols, list) else [sols])
+        )
+
+
 def extract_variable(func_str: str, var: str = "y") -> List[str]:
     """Решает уравнение func_str == 0 относительно переменной var.
 
     Возвращает список решений (как строки Python‑совместимых выражений).
     """
-    expr = _sympify(func_str)
-    sym = sp.Symbol(var)
-    sols = sp.solve(sp.Eq(expr, 0), sym, dict=False)
-    out = [
-        restore_power_operator(str(sp.simplify(s)))
-        for s in (sols if isinstance(sols, list) else [sols])
-    ]
-    return out
+    return list(_solve(func_str, None, var))
 
 
 def extract_variable_from_equation(func_str: str, ext: str = "y") -> List[str]:
@@ -102,19 +139,92 @@ def extract_variable_from_equation(func_str: str, ext: str = "y") -> List[str]:
     """
     if "=" in func_str:
         left_str, right_str = func_str.split("=", 1)
-        left = _sympify(left_str)
-        right = _sympify(right_str)
-        eq = sp.Eq(left, right)
-    else:
-        eq = sp.Eq(_sympify(func_str), 0)
-
-    sym = sp.Symbol(ext)
-    sols = sp.solve(eq, sym, dict=False)
-    out = [
-        restore_power_operator(str(sp.simplify(s)))
-        for s in (sols if isinstance(sols, list) else [sols])
-    ]
-    return out
+        return list(_solve(left_str, right_str, ext))
+    return list(_solve(func_str, None, ext))
+
+
+@functools.lru_cache(maxsize=_CAS_CACHE_SIZE)
+def to_numeric(expr: Any, variables: Sequence[str] = ("x",)) -> Callable[..., Any]:
+    """Векторная функция выражения SymPy или строки (sympy.lambdify).
+
+    С NumPy функция принимает массивы узлов, и интеграторы вычисляют её
+    одним вызовом на блок: integrate_simpson(to_numeric(derivative_function(
+    "sin(x)**2")), 0, 1, 100). Без NumPy — поточечная функция на math.
+    variables — имена аргументов по порядку (кортеж, чтобы работал кэш).
+    """
+    sp = _sympy()
+    if isinstance(expr, str):
+        expr = _sympify(expr)
+    symbols = [sp.Symbol(name) for name in variables]
+    return sp.lambdify(symbols, expr, modules="numpy" if np is not None else "math")
+
+
+@functools.lru_cache(maxsize=_CAS_CACHE_SIZE)
+def _definite(func_str: str, a: float, b: float, var: str) -> Optional[float]:
+    sp = _sympy()
+
+    def limit(value: float) -> Any:
+        if math.isinf(value):
+            return sp.oo if value > 0 else -sp.oo
+        # Десятичная запись предела, а не двоичная дробь с огромным знаменателем
+        return sp.nsimplify(value, rational=True)
+
+    try:
+        result = sp.integrate(_sympify(func_str), (sp.Symbol(var), limit(a), limit(b)))
+        if result.has(sp.Integral):
+            return None
+        value = complex(result.evalf(20))
+    except Exception:
+        return None
+    if not (math.isfinite(value.real) and math.isfinite(value.imag)):
+        return None
+    if abs(value.imag) > 1e-12 * max(1.0, abs(value.real)):
+        return None
+    return value.real
+
+
+def symbolic_integral(
+    func_str: str, a: float, b: float, *, var: str = "x", timeout: float = 1.0
+) -> Optional[float]:
+    """Точное значение ∫_a^b func_str d(var) по первообразной SymPy или None.
+
+    None — замкнутой формы нет, ответ не конечное вещественное число или
+    SymPy не уложился в timeout секунд. Счёт идёт в фоновом (daemon) потоке:
+    прервать SymPy нельзя, поэтому по истечении бюджета поток дорабатывает
+    сам, а его результат попадает в кэш и пригодится следующему вызову.
+    """
+    with _instr.phase("symbolic"):
+        return _in_thread(lambda: _definite(func_str, float(a), float(b), var), timeout)
+
+
+def symbolic_derivative(
+    func_str: str, order: int = 1, *, var: str = "x", timeout: float = 1.0
+) -> Optional[str]:
+    """Производная порядка order (строка, как derivative_function) или None.
+
+    None — SymPy не справился или не уложился в timeout секунд (например,
+    упрощение производных abs); поток — как в symbolic_integral.
+    """
+
+    def run() -> Optional[str]:
+        d = func_str
+        try:
+            for _ in range(order):
+                d = derivative_function(d, var)
+        except Exception:
+            return None
+        return d
+
+    return _in_thread(run, timeout)
+
+
+def _in_thread(fn: Callable[[], Any], timeout: float) -> Any:
+    """fn() в фоновом (daemon) потоке; None, если не уложилась в timeout секунд."""
+    box: List[Any] = []
+    worker = threading.Thread(target=lambda: box.append(fn()), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    return box[0] if box else None
 
 
 def split_by_comma(string: str):
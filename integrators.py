@@ -1,10 +1,30 @@
 from __future__ import annotations
 
 import ast
+import contextlib
+import functools
+import hashlib
+import heapq
+import inspect
+import itertools
+import json
 import math
+import pickle
 import random
-from dataclasses import dataclass
-from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:  # NumPy необязателен: без него интеграторы считают поточечно
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore[assignment]
+
+import expr_optimizer
+import instrumentation as _instr
 
 Number = Union[int, float]
 FuncOrExpr = Union[str, Callable[[float], float]]
@@ -38,6 +58,32 @@ _ALLOWED_NAMES: Dict[str, Any] = {
 # Доп. удобная функция
 _ALLOWED_NAMES["cot"] = lambda x: 1.0 / math.tan(x)
 
+# Те же имена для векторного вычисления над массивами NumPy
+_NUMPY_NAMES: Dict[str, Any] = {}
+if np is not None:
+    _NUMPY_NAMES = {
+        "pi": np.pi,
+        "e": np.e,
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "asin": np.arcsin,
+        "acos": np.arccos,
+        "atan": np.arctan,
+        "sinh": np.sinh,
+        "cosh": np.cosh,
+        "tanh": np.tanh,
+        "exp": np.exp,
+        "log": np.log,
+        "log10": np.log10,
+        "sqrt": np.sqrt,
+        "floor": np.floor,
+        "ceil": np.ceil,
+        "fabs": np.fabs,
+        "abs": np.abs,
+        "cot": lambda x: 1.0 / np.tan(x),
+    }
+
 
 class _SafeEval(ast.NodeVisitor):
     """Проверка AST-дерева на безопасность и сбор имён."""
@@ -97,28 +143,284 @@ def _compile_expr(expr: str) -> ast.AST:
     return parsed
 
 
+# Сколько разных выражений держать в кэше компиляции
+_COMPILE_CACHE_SIZE = 256
+
+
+class CompiledExpr:
+    """Выражение f(x[, y, z]), проверенное и скомпилированное один раз.
+
+    Хранит проверенное AST-дерево. Вычисляется же его оптимизированная
+    версия (expr_optimizer: свёртка констант, замена степеней, общие
+    подвыражения), собранная в функцию с разрешёнными именами в локальных
+    переменных, — по одной для math и для массивов NumPy (eval_array).
+    rule_sum — сгенерированный цикл правила целиком для счёта без NumPy.
+    """
+
+    __slots__ = ("expr", "tree", "optimized", "_fn", "_fn_array", "_kernel")
+
+    def __init__(self, expr: str) -> None:
+        self.expr = expr
+        self.tree = _compile_expr(expr)
+        self.optimized = expr_optimizer.optimize(self.tree, _ALLOWED_NAMES)
+        self._fn = expr_optimizer.generate(self.optimized, _ALLOWED_NAMES)
+        self._fn_array = (
+            expr_optimizer.generate(self.optimized, _NUMPY_NAMES)
+            if np is not None
+            else None
+        )
+        self._kernel: Optional[Callable[..., float]] = None
+
+    def __call__(self, x: float, y: float = 0.0, z: float = 0.0) -> float:
+        return float(self._fn(float(x), float(y), float(z)))
+
+    def eval_array(self, x: Any, y: Any = 0.0, z: Any = 0.0) -> "np.ndarray":
+        """Вычисляет выражение сразу для массива узлов через ufunc NumPy."""
+        if np is None:
+            raise RuntimeError("Для векторного вычисления нужен NumPy")
+        out = np.asarray(self._fn_array(x, y, z))
+        if out.dtype != np.float32:
+            # float32 остаётся float32 (precision="float32"), прочее — float64
+            out = out.astype(float, copy=False)
+        shape = np.broadcast(x, y, z).shape
+        # Константы и выражения без x дают скаляр — растягиваем до сетки
+        return np.broadcast_to(out, shape)
+
+    def rule_sum(
+        self, a: float, h: float, shift: float, lo: int, hi: int, simpson: bool
+    ) -> float:
+        """fsum значений в узлах a + (i + shift)·h, i из [lo, hi), одним циклом.
+
+        При simpson значения умножаются на веса 4 (нечётные i) и 2.
+        """
+        if self._kernel is None:
+            self._kernel = expr_optimizer.generate_kernel(
+                self.optimized, _ALLOWED_NAMES
+            )
+        return self._kernel(a, h, shift, lo, hi, simpson)
+
+    def __repr__(self) -> str:
+        return f"CompiledExpr({self.expr!r})"
+
+
+@lru_cache(maxsize=_COMPILE_CACHE_SIZE)
+def compile_expr(expr: str) -> CompiledExpr:
+    """Возвращает скомпилированное выражение из LRU-кэша (ключ — текст).
+
+    Статистика попаданий/промахов: compile_expr.cache_info().
+    """
+    return CompiledExpr(expr)
+
+
+def canonical_expr(expr: str) -> str:
+    """Каноническая форма выражения (дамп проверенного AST) для ключей кэша.
+
+    Не зависит от пробелов, лишних скобок и записи чисел (2.0 и 2.00).
+    """
+    return ast.dump(compile_expr(expr).tree)
+
+
+# Аргументы, не влияющие на значение интеграла, в ключ кэша не входят
+_CACHE_IGNORED = frozenset({"func_or_expr", "verbose", "workers"})
+
+
+def _key_value(value: Any) -> Any:
+    """Нормализует аргумент для ключа: числа — как float, кортежи — как списки."""
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple)):
+        return [_key_value(v) for v in value]
+    return repr(value)
+
+
+def _dataclass_codec(cls: type) -> Tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    """(encode, decode) результата-датакласса для JSON-хранилища кэша."""
+
+    def decode(data: Dict[str, Any]) -> Any:
+        values = {}
+        for fld in fields(cls):
+            value = data[fld.name]
+            # JSON превращает кортежи в списки — восстанавливаем по аннотации
+            if str(fld.type).startswith("Tuple"):
+                value = tuple(value)
+            elif str(fld.type).startswith("List[Tuple"):
+                value = [tuple(item) for item in value]
+            values[fld.name] = value
+        return cls(**values)
+
+    return asdict, decode
+
+
+def _result_cache(
+    encode: Callable[[Any], Any] = lambda result: result,
+    decode: Callable[[Any], Any] = lambda data: data,
+    cacheable: Callable[[Dict[str, Any]], bool] = lambda params: True,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Добавляет функции интегрирования необязательный аргумент cache=.
+
+    cache — объект с методами get(key)/put(key, value) (result_cache.ResultCache).
+    Ключ — хэш имени функции, канонической формы выражения и всех остальных
+    аргументов (со значениями по умолчанию). Кэшируются только строковые
+    выражения без verbose и только если cacheable(аргументы) истинно
+    (например, Монте‑Карло — лишь с заданным seed).
+    """
+
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, cache: Any = None, **kwargs: Any) -> Any:
+            if cache is None:
+                return fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = bound.arguments
+            expr = params["func_or_expr"]
+            if not isinstance(expr, str) or params.get("verbose"):
+                return fn(*args, **kwargs)
+            if not cacheable(params):
+                return fn(*args, **kwargs)
+            key_data = [
+                fn.__name__,
+                canonical_expr(expr),
+                {
+                    name: _key_value(value)
+                    for name, value in params.items()
+                    if name not in _CACHE_IGNORED
+                },
+            ]
+            key = hashlib.sha256(
+                json.dumps(key_data, sort_keys=True).encode("utf-8")
+            ).hexdigest()
+            with _instr.phase("cache"):
+                hit = cache.get(key)
+            if _instr.ACTIVE is not None:
+                if hit is None:
+                    _instr.ACTIVE.cache_misses += 1
+                else:
+                    _instr.ACTIVE.cache_hits += 1
+            if hit is not None:
+                return decode(hit)
+            result = fn(*args, **kwargs)
+            with _instr.phase("cache"):
+                cache.put(key, encode(result))
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# Кэш правил с таблицей шагов хранит только значение (шаги не кэшируются)
+_cache_rule = _result_cache(
+    encode=lambda result: result[0], decode=lambda value: (value, [])
+)
+
+
 def safe_eval_expr(expr: str, *, x: float, y: float = 0.0, z: float = 0.0) -> float:
     """Безопасно вычисляет выражение expr при данных x, y, z.
 
     Пример: safe_eval_expr("exp(x)/(1+exp(2*x))", x=0.5)
     """
-    code = _compile_expr(expr)
-    env = dict(_ALLOWED_NAMES)
-    env.update({"x": float(x), "y": float(y), "z": float(z)})
-    return float(
-        eval(compile(code, filename="<expr>", mode="eval"), {"__builtins__": {}}, env)
-    )
+    return compile_expr(expr)(x, y, z)
 
 
 def _as_callable(func_or_expr: FuncOrExpr) -> Callable[[float], float]:
     if callable(func_or_expr):
         return func_or_expr
     if isinstance(func_or_expr, str):
-        expr = func_or_expr
-        return lambda x: safe_eval_expr(expr, x=float(x))
+        stats = _instr.ACTIVE
+        if stats is None:
+            return compile_expr(func_or_expr)
+        misses = compile_expr.cache_info().misses
+        with _instr.phase("compile"):
+            f = compile_expr(func_or_expr)
+        if compile_expr.cache_info().misses > misses:
+            stats.compile_misses += 1
+        else:
+            stats.compile_hits += 1
+        return f
     raise TypeError("func_or_expr должен быть функцией f(x) или строкой выражения")
 
 
+def _probe(f: Callable[[float], float], x: float) -> Optional[float]:
+    """f(x) или None, если значение неконечно или вычисление упало."""
+    try:
+        y = f(x)
+    except (ArithmeticError, ValueError):
+        return None
+    return y if math.isfinite(y) else None
+
+
+def _endpoint_value(
+    f: Callable[[float], float], known: Dict[float, float], x: float
+) -> float:
+    """f(x) с учётом в счётчике; найденное при проверке концов не пересчитывается."""
+    _instr.add_evals(1)
+    return known[x] if x in known else f(x)
+
+
+def _prepare_interval(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    transform: Optional[str],
+    endpoints: Tuple[bool, bool],
+) -> Tuple[Callable[[float], float], float, float, Dict[float, float]]:
+    """(f, a, b, known) для правила; с заменой переменной — (g, t_lo, t_hi, {}).
+
+    endpoints — вычисляет ли правило f на левом и правом конце. Без
+    transform бесконечный предел включает замену rational, а неконечное
+    значение f (или ошибка math) на вычисляемом конце — tanh-sinh.
+    known — значения f на концах, найденные при этой проверке: правило
+    берёт их через _endpoint_value и не вычисляет f на концах второй раз.
+    """
+    f = _as_callable(func_or_expr)
+    a = float(a)
+    b = float(b)
+    known: Dict[float, float] = {}
+    if transform is None:
+        singular = False
+        for x, used in zip((a, b), endpoints):
+            if used and math.isfinite(x) and x not in known:
+                y = _probe(f, x)
+                if y is None:
+                    singular = True
+                    break
+                known[x] = y
+        if not singular and math.isfinite(a) and math.isfinite(b):
+            return f, a, b, known
+        # Пробные значения не пригодились, но f на них вызывалась
+        _instr.add_evals(len(known) + singular)
+        transform = "tanh-sinh" if singular else "rational"
+    import transforms
+
+    g, lo, hi = transforms.transform_integrand(func_or_expr, a, b, transform)
+    return g, lo, hi, {}
+
+
+def _eval_nodes(
+    f: Callable[[float], float], xs: "np.ndarray", dtype: Any = float
+) -> "np.ndarray":
+    """Значения f в узлах xs одним векторным вызовом, если это возможно.
+
+    Скомпилированные выражения считаются через eval_array. Прочие функции
+    сначала вызываются с массивом целиком; если они не векторизуемы (ошибка
+    или результат другой формы), узлы вычисляются по одному. dtype — тип
+    результата (float32 для precision="float32").
+    """
+    eval_array = getattr(f, "eval_array", None)
+    try:
+        ys = np.asarray(eval_array(xs) if eval_array else f(xs), dtype=dtype)
+    except Exception:
+        ys = None
+    if ys is None or ys.shape != xs.shape:
+        ys = np.fromiter((f(float(x)) for x in xs), dtype=dtype, count=len(xs))
+    return ys
+
+
 @dataclass
 class Step:
     i: int
@@ -127,95 +429,790 @@ class Step:
     s: float
 
 
-def integrate_trapezoidal(
-    func_or_expr: FuncOrExpr, a: Number, b: Number, n: int, *, verbose: bool = False
-) -> Tuple[float, List[Step]]:
-    """Метод трапеций. Возвращает (значение, шаги)."""
-    if n <= 0:
-        raise ValueError("n должно быть положительным")
+# Запись таблицы шагов в двоичных файлах (.npy и сырые записи подряд)
+TRACE_DTYPE = (
+    np.dtype([("i", "<i8"), ("x", "<f8"), ("term", "<f8"), ("s", "<f8")])
+    if np is not None
+    else None
+)
+
+
+@contextlib.contextmanager
+def _open_output(file: Any, mode: str) -> Iterator[Any]:
+    """Файл по пути (открывается и закрывается здесь) или уже открытый поток."""
+    if hasattr(file, "write"):
+        yield file
+        return
+    with open(file, mode) as fh:
+        yield fh
+
+
+class StepTrace:
+    """Таблица шагов по столбцам i, x, term, s (массивы NumPy; без NumPy — списки).
+
+    Шаги не хранятся объектами: trace[k] и итерация создают Step по
+    требованию, так что интерфейс списка шагов сохраняется, а в памяти —
+    четыре массива. Накопленная сумма s считается векторно (cumsum).
+    """
+
+    __slots__ = ("i", "x", "term", "s")
+
+    def __init__(self, i: Any, x: Any, term: Any, s: Any) -> None:
+        self.i = i
+        self.x = x
+        self.term = term
+        self.s = s
+
+    @classmethod
+    def from_terms(cls, idx: Any, xs: Any, terms: Any, s0: float = 0.0) -> "StepTrace":
+        """Таблица с накопленной суммой s0 + term_1 + ... + term_k."""
+        if np is None:
+            running = list(itertools.accumulate(terms, initial=s0))[1:]
+        else:
+            running = s0 + np.cumsum(terms, dtype=np.float64)
+        return cls(idx, xs, terms, running)
+
+    def __len__(self) -> int:
+        return len(self.i)
+
+    def __getitem__(self, k: Any) -> Any:
+        if isinstance(k, slice):
+            return StepTrace(self.i[k], self.x[k], self.term[k], self.s[k])
+        return Step(
+            i=int(self.i[k]),
+            x=float(self.x[k]),
+            term=float(self.term[k]),
+            s=float(self.s[k]),
+        )
+
+    def __iter__(self) -> Iterator[Step]:
+        columns = (self.i, self.x, self.term, self.s)
+        if np is not None:
+            columns = tuple(col.tolist() for col in columns)
+        for i, x, t, s in zip(*columns):
+            yield Step(i=i, x=x, term=t, s=s)
+
+    def __repr__(self) -> str:
+        return f"StepTrace(len={len(self)})"
+
+    def to_records(self) -> "np.ndarray":
+        """Структурированный массив с полями i, x, term, s (TRACE_DTYPE)."""
+        if np is None:
+            raise RuntimeError("Для записи таблицы шагов в двоичном виде нужен NumPy")
+        out = np.empty(len(self), dtype=TRACE_DTYPE)
+        out["i"], out["x"], out["term"], out["s"] = self.i, self.x, self.term, self.s
+        return out
+
+    def to_csv(self, file: Any, *, header: bool = True) -> None:
+        """CSV со столбцами i, x, term, s (file — путь или текстовый поток)."""
+        with _open_output(file, "w") as fh:
+            if np is None:
+                if header:
+                    fh.write("i,x,term,s\n")
+                for step in self:
+                    fh.write(f"{step.i},{step.x!r},{step.term!r},{step.s!r}\n")
+                return
+            np.savetxt(
+                fh,
+                self.to_records(),
+                fmt=("%d", "%.17g", "%.17g", "%.17g"),
+                delimiter=",",
+                header="i,x,term,s" if header else "",
+                comments="",
+            )
+
+    def to_npy(self, file: Any) -> None:
+        """Файл .npy со структурированным массивом (читается np.load, в т.ч. mmap)."""
+        records = self.to_records()
+        np.save(file, records)
+
+    def to_binary(self, file: Any) -> None:
+        """Сырые записи TRACE_DTYPE подряд: np.fromfile(path, dtype=TRACE_DTYPE)."""
+        with _open_output(file, "wb") as fh:
+            fh.write(self.to_records().tobytes())
+
+    def write_table(self, stream: Any) -> None:
+        """Таблица для печати (без заголовка) одним форматированием столбцов."""
+        if np is None:
+            for st in self:
+                stream.write(
+                    f"{st.i:>6d} {st.x:>16.8f} {st.term:>16.8f} {st.s:>16.8f}\n"
+                )
+            return
+        np.savetxt(
+            stream,
+            self.to_records(),
+            fmt=("%6d", "%16.8f", "%16.8f", "%16.8f"),
+            delimiter=" ",
+        )
+
+
+class StreamedTrace:
+    """Ленивая таблица шагов из блоков StepTrace (потоковый режим chunk_size).
+
+    В памяти одновременно один блок; при каждом обходе узлы вычисляются
+    заново. Итерация даёт Step, blocks() — сами блоки; writers пишут
+    блок за блоком. size — общее число шагов (нужно заголовку .npy).
+    """
+
+    __slots__ = ("_blocks", "size")
+
+    def __init__(self, blocks: Callable[[], Iterator[StepTrace]], size: int) -> None:
+        self._blocks = blocks
+        self.size = size
+
+    def blocks(self) -> Iterator[StepTrace]:
+        return self._blocks()
+
+    def __iter__(self) -> Iterator[Step]:
+        for block in self.blocks():
+            yield from block
+
+    def to_csv(self, file: Any, *, header: bool = True) -> None:
+        with _open_output(file, "w") as fh:
+            for k, block in enumerate(self.blocks()):
+                block.to_csv(fh, header=header and k == 0)
+
+    def to_npy(self, file: Any) -> None:
+        """Файл .npy: заголовок на size записей, затем блоки по очереди."""
+        header = {
+            "descr": np.lib.format.dtype_to_descr(TRACE_DTYPE),
+            "fortran_order": False,
+            "shape": (self.size,),
+        }
+        written = 0
+        with _open_output(file, "wb") as fh:
+            np.lib.format.write_array_header_1_0(fh, header)
+            for block in self.blocks():
+                block.to_binary(fh)
+                written += len(block)
+        if written != self.size:
+            raise RuntimeError(f"Записано {written} шагов вместо {self.size}")
+
+    def to_binary(self, file: Any) -> None:
+        with _open_output(file, "wb") as fh:
+            for block in self.blocks():
+                block.to_binary(fh)
+
+    def write_table(self, stream: Any) -> None:
+        for block in self.blocks():
+            block.write_table(stream)
+
+
+# Внутренние узлы составных правил: (первый индекс, последний индекс - n, сдвиг в h)
+_RULE_NODES: Dict[str, Tuple[int, int, float]] = {
+    "trapezoid": (1, -1, 0.0),
+    "simpson": (1, -1, 0.0),
+    "left": (0, -1, 0.0),
+    "right": (1, 0, 0.0),
+    "midpoint": (0, -1, 0.5),
+}
+
+# Вычисляет ли правило f на левом и правом концах отрезка
+_RULE_ENDPOINTS: Dict[str, Tuple[bool, bool]] = {
+    "trapezoid": (True, True),
+    "simpson": (True, True),
+    "left": (True, False),
+    "right": (False, True),
+    "midpoint": (False, False),
+}
+
+
+def _neumaier_add(total: float, comp: float, value: float) -> Tuple[float, float]:
+    """Компенсированное сложение (Ноймайер): возвращает новые (сумма, поправка)."""
+    t = total + value
+    if abs(total) >= abs(value):
+        comp += (total - t) + value
+    else:
+        comp += (value - t) + total
+    return t, comp
+
+
+# Размер блока по умолчанию для параллельного режима. Он не зависит от числа
+# процессов, поэтому разбиение на блоки и порядок их сложения одинаковы при
+# любом workers и результат совпадает побитово.
+_DEFAULT_BLOCK = 1 << 16
+
+
+def _check_blocks(chunk_size: Optional[int], workers: Optional[int]) -> None:
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size должно быть положительным")
+    if workers is not None and workers <= 0:
+        raise ValueError("workers должно быть положительным")
+
+
+def _shippable(f: Callable[[float], float]) -> FuncOrExpr:
+    """То, что передаётся в процесс-исполнитель: текст выражения или сама f."""
+    if isinstance(f, CompiledExpr):
+        # Выражение уходит текстом и компилируется в исполнителе один раз
+        return f.expr
+    try:
+        pickle.dumps(f)
+    except Exception as exc:
+        raise TypeError(
+            "Для workers функция должна сериализоваться pickle "
+            "(определите её на уровне модуля или передайте строку выражения)"
+        ) from exc
+    return f
+
+
+def _map_blocks(fn: Callable[..., Any], tasks: List[tuple], workers: int) -> List[Any]:
+    """Вычисляет fn(*task) для всех блоков; порядок результатов — порядок tasks."""
+    if workers == 1:
+        return [fn(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(tasks) // (4 * workers))
+        return list(pool.map(fn, *zip(*tasks), chunksize=chunksize))
+
+
+def _reduce_blocks(s: float, sums: Iterable[float]) -> float:
+    """Складывает суммы блоков по порядку с компенсацией."""
+    total, comp = s, 0.0
+    for value in sums:
+        total, comp = _neumaier_add(total, comp, value)
+    return total + comp
+
+
+def _rule_terms(
+    f: Callable[[float], float],
+    a: float,
+    h: float,
+    rule: str,
+    lo: int,
+    hi: int,
+    precision: str = "float64",
+) -> Tuple[Any, Any, Any]:
+    """Индексы, узлы и взвешенные значения правила rule для i из [lo, hi).
+
+    С precision="float32" узлы и значения f — массивы float32.
+    """
+    shift = _RULE_NODES[rule][2]
+    if np is None:
+        idx = list(range(lo, hi))
+        xs = [a + (i + shift) * h for i in idx]
+        terms = [f(x) for x in xs]
+        if rule == "simpson":
+            terms = [(4.0 if i % 2 == 1 else 2.0) * t for i, t in zip(idx, terms)]
+        return idx, xs, terms
+
+    idx = np.arange(lo, hi)
+    xs = (a + (idx + shift) * h).astype(precision, copy=False)
+    terms = _eval_nodes(f, xs, precision)
+    if rule == "simpson":
+        # Веса 4 и 2 точны в любом типе — тип слагаемых не меняется
+        terms = np.where(idx % 2 == 1, 4.0, 2.0).astype(terms.dtype) * terms
+    return idx, xs, terms
+
+
+# Способы сложения слагаемых (accumulator=); None — как раньше: np.sum
+# (попарное) с NumPy и math.fsum без него
+ACCUMULATORS = ("naive", "neumaier", "pairwise")
+PRECISIONS = ("float64", "float32")
+
+# Ширина полос векторного сложения Ноймайера: компенсация ведётся
+# независимо в каждой полосе, затем полосы складываются между собой
+_NEUMAIER_LANES = 1024
+
+# Блок, ниже которого попарное сложение без NumPy идёт подряд
+_PAIRWISE_BASE = 128
+
+
+def _check_accumulation(accumulator: Optional[str], precision: str) -> Optional[str]:
+    """Проверяет accumulator и precision; возвращает действующий accumulator.
+
+    float32 по умолчанию складывается с компенсацией Ноймайера в float64.
+    """
+    if accumulator is not None and accumulator not in ACCUMULATORS:
+        raise ValueError("accumulator должен быть одним из: " + ", ".join(ACCUMULATORS))
+    if precision not in PRECISIONS:
+        raise ValueError("precision должен быть одним из: " + ", ".join(PRECISIONS))
+    if precision == "float32":
+        if np is None:
+            raise RuntimeError('Для precision="float32" нужен NumPy')
+        return accumulator or "neumaier"
+    return accumulator
+
+
+def _pairwise_sum(values: List[float], lo: int, hi: int) -> float:
+    if hi - lo <= _PAIRWISE_BASE:
+        s = 0.0
+        for k in range(lo, hi):
+            s += values[k]
+        return s
+    mid = (lo + hi) // 2
+    return _pairwise_sum(values, lo, mid) + _pairwise_sum(values, mid, hi)
+
+
+def _neumaier_sum(terms: Any) -> float:
+    """Сумма с компенсацией Ноймайера в float64 (с NumPy — по полосам)."""
+    total, comp = 0.0, 0.0
+    if np is None:
+        for value in terms:
+            total, comp = _neumaier_add(total, comp, value)
+        return total + comp
+    full = len(terms) - len(terms) % _NEUMAIER_LANES
+    s = np.zeros(_NEUMAIER_LANES)
+    c = np.zeros(_NEUMAIER_LANES)
+    for row in terms[:full].reshape(-1, _NEUMAIER_LANES):
+        row = row.astype(np.float64, copy=False)
+        t = s + row
+        c += np.where(np.abs(s) >= np.abs(row), (s - t) + row, (row - t) + s)
+        s = t
+    for value in itertools.chain(s.tolist(), terms[full:].tolist()):
+        total, comp = _neumaier_add(total, comp, value)
+    return total + (comp + float(np.sum(c)))
+
+
+def _terms_sum(terms: Any, accumulator: Optional[str] = None) -> float:
+    """Сумма слагаемых способом accumulator; накопление всегда в float64."""
+    if accumulator == "neumaier":
+        return _neumaier_sum(terms)
+    if np is None:
+        if accumulator == "naive":
+            s = 0.0
+            for value in terms:
+                s += value
+            return s
+        if accumulator == "pairwise":
+            return _pairwise_sum(terms, 0, len(terms))
+        return math.fsum(terms)
+    if accumulator == "naive":
+        # cumsum складывает строго по порядку, в отличие от попарного np.sum
+        return float(np.cumsum(terms, dtype=np.float64)[-1]) if len(terms) else 0.0
+    return float(np.sum(terms, dtype=np.float64))
+
+
+def _rule_block_sum(
+    func_or_expr: FuncOrExpr,
+    a: float,
+    h: float,
+    rule: str,
+    lo: int,
+    hi: int,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> float:
+    """Взвешенная сумма одного блока узлов [lo, hi); выполняется и в исполнителях."""
     f = _as_callable(func_or_expr)
-    a = float(a)
-    b = float(b)
+    if np is None and accumulator is None and isinstance(f, CompiledExpr):
+        # Без NumPy — сгенерированный цикл: без вызова функции на каждый узел
+        with _instr.phase("evaluate"):
+            return f.rule_sum(a, h, _RULE_NODES[rule][2], lo, hi, rule == "simpson")
+    with _instr.phase("evaluate"):
+        _, _, terms = _rule_terms(f, a, h, rule, lo, hi, precision)
+    with _instr.phase("sum"):
+        return _terms_sum(terms, accumulator)
+
+
+def _iter_rule_traces(
+    f: Callable[[float], float],
+    a: float,
+    h: float,
+    rule: str,
+    lo: int,
+    hi: int,
+    s: float,
+    chunk_size: int,
+    precision: str = "float64",
+) -> Iterator[StepTrace]:
+    """Таблица шагов блоками: в памяти одновременно не больше chunk_size шагов."""
+    for start in range(lo, hi, chunk_size):
+        stop = min(start + chunk_size, hi)
+        idx, xs, terms = _rule_terms(f, a, h, rule, start, stop, precision)
+        trace = StepTrace.from_terms(idx, xs, terms, s)
+        if len(trace):
+            s = float(trace.s[-1])
+        yield trace
+
+
+def _rule_block_size(rule: str, chunk_size: Optional[int]) -> int:
+    block = chunk_size or _DEFAULT_BLOCK
+    if rule == "simpson" and block % 2:
+        # Блок из чётного числа узлов — целое число панелей Симпсона
+        block += 1
+    return block
+
+
+def _rule_blocks(n: int, rule: str, block: int) -> Iterator[Tuple[int, int]]:
+    """Границы [start, stop) блоков внутренних узлов правила rule (лениво)."""
+    first, last, _ = _RULE_NODES[rule]
+    lo, hi = first, n + last + 1
+    return ((start, min(start + block, hi)) for start in range(lo, hi, block))
+
+
+def _rule_setup(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    n: int,
+    rule: str,
+    transform: Optional[str],
+    prepared: Optional[Tuple[Callable[[float], float], float, float, Dict]] = None,
+) -> Tuple[Callable[[float], float], float, float, float, float]:
+    """(f, a, h, s0, scale): значение правила = scale · (s0 + сумма по узлам).
+
+    s0 — вклад концов отрезка; f, a и h — уже после замены переменной.
+    prepared — результат _prepare_interval, если отрезок уже подготовлен.
+    """
+    if prepared is None:
+        prepared = _prepare_interval(
+            func_or_expr, a, b, transform, _RULE_ENDPOINTS[rule]
+        )
+    f, a, b, known = prepared
     h = (b - a) / float(n)
-    s = 0.5 * (f(a) + f(b))
-    steps: List[Step] = []
+    if rule in ("trapezoid", "simpson"):
+        ends = _endpoint_value(f, known, a) + _endpoint_value(f, known, b)
+        if rule == "trapezoid":
+            return f, a, h, 0.5 * ends, h
+        return f, a, h, ends, h / 3.0
+    return f, a, h, 0.0, h
+
+
+def _rule_sum(
+    f: Callable[[float], float],
+    a: float,
+    h: float,
+    n: int,
+    rule: str,
+    s: float,
+    verbose: bool,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> Tuple[float, Iterable[Step]]:
+    """Добавляет к s взвешенную сумму f по внутренним узлам правила rule.
+
+    С chunk_size узлы обрабатываются блоками фиксированного размера, суммы
+    блоков складываются с компенсацией, а шаги (при verbose) возвращаются
+    StreamedTrace, которая при обходе повторно вычисляет узлы блок за блоком.
+    Без chunk_size шаги — StepTrace (столбцы массивов, не список объектов).
+    С workers блоки распределяются по процессам и складываются в том же
+    порядке, что и при последовательном счёте. Без chunk_size блоки —
+    по _DEFAULT_BLOCK узлов и при любом workers, поэтому результат не
+    зависит от числа процессов бит в бит. accumulator и precision —
+    способ сложения и тип значений внутри блока (см. _terms_sum).
+    """
+    first, last, _ = _RULE_NODES[rule]
+    lo, hi = first, n + last + 1
+    # Узлы считаются здесь, а не в блоках: блоки могут уйти в исполнители
+    _instr.add_evals(max(0, hi - lo))
 
-    for i in range(1, n):
-        x = a + i * h
-        term = f(x)
-        s += term
-        if verbose:
-            steps.append(Step(i=i, x=x, term=term, s=s))
+    block = _rule_block_size(rule, chunk_size)
+    if chunk_size is None and workers is None and verbose:
+        with _instr.phase("evaluate"):
+            idx, xs, terms = _rule_terms(f, a, h, rule, lo, hi, precision)
+        steps = StepTrace.from_terms(idx, xs, terms, s)
+        with _instr.phase("sum"):
+            # Те же блоки, что и без verbose: для одного блока это s + сумма
+            sums = [
+                _terms_sum(terms[start - lo : stop - lo], accumulator)
+                for start, stop in _rule_blocks(n, rule, block)
+            ]
+            return _reduce_blocks(s, sums), steps
 
-    return h * s, steps
+    if workers is None:
+        sums: Iterable[float] = (
+            _rule_block_sum(f, a, h, rule, start, stop, accumulator, precision)
+            for start, stop in _rule_blocks(n, rule, block)
+        )
+    else:
+        target = _shippable(f)
+        tasks = [
+            (target, a, h, rule, start, stop, accumulator, precision)
+            for start, stop in _rule_blocks(n, rule, block)
+        ]
+        with _instr.phase("workers"):
+            sums = _map_blocks(_rule_block_sum, tasks, workers)
+    total = _reduce_blocks(s, sums)
+    if verbose:
+        return total, StreamedTrace(
+            lambda: _iter_rule_traces(f, a, h, rule, lo, hi, s, block, precision),
+            max(0, hi - lo),
+        )
+    return total, [] if chunk_size is None else iter(())
 
 
+def _resolve_n(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    n: Union[int, str],
+    rule: str,
+    tol: Optional[float],
+    transform: Optional[str],
+) -> Tuple[int, Optional[Tuple[Callable[[float], float], float, float, Dict]]]:
+    """(n, prepared): n как есть или, при n="auto", наименьшее n с оценкой
+    ошибки ≤ tol; prepared — уже подготовленный choose_n отрезок или None.
+    """
+    if n != "auto":
+        if tol is not None:
+            raise ValueError('tol задаётся только вместе с n="auto"')
+        return n, None
+    import error_bounds
+
+    choice = error_bounds.choose_n(
+        func_or_expr, a, b, rule, 1e-8 if tol is None else tol, transform=transform
+    )
+    return choice.n, choice.prepared
+
+
+@_cache_rule
+def integrate_trapezoidal(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    n: Union[int, str],
+    *,
+    verbose: bool = False,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    transform: Optional[str] = None,
+    tol: Optional[float] = None,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> Tuple[float, Iterable[Step]]:
+    """Метод трапеций. Возвращает (значение, шаги).
+
+    chunk_size включает потоковый режим: память ограничена размером блока,
+    шаги отдаются ленивой StreamedTrace. workers > 1 распределяет блоки по
+    процессам; результат не зависит от числа процессов.
+
+    transform (rational | tanh-sinh) считает правило по t после замены
+    переменной (модуль transforms); шаги тогда тоже по t. Без transform
+    бесконечный предел включает rational, а неконечное значение f на конце
+    отрезка — tanh-sinh.
+
+    n="auto" выбирает наименьшее n, при котором классическая оценка ошибки
+    не больше tol (по умолчанию 1e-8); см. error_bounds.choose_n — там же
+    сама оценка и способ, которым найдена производная.
+
+    accumulator — сложение значений внутри блока: naive (подряд), neumaier
+    (компенсация Ноймайера), pairwise (попарное); по умолчанию np.sum с
+    NumPy и math.fsum без него. Суммы блоков (chunk_size, workers) всегда
+    складываются с компенсацией. precision="float32" вычисляет узлы и f в
+    float32 (вдвое меньше памяти), а складывает в float64 — по умолчанию с
+    компенсацией Ноймайера; нужен NumPy.
+    """
+    n, prepared = _resolve_n(func_or_expr, a, b, n, "trapezoid", tol, transform)
+    if n <= 0:
+        raise ValueError("n должно быть положительным")
+    _check_blocks(chunk_size, workers)
+    accumulator = _check_accumulation(accumulator, precision)
+    f, a, h, s0, scale = _rule_setup(
+        func_or_expr, a, b, n, "trapezoid", transform, prepared
+    )
+    s, steps = _rule_sum(
+        f,
+        a,
+        h,
+        n,
+        "trapezoid",
+        s0,
+        verbose,
+        chunk_size,
+        workers,
+        accumulator,
+        precision,
+    )
+    return scale * s, steps
+
+
+@_cache_rule
 def integrate_simpson(
-    func_or_expr: FuncOrExpr, a: Number, b: Number, n: int, *, verbose: bool = False
-) -> Tuple[float, List[Step]]:
-    """Метод Симпсона. n должно быть чётным. Возвращает (значение, шаги)."""
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    n: Union[int, str],
+    *,
+    verbose: bool = False,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    transform: Optional[str] = None,
+    tol: Optional[float] = None,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> Tuple[float, Iterable[Step]]:
+    """Метод Симпсона. n должно быть чётным. Возвращает (значение, шаги).
+
+    chunk_size, workers, transform, n="auto" с tol, accumulator и
+    precision — как в integrate_trapezoidal.
+    """
+    n, prepared = _resolve_n(func_or_expr, a, b, n, "simpson", tol, transform)
     if n <= 0 or n % 2 != 0:
         raise ValueError("Для метода Симпсона n должно быть положительным чётным")
-    f = _as_callable(func_or_expr)
-    a = float(a)
-    b = float(b)
-    h = (b - a) / float(n)
-    s = f(a) + f(b)
-    steps: List[Step] = []
-
-    for i in range(1, n):
-        x = a + i * h
-        coeff = 4.0 if i % 2 == 1 else 2.0
-        term = coeff * f(x)
-        s += term
-        if verbose:
-            steps.append(Step(i=i, x=x, term=term, s=s))
-
-    return (h / 3.0) * s, steps
+    _check_blocks(chunk_size, workers)
+    accumulator = _check_accumulation(accumulator, precision)
+    f, a, h, s0, scale = _rule_setup(
+        func_or_expr, a, b, n, "simpson", transform, prepared
+    )
+    s, steps = _rule_sum(
+        f, a, h, n, "simpson", s0, verbose, chunk_size, workers, accumulator, precision
+    )
+    return scale * s, steps
 
 
+@_cache_rule
 def integrate_rectangle(
     func_or_expr: FuncOrExpr,
     a: Number,
     b: Number,
-    n: int,
+    n: Union[int, str],
     *,
     mode: str = "left",
     verbose: bool = False,
-) -> Tuple[float, List[Step]]:
-    """Метод прямоугольников: left | right | midpoint. Возвращает (значение, шаги)."""
-    if n <= 0:
-        raise ValueError("n должно быть положительным")
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    transform: Optional[str] = None,
+    tol: Optional[float] = None,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> Tuple[float, Iterable[Step]]:
+    """Метод прямоугольников: left | right | midpoint. Возвращает (значение, шаги).
+
+    chunk_size, workers, transform, n="auto" с tol, accumulator и
+    precision — как в integrate_trapezoidal.
+    """
     if mode not in {"left", "right", "midpoint"}:
         raise ValueError("mode должен быть одним из: left, right, midpoint")
+    n, prepared = _resolve_n(func_or_expr, a, b, n, mode, tol, transform)
+    if n <= 0:
+        raise ValueError("n должно быть положительным")
+    _check_blocks(chunk_size, workers)
+    accumulator = _check_accumulation(accumulator, precision)
+    f, a, h, s0, scale = _rule_setup(func_or_expr, a, b, n, mode, transform, prepared)
+    s, steps = _rule_sum(
+        f, a, h, n, mode, s0, verbose, chunk_size, workers, accumulator, precision
+    )
+    return scale * s, steps
+
+
+def _sample_block_stats(
+    func_or_expr: FuncOrExpr,
+    a: float,
+    b: float,
+    m: int,
+    stream: Any,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> Tuple[int, float, float]:
+    """(m, среднее, сумма квадратов отклонений) f в m случайных точках блока.
 
+    stream — дочерний SeedSequence блока (или строка-зерно без NumPy).
+    Без accumulator — np.mean/np.sum с NumPy и формула Велфорда без него.
+    """
     f = _as_callable(func_or_expr)
-    a = float(a)
-    b = float(b)
-    h = (b - a) / float(n)
-    s = 0.0
-    steps: List[Step] = []
+    if np is None:
+        rng = random.Random(stream)
+        if accumulator is not None:
+            ys = [f(rng.uniform(a, b)) for _ in range(m)]
+            mean = _terms_sum(ys, accumulator) / m
+            return m, mean, _terms_sum([(y - mean) ** 2 for y in ys], accumulator)
+        mean, m2 = 0.0, 0.0
+        for k in range(1, m + 1):
+            y = f(rng.uniform(a, b))
+            delta = y - mean
+            mean += delta / k
+            m2 += delta * (y - mean)
+        return m, mean, m2
+    xs = np.random.default_rng(stream).uniform(a, b, size=m)
+    ys = _eval_nodes(f, xs.astype(precision, copy=False), precision)
+    if accumulator is None:
+        mean = float(np.mean(ys))
+        return m, mean, float(np.sum((ys - mean) ** 2))
+    mean = _terms_sum(ys, accumulator) / m
+    return m, mean, _terms_sum((ys - mean) ** 2, accumulator)
+
+
+def _combine_moments(
+    acc: Tuple[int, float, float], block: Tuple[int, float, float]
+) -> Tuple[int, float, float]:
+    """Объединение (n, среднее, M2) двух выборок (формула Чана)."""
+    n_a, mean_a, m2_a = acc
+    n_b, mean_b, m2_b = block
+    n = n_a + n_b
+    delta = mean_b - mean_a
+    return (
+        n,
+        mean_a + delta * n_b / n,
+        m2_a + m2_b + delta * delta * n_a * n_b / n,
+    )
+
+
+# Способы выборки для Монте‑Карло: random — обычная (блоки с оценкой
+# дисперсии по точкам); остальные — рандомизированные оценки, ошибка
+# которых берётся по разбросу независимых повторений (replicates).
+_SAMPLERS = ("random", "sobol", "halton", "antithetic", "stratified", "control")
 
-    if mode == "left":
-        idxs = range(0, n)
-        xi = lambda i: a + i * h
-    elif mode == "right":
-        idxs = range(1, n + 1)
-        xi = lambda i: a + i * h
-    else:  # midpoint
-        idxs = range(0, n)
-        xi = lambda i: a + (i + 0.5) * h
 
-    for i in idxs:
-        x = xi(i)
-        term = f(x)
-        s += term
-        if verbose:
-            steps.append(Step(i=i, x=x, term=term, s=s))
+def _replicate_mean(
+    func_or_expr: FuncOrExpr,
+    a: float,
+    b: float,
+    m: int,
+    sampler: str,
+    stream: Any,
+    block: int,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> float:
+    """Среднее f по одной независимой рандомизации из m точек (блоками).
+
+    sobol — скрамблированный Соболь, halton — Холтон со случайным сдвигом,
+    antithetic — пары (u, 1 − u), stratified — по точке в каждой из m равных
+    страт, control — контрольная переменная u с известным средним 1/2.
+    """
+    import qmc
+
+    f = _as_callable(func_or_expr)
+    rng = np.random.default_rng(stream)
+    if sampler == "sobol":
+        scramble = qmc.sobol_scramble(1, rng)
+    elif sampler == "halton":
+        shift = rng.random(1)
+    # Σy, Σu, Σyu, Σu² — для контрольной переменной нужны все четыре
+    sums = np.zeros(4)
+    for start in range(0, m, block):
+        count = min(block, m - start)
+        if sampler == "sobol":
+            u = qmc.sobol_points(start, count, 1, scramble)[:, 0]
+        elif sampler == "halton":
+            u = qmc.halton_points(start, count, 1, shift)[:, 0]
+        elif sampler == "stratified":
+            u = (np.arange(start, start + count) + rng.random(count)) / m
+        elif sampler == "antithetic":
+            half = rng.random((count + 1) // 2)
+            u = np.concatenate([half, 1.0 - half])[:count]
+        else:
+            u = rng.random(count)
+        xs = (a + (b - a) * u).astype(precision, copy=False)
+        ys = _eval_nodes(f, xs, precision)
+        if accumulator is None:
+            sums += (ys.sum(), u.sum(), (ys * u).sum(), (u * u).sum())
+        else:
+            parts = (ys, u, ys * u, u * u)
+            sums += [_terms_sum(part, accumulator) for part in parts]
+    mean_y = sums[0] / m
+    if sampler != "control":
+        return float(mean_y)
+    mean_u = sums[1] / m
+    var_u = sums[3] / m - mean_u * mean_u
+    beta = (sums[2] / m - mean_y * mean_u) / var_u if var_u > 0 else 0.0
+    return float(mean_y - beta * (mean_u - 0.5))
+
 
-    return h * s, steps
+@dataclass
+class MonteCarloResult:
+    value: float
+    stderr: float
+    ci: Tuple[float, float]
+    samples: int
 
 
+@_result_cache(
+    *_dataclass_codec(MonteCarloResult),
+    cacheable=lambda params: params["seed"] is not None,
+)
 def integrate_monte_carlo(
     func_or_expr: FuncOrExpr,
     a: Number,
@@ -223,20 +1220,463 @@ def integrate_monte_carlo(
     samples: int = 10_000,
     *,
     seed: int | None = None,
-) -> float:
-    """Монте‑Карло интегрирование (равномерная выборка)."""
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    confidence: float = 0.95,
+    sampler: str = "random",
+    replicates: int = 16,
+    accumulator: Optional[str] = None,
+    precision: str = "float64",
+) -> MonteCarloResult:
+    """Монте‑Карло интегрирование (равномерная выборка).
+
+    Выборка делится на блоки по chunk_size точек (память не зависит от
+    samples); каждый блок генерируется и вычисляется векторно со своим
+    потоком numpy.random.Generator из SeedSequence(seed).spawn. Разбиение
+    на блоки и порядок объединения не зависят от workers, поэтому результат
+    с заданным seed одинаков при любом числе процессов. Глобальный
+    генератор random не затрагивается.
+
+    sampler: random | sobol | halton (квази‑Монте‑Карло) | antithetic |
+    stratified | control (понижение дисперсии). Кроме random, выборка
+    делится на replicates независимых рандомизаций по samples / replicates
+    точек (samples должно делиться на replicates — рандомизации равного
+    размера, иначе ValueError); ошибка оценивается по их разбросу, процессы
+    (workers) считают рандомизации параллельно. Эти режимы требуют NumPy.
+
+    accumulator и precision — как в integrate_trapezoidal: сложение
+    значений внутри блока и тип, в котором вычисляется f.
+
+    Возвращает оценку, её стандартную ошибку и доверительный интервал
+    уровня confidence (нормальное приближение).
+    """
     if samples <= 0:
         raise ValueError("samples должно быть положительным")
-    if seed is not None:
-        random.seed(seed)
+    if not 0.0 < confidence < 1.0:
+        raise ValueError("confidence должно быть в интервале (0, 1)")
+    if sampler not in _SAMPLERS:
+        raise ValueError("sampler должен быть одним из: " + ", ".join(_SAMPLERS))
+    _check_blocks(chunk_size, workers)
+    accumulator = _check_accumulation(accumulator, precision)
+    f = _as_callable(func_or_expr)
+    a = float(a)
+    b = float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ValueError("Для Монте‑Карло пределы должны быть конечными")
+    block = chunk_size or _DEFAULT_BLOCK
+    target = _shippable(f) if workers is not None else f
+
+    if sampler != "random":
+        if np is None:
+            raise RuntimeError(f"Для sampler={sampler} нужен NumPy")
+        if replicates < 2 or samples < replicates:
+            raise ValueError("Нужно 2 <= replicates <= samples")
+        if samples % replicates:
+            raise ValueError("samples должно делиться на replicates без остатка")
+        m = samples // replicates
+        streams = np.random.SeedSequence(seed).spawn(replicates)
+        tasks = [
+            (target, a, b, m, sampler, stream, block, accumulator, precision)
+            for stream in streams
+        ]
+        with _instr.phase("sample"):
+            means = _map_blocks(_replicate_mean, tasks, workers or 1)
+        mean = math.fsum(means) / replicates
+        m2 = math.fsum((v - mean) ** 2 for v in means)
+        n, var_of_mean = m * replicates, m2 / (replicates - 1) / replicates
+    else:
+        sizes = [min(block, samples - start) for start in range(0, samples, block)]
+        if np is not None:
+            streams = np.random.SeedSequence(seed).spawn(len(sizes))
+        else:
+            base = seed if seed is not None else random.SystemRandom().getrandbits(64)
+            streams = [f"{base}:{k}" for k in range(len(sizes))]
+        tasks = [
+            (target, a, b, m, stream, accumulator, precision)
+            for m, stream in zip(sizes, streams)
+        ]
+        with _instr.phase("sample"):
+            moments = _map_blocks(_sample_block_stats, tasks, workers or 1)
+        n, mean, m2 = moments[0]
+        for block_moments in moments[1:]:
+            n, mean, m2 = _combine_moments((n, mean, m2), block_moments)
+        var_of_mean = m2 / (n - 1) / n if n > 1 else math.inf
+
+    _instr.add_evals(n)
+    width = b - a
+    value = width * mean
+    stderr = abs(width) * math.sqrt(var_of_mean)
+    z = statistics.NormalDist().inv_cdf(0.5 + 0.5 * confidence)
+    return MonteCarloResult(
+        value=value,
+        stderr=stderr,
+        ci=(value - z * stderr, value + z * stderr),
+        samples=n,
+    )
+
+
+def _eval_points(f: Callable[[float], float], xs: List[float]) -> List[float]:
+    """Значения f в списке точек (одним векторным вызовом, если есть NumPy)."""
+    if np is None:
+        return [f(x) for x in xs]
+    return _eval_nodes(f, np.array(xs, dtype=float)).tolist()
+
+
+# Узлы и веса Гаусса–Кронрода 7/15 на [-1, 1] (неотрицательная половина,
+# как в QUADPACK). Узлы Гаусса — xgk[1], xgk[3], xgk[5], xgk[7].
+_GK15_XGK = (
+    0.991455371120812639206854697526329,
+    0.949107912342758524526189684047851,
+    0.864864423359769072789712788640926,
+    0.741531185599394439863864773280788,
+    0.586087235467691130294144845693013,
+    0.405845151377397166906606412076961,
+    0.207784955007898467600689403773245,
+    0.000000000000000000000000000000000,
+)
+_GK15_WGK = (
+    0.022935322010529224963732008058970,
+    0.063092092629978553290700663189204,
+    0.104790010322250183839876322541518,
+    0.140653259715525918745189590510238,
+    0.169004726639267902826583426598550,
+    0.190350578064785409913256402421014,
+    0.204432940075298892414161999234649,
+    0.209482141084727828012999174891714,
+)
+_GK15_WG = (
+    0.129484966168869693270611432679082,
+    0.279705391489276667901467771423780,
+    0.381830050505118944950369775488975,
+    0.417959183673469387755102040816327,
+)
+
+
+def _gk15_nodes(lo: float, hi: float) -> List[float]:
+    c = 0.5 * (lo + hi)
+    r = 0.5 * (hi - lo)
+    return (
+        [c - r * t for t in _GK15_XGK[:-1]]
+        + [c]
+        + [c + r * t for t in _GK15_XGK[-2::-1]]
+    )
+
+
+def _gk15_estimate(lo: float, hi: float, ys: List[float]) -> Tuple[float, float]:
+    """(значение Кронрода, |Кронрод − Гаусс|) по 15 значениям из _gk15_nodes."""
+    r = 0.5 * (hi - lo)
+    center = ys[7]
+    kronrod = _GK15_WGK[7] * center
+    gauss = _GK15_WG[3] * center
+    for j in range(7):
+        pair = ys[j] + ys[14 - j]
+        kronrod += _GK15_WGK[j] * pair
+        if j % 2 == 1:
+            gauss += _GK15_WG[j // 2] * pair
+    return r * kronrod, abs(r * (kronrod - gauss))
+
+
+def _simpson_nodes(lo: float, hi: float) -> List[float]:
+    h = (hi - lo) / 4.0
+    return [lo, lo + h, lo + 2.0 * h, lo + 3.0 * h, hi]
+
+
+def _simpson_estimate(lo: float, hi: float, ys: List[float]) -> Tuple[float, float]:
+    """Симпсон на 5 узлах с поправкой Ричардсона; ошибка — |S₂ − S₁| / 15."""
+    h = (hi - lo) / 4.0
+    coarse = (2.0 * h / 3.0) * (ys[0] + 4.0 * ys[2] + ys[4])
+    fine = (h / 3.0) * (ys[0] + 4.0 * ys[1] + 2.0 * ys[2] + 4.0 * ys[3] + ys[4])
+    delta = (fine - coarse) / 15.0
+    return fine + delta, abs(delta)
+
+
+# Правила оценки подотрезка: (узлы, (значение, ошибка) по значениям в узлах)
+_ADAPTIVE_RULES: Dict[str, Tuple[Callable, Callable]] = {
+    "gk15": (_gk15_nodes, _gk15_estimate),
+    "simpson": (_simpson_nodes, _simpson_estimate),
+}
+
+
+@dataclass
+class AdaptiveResult:
+    value: float
+    error: float
+    evals: int
+    intervals: int
+    # Верхняя граница: равномерная сетка с шагом самого мелкого отрезка.
+    # Равномерному правилу той же точности обычно хватает меньшего числа
+    # вычислений, так что evals / uniform_evals завышает выигрыш
+    uniform_evals: int
+    converged: bool
+
+
+@_result_cache(*_dataclass_codec(AdaptiveResult))
+def integrate_adaptive(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    *,
+    rtol: float = 1e-10,
+    atol: float = 1e-12,
+    max_evals: int = 100_000,
+    rule: str = "gk15",
+    transform: Optional[str] = None,
+) -> AdaptiveResult:
+    """Адаптивное интегрирование с оценкой погрешности.
+
+    Подотрезки хранятся в куче по оценке ошибки; на каждом шаге отрезок с
+    наибольшей ошибкой делится пополам, пока суммарная ошибка не станет
+    меньше max(atol, rtol·|I|) или не кончится бюджет max_evals.
+    rule: gk15 (Гаусс–Кронрод 7/15) | simpson (Симпсон с Ричардсоном).
+    transform — как в integrate_trapezoidal (gk15 не вычисляет f на концах,
+    поэтому сам по себе особенности на концах не меняет правило).
+    """
+    if rule not in _ADAPTIVE_RULES:
+        raise ValueError("rule должен быть одним из: " + ", ".join(_ADAPTIVE_RULES))
+    if rtol < 0 or atol < 0 or (rtol == 0 and atol == 0):
+        raise ValueError("rtol и atol неотрицательны и не равны нулю одновременно")
+    nodes, estimate = _ADAPTIVE_RULES[rule]
+    cost = len(nodes(0.0, 1.0))
+    if max_evals < cost:
+        raise ValueError(f"max_evals должно быть не меньше {cost}")
+
+    endpoints = (rule == "simpson", rule == "simpson")
+    f, a, b, known = _prepare_interval(func_or_expr, a, b, transform, endpoints)
+
+    stats = _instr.ACTIVE
+    if stats is not None:
+        wall, cpu = time.perf_counter(), time.process_time()
+    first = nodes(a, b)
+    fresh = iter(_eval_points(f, [x for x in first if x not in known]))
+    value, error = estimate(
+        a, b, [known[x] if x in known else next(fresh) for x in first]
+    )
+    evals = cost
+    # Куча по убыванию ошибки; счётчик делает порядок детерминированным
+    heap = [(-error, 0, a, b, value)]
+    total, total_err = value, error
+    counter = 1
+
+    while total_err > max(atol, rtol * abs(total)) and evals + 2 * cost <= max_evals:
+        neg_err, _, lo, hi, val = heapq.heappop(heap)
+        mid = 0.5 * (lo + hi)
+        if not lo < mid < hi:
+            # Отрезок не делится в машинной точности — дальше уточнять нечего
+            heapq.heappush(heap, (neg_err, counter, lo, hi, val))
+            break
+        ys = _eval_points(f, nodes(lo, mid) + nodes(mid, hi))
+        evals += 2 * cost
+        left_val, left_err = estimate(lo, mid, ys[:cost])
+        right_val, right_err = estimate(mid, hi, ys[cost:])
+        heapq.heappush(heap, (-left_err, counter, lo, mid, left_val))
+        heapq.heappush(heap, (-right_err, counter + 1, mid, hi, right_val))
+        counter += 2
+        total += left_val + right_val - val
+        total_err += left_err + right_err + neg_err
+
+    if stats is not None:
+        # Одна запись на весь цикл: замер каждой итерации стоил бы заметно
+        stats.add_phase("refine", time.perf_counter() - wall, time.process_time() - cpu)
+        stats.evals += evals
+
+    # Итог пересчитываем точно: инкрементные поправки накапливают округление
+    total = math.fsum(item[4] for item in heap)
+    total_err = math.fsum(-item[0] for item in heap)
+    min_width = min(abs(item[3] - item[2]) for item in heap)
+    panels = max(1, round(abs(b - a) / min_width)) if min_width else 1
+    return AdaptiveResult(
+        value=total,
+        error=total_err,
+        evals=evals,
+        intervals=len(heap),
+        uniform_evals=cost * panels,
+        converged=total_err <= max(atol, rtol * abs(total)),
+    )
+
+
+def trapezoid_sequence(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    *,
+    n0: int = 1,
+    ends: Optional[Tuple[float, float]] = None,
+) -> Iterator[Tuple[int, float]]:
+    """Бесконечная последовательность (n, T_n) для n = n0, 2·n0, 4·n0, ...
+
+    При удвоении n вычисляются только новые середины отрезков:
+    T_2n = T_n / 2 + h/2 · Σ f(середин), поэтому ранее найденные значения
+    функции не пересчитываются. ends — уже известные (f(a), f(b)).
+    """
+    if n0 <= 0:
+        raise ValueError("n0 должно быть положительным")
     f = _as_callable(func_or_expr)
     a = float(a)
     b = float(b)
-    s = 0.0
-    for _ in range(samples):
-        x = random.uniform(a, b)
-        s += f(x)
-    return (b - a) * (s / float(samples))
+    n = n0
+    h = (b - a) / float(n)
+    if ends is None:
+        _instr.add_evals(2)
+        ends = (f(a), f(b))
+    t, _ = _rule_sum(f, a, h, n, "trapezoid", 0.5 * (ends[0] + ends[1]), False)
+    t *= h
+    while True:
+        yield n, t
+        mids, _ = _rule_sum(f, a, h, n, "midpoint", 0.0, False)
+        t = 0.5 * t + 0.5 * h * mids
+        n *= 2
+        h *= 0.5
+
+
+@dataclass
+class RombergResult:
+    value: float
+    error: float
+    evals: int
+    converged: bool
+    # История сходимости: (n, диагональ таблицы Ромберга, оценка ошибки)
+    history: List[Tuple[int, float, float]]
+
+
+@_result_cache(*_dataclass_codec(RombergResult))
+def integrate_romberg(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    *,
+    rtol: float = 1e-10,
+    atol: float = 1e-12,
+    max_levels: int = 20,
+    min_levels: int = 3,
+    transform: Optional[str] = None,
+) -> RombergResult:
+    """Метод Ромберга: экстраполяция Ричардсона над trapezoid_sequence.
+
+    Уровень k добавляет строку таблицы R[k][j] = R[k][j-1] +
+    (R[k][j-1] - R[k-1][j-1]) / (4^j - 1); ошибка — разность соседних
+    диагональных элементов. Останов — max(atol, rtol·|R|) не раньше
+    min_levels уровней (защита от случайного совпадения на грубых сетках).
+    transform — как в integrate_trapezoidal.
+    """
+    if max_levels < 2 or min_levels < 2 or min_levels > max_levels:
+        raise ValueError("Нужно 2 <= min_levels <= max_levels")
+    if rtol < 0 or atol < 0 or (rtol == 0 and atol == 0):
+        raise ValueError("rtol и atol неотрицательны и не равны нулю одновременно")
+
+    f, a, b, known = _prepare_interval(func_or_expr, a, b, transform, (True, True))
+    ends = (_endpoint_value(f, known, a), _endpoint_value(f, known, b))
+    history: List[Tuple[int, float, float]] = []
+    prev_row: List[float] = []
+    value, error = 0.0, math.inf
+    evals = 0
+    for level, (n, t) in enumerate(trapezoid_sequence(f, a, b, ends=ends)):
+        # Первый уровень — n + 1 узел, каждый следующий — n/2 новых середин
+        evals += n + 1 if level == 0 else n // 2
+        row = [t]
+        for j in range(1, level + 1):
+            factor = 4.0**j
+            row.append(row[j - 1] + (row[j - 1] - prev_row[j - 1]) / (factor - 1.0))
+        if prev_row:
+            error = abs(row[-1] - prev_row[-1])
+        value = row[-1]
+        history.append((n, value, error))
+        prev_row = row
+        done = error <= max(atol, rtol * abs(value))
+        if (done and level + 1 >= min_levels) or level + 1 >= max_levels:
+            break
+
+    return RombergResult(
+        value=value,
+        error=error,
+        evals=evals,
+        converged=error <= max(atol, rtol * abs(value)),
+        history=history,
+    )
+
+
+# Порядок строк таблицы сравнения
+COMPARE_RULES = ("trapezoid", "simpson", "midpoint", "left", "right")
+
+
+@dataclass
+class CompareResult:
+    n: int
+    # Правило → значение и оценка ошибки по Ричардсону; simpson — только при чётном n
+    values: Dict[str, float]
+    errors: Dict[str, float]
+    # Экстраполяция Ричардсона по всем вычисленным значениям
+    extrapolated: float
+    evals: int
+
+
+@_result_cache(*_dataclass_codec(CompareResult))
+def integrate_compare(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    n: int,
+    *,
+    chunk_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    transform: Optional[str] = None,
+) -> CompareResult:
+    """Все правила с фиксированным шагом за одно вычисление f на сетке с шагом h/2.
+
+    Узлы a + i·h (трапеции, Симпсон, левые и правые прямоугольники) и
+    середины (средние прямоугольники) вместе — 2n + 1 вычислений вместо
+    5n + 2 при пяти отдельных запусках. Целые узлы суммируются отдельно по
+    нечётным и чётным i (это середины и внутренние узлы сетки с шагом 2h),
+    поэтому Симпсон собирается из тех же значений.
+
+    Оценки ошибки — по Ричардсону из значений на сетках h и h/2:
+    T_2n = (T_n + M_n)/2, S_2n = (T_n + 2·M_n)/3, L_2n = (L_n + M_n)/2, ...
+    chunk_size, workers и transform — как в integrate_trapezoidal.
+    """
+    if n <= 0:
+        raise ValueError("n должно быть положительным")
+    _check_blocks(chunk_size, workers)
+    f, a, b, known = _prepare_interval(func_or_expr, a, b, transform, (True, True))
+    h = (b - a) / float(n)
+    fa, fb = _endpoint_value(f, known, a), _endpoint_value(f, known, b)
+
+    def inner(step: float, count: int, rule: str) -> float:
+        s, _ = _rule_sum(f, a, step, count, rule, 0.0, False, chunk_size, workers)
+        return s
+
+    mid = inner(h, n, "midpoint")
+    if n % 2 == 0:
+        odd = inner(2.0 * h, n // 2, "midpoint")
+        even = inner(2.0 * h, n // 2, "trapezoid")
+        nodes = odd + even
+    else:
+        nodes = inner(h, n, "trapezoid")
+
+    trap = h * (0.5 * (fa + fb) + nodes)
+    midpoint = h * mid
+    left = h * (fa + nodes)
+    right = h * (nodes + fb)
+    simpson2 = (trap + 2.0 * midpoint) / 3.0
+    values = {"trapezoid": trap, "midpoint": midpoint, "left": left, "right": right}
+    errors = {
+        "trapezoid": abs(midpoint - trap) * 2.0 / 3.0,
+        "midpoint": abs(trap - midpoint) / 3.0,
+        "left": abs(midpoint - left),
+        "right": abs(midpoint - right),
+    }
+    extrapolated = simpson2
+    if n % 2 == 0:
+        simpson = h / 3.0 * (fa + fb + 4.0 * odd + 2.0 * even)
+        values["simpson"] = simpson
+        errors["simpson"] = abs(simpson2 - simpson) * 16.0 / 15.0
+        extrapolated = simpson2 + (simpson2 - simpson) / 15.0
+
+    return CompareResult(
+        n=n,
+        values={rule: values[rule] for rule in COMPARE_RULES if rule in values},
+        errors={rule: errors[rule] for rule in COMPARE_RULES if rule in errors},
+        extrapolated=extrapolated,
+        evals=2 * n + 1,
+    )
 
 
 # Утилита для демонстрации в примерах/CLI
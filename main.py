@@ -5,34 +5,425 @@ CLI для численного интегрирования.
   python main.py --method simpson --expr "exp(x)/(1+exp(2*x))" -a 0 -b 1 -n 100
   python main.py --method trapezoid --expr "sin(x)" -a 0 -b 3.1415926535 -n 1000
   python main.py --method rect --mode midpoint --expr "x**2" -a 0 -b 1 -n 200
+  python main.py --method all --expr "exp(x)/(1+exp(2*x))" -a 0 -b 1 -n 100
+  python main.py --method simpson --expr "exp(x)" -a 0 -b 1 -n auto --tol 1e-10
   python main.py --method mc --expr "exp(x)/(1+exp(2*x))" -a 0 -b 1 --samples 50000
+  python main.py --method mc --sampler sobol -a 0 -b 1 --samples 65536 --seed 1
+  python main.py --method nd --nd-method sparse --expr "sin(x)*exp(y)" -a 0 0 -b 1 2
+  python main.py --batch jobs.jsonl
+  python main.py --data trace.bin --dtype float32 --dx 1e-3 --method simpson
+  python main.py --data trace.bin --cumulative cumulative.bin
+  python main.py --sweep params.csv --method simpson --expr "exp(-y*x)" -a 0 -b 1 -n 200
+  python main.py --method adaptive --expr "sqrt(x)" -a 0 -b 1 --rtol 1e-10
+  python main.py --method romberg --expr "exp(x)/(1+exp(2*x))" -a 0 -b 1 --verbose
+  python main.py --method tanh-sinh --expr "1/sqrt(x)" -a 0 -b 1
+  python main.py --method oscillatory --expr "sin(1000*x)*exp(-x)" -a 0 -b 1
+  python main.py --method simpson --expr "x*exp(-x)" -a 0 -b 2 -n 100 --symbolic 0.5
+  python main.py --method simpson --expr "exp(-x)" -a 0 -b inf -n 200
+  python main.py --method adaptive --expr "exp(-x*x)" -a=-inf -b inf
+  python main.py --method simpson -a 0 -b 1 -n 1000000 --stats --profile out.prof
 """
 
 from __future__ import annotations
 
 import argparse
-from typing import List, Tuple
+import contextlib
+import json
+import sys
+from typing import Any, Iterable
+
+from instrumentation import (
+    Hook,
+    collect,
+    format_text,
+    json_lines_hook,
+    profiled,
+    prometheus_hook,
+)
 
 from integrators import (
     DEFAULT_EXPR,
     Step,
+    StepTrace,
+    StreamedTrace,
+    compile_expr,
+    integrate_adaptive,
+    integrate_compare,
     integrate_monte_carlo,
     integrate_rectangle,
+    integrate_romberg,
     integrate_simpson,
     integrate_trapezoidal,
 )
 
 
-def _print_steps(steps: List[Step]) -> None:
+def _print_steps(steps: Iterable[Step]) -> None:
     print(f"{'i':>6} {'x':>16} {'term':>16} {'s':>16}")
+    if isinstance(steps, (StepTrace, StreamedTrace)):
+        # Столбцы форматируются блоком, без объекта Step на каждый узел
+        sys.stdout.flush()
+        steps.write_table(sys.stdout)
+        return
     for st in steps:
         print(f"{st.i:>6d} {st.x:>16.8f} {st.term:>16.8f} {st.s:>16.8f}")
 
 
+def _emit_steps(args: argparse.Namespace, steps: Iterable[Step]) -> None:
+    """Печать шагов (--verbose) и/или запись в файл (--trace .csv|.npy|.bin)."""
+    if args.trace is not None:
+        path = args.trace.lower()
+        if path.endswith(".csv"):
+            steps.to_csv(args.trace)
+        elif path.endswith(".npy"):
+            steps.to_npy(args.trace)
+        else:
+            steps.to_binary(args.trace)
+    if args.verbose:
+        _print_steps(steps)
+
+
+def _run_batch(path: str, fmt: str | None) -> None:
+    from batch import iter_many, read_jobs
+
+    if fmt is None:
+        fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        # Результат печатается, как только готова группа заданий
+        for _, result in iter_many(read_jobs(stream, fmt)):
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _run_data(args: argparse.Namespace) -> None:
+    import numpy as np
+
+    from tabulated import integrate_csv, integrate_samples, open_samples
+
+    method = args.method or "trapezoid"
+    if method not in {"trapezoid", "simpson"}:
+        raise SystemExit("Для --data поддерживаются --method trapezoid и simpson")
+    chunk = {"chunk_size": args.chunk_size} if args.chunk_size else {}
+    is_csv = args.data.lower().endswith(".csv")
+    if not is_csv:
+        y, x = open_samples(args.data, args.dtype, columns=args.data_columns)
+
+    if args.cumulative is not None:
+        if is_csv:
+            out = integrate_csv(args.data, dx=args.dx, method="cumulative", **chunk)
+            np.asarray(out, dtype=float).tofile(args.cumulative)
+        else:
+            # Накопленный интеграл пишется блоками прямо в файл
+            out = np.memmap(args.cumulative, dtype=float, mode="w+", shape=(len(y),))
+            integrate_samples(y, x, dx=args.dx, method="cumulative", out=out, **chunk)
+        print(f"Cumulative integral written: {args.cumulative} ({len(out)} values)")
+        if len(out):
+            print(f"Integral (cumulative/trapezoid): {float(out[-1])}")
+        return
+
+    if is_csv:
+        val = integrate_csv(args.data, dx=args.dx, method=method, **chunk)
+    else:
+        val = integrate_samples(y, x, dx=args.dx, method=method, **chunk)
+    print(f"Integral (data/{method}): {val}")
+
+
+def _run_sweep(args: argparse.Namespace) -> None:
+    """--sweep: интегралы для всех наборов параметров из CSV, таблица CSV в stdout."""
+    from sweep import integrate_sweep, read_params, write_table
+
+    if args.method not in {"trapezoid", "simpson", "rect"}:
+        raise SystemExit(
+            "Для --sweep поддерживаются --method trapezoid, simpson и rect"
+        )
+    if args.sweep == "-":
+        params = read_params(sys.stdin)
+    else:
+        with open(args.sweep, encoding="utf-8", newline="") as stream:
+            params = read_params(stream)
+    values = integrate_sweep(
+        args.expr,
+        args.a,
+        args.b,
+        params,
+        args.mode if args.method == "rect" else args.method,
+        args.n,
+        chunk_size=args.chunk_size,
+    )
+    write_table(sys.stdout, params, values)
+
+
+def _stats_hook(fmt: str) -> Hook:
+    """Хук для --stats: сводка в stderr в выбранном формате."""
+    if fmt == "json":
+        return json_lines_hook(sys.stderr)
+    if fmt == "prometheus":
+        return prometheus_hook(sys.stderr)
+    return lambda stats: print(format_text(stats), file=sys.stderr)
+
+
+def _run_symbolic(args: argparse.Namespace) -> bool:
+    """--symbolic: печатает точное значение, если SymPy нашёл его в срок."""
+    if args.method == "nd":
+        return False
+    from integrand_utils import symbolic_integral
+
+    # sympify вычисляет текст через eval: сначала та же проверка белым
+    # списком, что и у численных методов
+    compile_expr(args.expr)
+    val = symbolic_integral(args.expr, args.a, args.b, timeout=args.symbolic)
+    if val is None:
+        print(
+            f"No closed form within {args.symbolic:g} s, using --method {args.method}",
+            file=sys.stderr,
+        )
+        return False
+    print(f"Integral (symbolic): {val}")
+    return True
+
+
+def _n_arg(text: str) -> int | str:
+    return text if text == "auto" else int(text)
+
+
+def _choose_n(args: argparse.Namespace) -> None:
+    """-n auto: печатает выбранное n и оценку, по которой оно выбрано.
+
+    Выбор запоминается в error_bounds, и интегратор с n="auto" берёт его
+    вместе с подготовленным отрезком, а не считает заново.
+    """
+    from error_bounds import choose_n
+
+    rule = args.mode if args.method == "rect" else args.method
+    choice = choose_n(
+        args.expr, args.a, args.b, rule, args.tol, transform=args.transform
+    )
+    print(
+        f"Chosen n: {choice.n} (error bound {choice.bound:.3e}, "
+        f"max|f^({choice.order})| ~ {choice.derivative_max:.6g}, "
+        f"{choice.source}, sampled on a grid)"
+    )
+
+
+def _run_method(args: argparse.Namespace, cache: Any) -> None:
+    tol = None
+    if args.n == "auto":
+        _choose_n(args)
+        tol = args.tol
+    if args.method == "trapezoid":
+        val, steps = integrate_trapezoidal(
+            args.expr,
+            args.a,
+            args.b,
+            args.n,
+            verbose=args.verbose or args.trace is not None,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            transform=args.transform,
+            tol=tol,
+            accumulator=args.accumulator,
+            precision=args.precision,
+            cache=cache,
+        )
+        print(f"Integral (trapezoid): {val}")
+        _emit_steps(args, steps)
+    elif args.method == "simpson":
+        val, steps = integrate_simpson(
+            args.expr,
+            args.a,
+            args.b,
+            args.n,
+            verbose=args.verbose or args.trace is not None,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            transform=args.transform,
+            tol=tol,
+            accumulator=args.accumulator,
+            precision=args.precision,
+            cache=cache,
+        )
+        print(f"Integral (simpson): {val}")
+        _emit_steps(args, steps)
+    elif args.method == "rect":
+        val, steps = integrate_rectangle(
+            args.expr,
+            args.a,
+            args.b,
+            args.n,
+            mode=args.mode,
+            verbose=args.verbose or args.trace is not None,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            transform=args.transform,
+            tol=tol,
+            accumulator=args.accumulator,
+            precision=args.precision,
+            cache=cache,
+        )
+        print(f"Integral (rect/{args.mode}): {val}")
+        _emit_steps(args, steps)
+    elif args.method == "all":
+        res = integrate_compare(
+            args.expr,
+            args.a,
+            args.b,
+            args.n,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            transform=args.transform,
+            cache=cache,
+        )
+        print(f"{'method':<10} {'value':>22} {'error est.':>12}")
+        for rule, value in res.values.items():
+            print(f"{rule:<10} {value:>22.16f} {res.errors[rule]:>12.3e}")
+        if "simpson" not in res.values:
+            print("simpson: skipped, n is odd")
+        print(f"Richardson extrapolation: {res.extrapolated}")
+        # Отдельно: трапеции и Симпсон по n + 1 узлу, три прямоугольника по n
+        print(f"Evaluations: {res.evals} (separate runs: {5 * args.n + 2})")
+    elif args.method == "adaptive":
+        res = integrate_adaptive(
+            args.expr,
+            args.a,
+            args.b,
+            rtol=args.rtol,
+            atol=args.atol,
+            max_evals=args.max_evals,
+            rule=args.rule,
+            transform=args.transform,
+            cache=cache,
+        )
+        print(f"Integral (adaptive/{args.rule}): {res.value}")
+        print(f"Error estimate: {res.error:.3e}")
+        print(f"Evaluations: {res.evals} (intervals: {res.intervals})")
+        if not res.converged:
+            print("Warning: tolerance not reached, --max-evals budget exhausted")
+        if args.n is not None:
+            fixed = args.n + 1
+            print(f"Saved vs fixed-n run: {fixed - res.evals} of {fixed} evaluations")
+        else:
+            # Не равноточная равномерная сетка, а потолок: шаг самого мелкого отрезка
+            print(
+                f"Uniform grid at finest panel width (upper bound): "
+                f"{res.uniform_evals} evaluations"
+            )
+    elif args.method == "romberg":
+        res = integrate_romberg(
+            args.expr,
+            args.a,
+            args.b,
+            rtol=args.rtol,
+            atol=args.atol,
+            max_levels=args.max_levels,
+            transform=args.transform,
+            cache=cache,
+        )
+        print(f"Integral (romberg): {res.value}")
+        print(f"Error estimate: {res.error:.3e}")
+        print(f"Evaluations: {res.evals}")
+        if not res.converged:
+            print("Warning: tolerance not reached, --max-levels exhausted")
+        if args.verbose:
+            print(f"{'n':>10} {'R[k][k]':>22} {'error':>12}")
+            for n, value, error in res.history:
+                print(f"{n:>10d} {value:>22.16f} {error:>12.3e}")
+    elif args.method == "tanh-sinh":
+        from transforms import integrate_tanh_sinh
+
+        res = integrate_tanh_sinh(
+            args.expr,
+            args.a,
+            args.b,
+            rtol=args.rtol,
+            atol=args.atol,
+            max_levels=min(args.max_levels, 12),
+            cache=cache,
+        )
+        print(f"Integral (tanh-sinh): {res.value}")
+        print(f"Error estimate: {res.error:.3e}")
+        print(f"Evaluations: {res.evals} (levels: {res.levels})")
+        if not res.converged:
+            print("Warning: tolerance not reached, --max-levels exhausted")
+    elif args.method == "oscillatory":
+        from oscillatory import integrate_oscillatory
+
+        res = integrate_oscillatory(
+            args.expr,
+            args.a,
+            args.b,
+            omega=args.omega,
+            kind=args.kind,
+            rtol=args.rtol,
+            atol=args.atol,
+            cache=cache,
+        )
+        if res.method == "filon":
+            print(f"Integral (oscillatory/filon, omega={res.omega:g}): {res.value}")
+        else:
+            print("No sin/cos(w*x) factor found, using adaptive", file=sys.stderr)
+            print(f"Integral (oscillatory/adaptive): {res.value}")
+        print(f"Error estimate: {res.error:.3e}")
+        print(f"Evaluations: {res.evals}")
+        if not res.converged:
+            print("Warning: tolerance not reached")
+    elif args.method == "nd":
+        from multidim import integrate_nd
+
+        res = integrate_nd(
+            args.expr,
+            list(zip(args.a, args.b)),
+            method=args.nd_method,
+            n=args.n if args.n is not None else 20,
+            level=args.level,
+            samples=args.samples,
+            seed=args.seed,
+            replicates=args.replicates,
+            chunk_size=args.chunk_size,
+            cache=cache,
+        )
+        print(f"Integral (nd/{args.nd_method}, {len(args.a)}D): {res.value}")
+        if res.error is not None:
+            print(f"Standard error: {res.error:.3e}")
+        print(f"Evaluations: {res.evals}")
+    else:  # mc
+        res = integrate_monte_carlo(
+            args.expr,
+            args.a,
+            args.b,
+            samples=args.samples,
+            seed=args.seed,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            sampler=args.sampler,
+            replicates=args.replicates,
+            accumulator=args.accumulator,
+            precision=args.precision,
+            cache=cache,
+        )
+        print(f"Integral (monte-carlo/{args.sampler}): {res.value}")
+        print(f"Standard error: {res.stderr:.3e}")
+        print(f"95% CI: [{res.ci[0]}, {res.ci[1]}]")
+
+
 def main() -> None:
     p = argparse.ArgumentParser(description="Численное интегрирование")
     p.add_argument(
-        "--method", choices=["trapezoid", "simpson", "rect", "mc"], required=True
+        "--method",
+        choices=[
+            "trapezoid",
+            "simpson",
+            "rect",
+            "mc",
+            "adaptive",
+            "romberg",
+            "tanh-sinh",
+            "oscillatory",
+            "nd",
+            "all",
+        ],
+        help="all — все правила с фиксированным шагом за одно вычисление f",
     )
     p.add_argument(
         "--expr",
@@ -40,11 +431,28 @@ def main() -> None:
         default=DEFAULT_EXPR,
         help="Выражение f(x) или используйте свой callable",
     )
-    p.add_argument("-a", type=float, required=True, help="Нижний предел интегрирования")
     p.add_argument(
-        "-b", type=float, required=True, help="Верхний предел интегрирования"
+        "-a",
+        type=float,
+        nargs="+",
+        help="Нижний предел интегрирования (для nd — по одному на x, y, z)",
+    )
+    p.add_argument(
+        "-b",
+        type=float,
+        nargs="+",
+        help="Верхний предел интегрирования (для nd — по одному на x, y, z); "
+        "допускается inf (отрицательный предел: -a=-inf)",
+    )
+    p.add_argument(
+        "-n",
+        type=_n_arg,
+        help="Число разбиений (для trapezoid/simpson/rect); auto — наименьшее n "
+        "с оценкой ошибки не больше --tol",
+    )
+    p.add_argument(
+        "--tol", type=float, default=1e-8, help="Допустимая ошибка для -n auto"
     )
-    p.add_argument("-n", type=int, help="Число разбиений (для trapezoid/simpson/rect)")
     p.add_argument(
         "--mode",
         choices=["left", "right", "midpoint"],
@@ -54,37 +462,213 @@ def main() -> None:
     p.add_argument(
         "--samples", type=int, default=10000, help="Число выборок для Монте‑Карло"
     )
+    p.add_argument("--seed", type=int, help="Зерно генератора для Монте‑Карло")
+    p.add_argument(
+        "--sampler",
+        choices=["random", "sobol", "halton", "antithetic", "stratified", "control"],
+        default="random",
+        help="Выборка для Монте‑Карло (квази‑МК и понижение дисперсии)",
+    )
+    p.add_argument(
+        "--replicates",
+        type=int,
+        default=16,
+        help="Число независимых рандомизаций (sampler != random)",
+    )
+    p.add_argument(
+        "--accumulator",
+        choices=["naive", "neumaier", "pairwise"],
+        help="Сложение значений (trapezoid/simpson/rect/mc); по умолчанию np.sum "
+        "с NumPy и math.fsum без него",
+    )
+    p.add_argument(
+        "--precision",
+        choices=["float64", "float32"],
+        default="float64",
+        help="Тип вычисления f (float32 — с накоплением в float64, нужен NumPy)",
+    )
+    p.add_argument(
+        "--rule",
+        choices=["gk15", "simpson"],
+        default="gk15",
+        help="Правило оценки подотрезка для adaptive",
+    )
+    p.add_argument(
+        "--rtol", type=float, default=1e-10, help="Относительная точность (adaptive)"
+    )
+    p.add_argument(
+        "--atol", type=float, default=1e-12, help="Абсолютная точность (adaptive)"
+    )
+    p.add_argument(
+        "--max-evals",
+        type=int,
+        default=100_000,
+        help="Бюджет вычислений функции (adaptive)",
+    )
+    p.add_argument("--max-levels", type=int, default=20, help="Число уровней (romberg)")
+    p.add_argument(
+        "--transform",
+        choices=["rational", "tanh-sinh"],
+        help="Замена переменной (по умолчанию — сама при бесконечном пределе "
+        "или особенности на конце)",
+    )
+    p.add_argument(
+        "--omega",
+        type=float,
+        help="Частота для oscillatory: --expr — амплитуда g(x), множитель "
+        "sin/cos(omega*x) задаётся --kind (без --omega множитель ищется в --expr)",
+    )
+    p.add_argument(
+        "--kind",
+        choices=["sin", "cos"],
+        default="sin",
+        help="Осциллирующий множитель при --omega",
+    )
+    p.add_argument(
+        "--symbolic",
+        nargs="?",
+        type=float,
+        const=1.0,
+        metavar="SECONDS",
+        help="Сначала искать точный интеграл SymPy (бюджет в секундах, по "
+        "умолчанию 1); численный метод — только если его нет",
+    )
+    p.add_argument(
+        "--nd-method",
+        choices=["simpson", "gauss", "sparse", "mc", "sobol", "halton"],
+        default="simpson",
+        help="Правило для nd",
+    )
+    p.add_argument(
+        "--level", type=int, default=6, help="Уровень разреженной сетки (nd/sparse)"
+    )
+    p.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Пакетный режим: задания JSONL/CSV из файла или '-' (stdin)",
+    )
+    p.add_argument(
+        "--batch-format",
+        choices=["jsonl", "csv"],
+        help="Формат заданий (по умолчанию — по расширению файла)",
+    )
+    p.add_argument(
+        "--data",
+        metavar="FILE",
+        help="Интегрировать отсчёты из файла: двоичного (y или пары x, y) или CSV",
+    )
+    p.add_argument(
+        "--dtype", default="float64", help="Тип значений двоичного файла (--data)"
+    )
+    p.add_argument(
+        "--data-columns",
+        type=int,
+        choices=[1, 2],
+        default=1,
+        help="1 — в файле только y, 2 — пары x, y (--data)",
+    )
+    p.add_argument(
+        "--dx", type=float, default=1.0, help="Шаг сетки, если x не задан (--data)"
+    )
+    p.add_argument(
+        "--cumulative",
+        metavar="OUT",
+        help="Записать накопленный интеграл (float64) в двоичный файл (--data)",
+    )
+    p.add_argument(
+        "--sweep",
+        metavar="FILE",
+        help="Серия по параметрам: CSV со столбцами y и/или z (или '-' — stdin); "
+        "печатает CSV с интегралом для каждой строки",
+    )
+    p.add_argument(
+        "--cache",
+        metavar="DB",
+        help="Файл SQLite с кэшем результатов (кроме --batch, --sweep и --data)",
+    )
     p.add_argument("--verbose", action="store_true", help="Печатать таблицу шагов")
+    p.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Записать таблицу шагов в .csv, .npy или двоичный файл (записи i, x, term, s)",
+    )
+    p.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Считать блоками по столько узлов (память не зависит от n)",
+    )
+    p.add_argument(
+        "--workers", type=int, help="Число процессов для параллельного счёта блоков"
+    )
+    p.add_argument(
+        "--stats",
+        nargs="?",
+        const="text",
+        choices=["text", "json", "prometheus"],
+        help="Печатать в stderr счётчики вычислений и время по фазам",
+    )
+    p.add_argument(
+        "--profile",
+        metavar="OUT",
+        help="Профилировать запуск cProfile и сохранить профиль в файл",
+    )
 
     args = p.parse_args()
 
-    if args.method in {"trapezoid", "simpson", "rect"} and (args.n is None):
-        p.error("Для выбранного метода требуется параметр -n")
+    if args.batch is None and args.data is None:
+        if args.method is None or args.a is None or args.b is None:
+            p.error("Требуются параметры --method, -a и -b (или --batch, --data)")
+        if len(args.a) != len(args.b):
+            p.error("Число нижних (-a) и верхних (-b) пределов должно совпадать")
+        if args.method == "nd":
+            if len(args.a) > 3:
+                p.error("Для nd поддерживается не более трёх переменных (x, y, z)")
+        elif len(args.a) != 1:
+            p.error("Для одномерных методов нужен один предел -a и один -b")
+        else:
+            args.a, args.b = args.a[0], args.b[0]
 
-    if args.method == "trapezoid":
-        val, steps = integrate_trapezoidal(
-            args.expr, args.a, args.b, args.n, verbose=args.verbose
-        )
-        print(f"Integral (trapezoid): {val}")
-        if args.verbose:
-            _print_steps(steps)
-    elif args.method == "simpson":
-        val, steps = integrate_simpson(
-            args.expr, args.a, args.b, args.n, verbose=args.verbose
-        )
-        print(f"Integral (simpson): {val}")
-        if args.verbose:
-            _print_steps(steps)
-    elif args.method == "rect":
-        val, steps = integrate_rectangle(
-            args.expr, args.a, args.b, args.n, mode=args.mode, verbose=args.verbose
+        if args.method in {"trapezoid", "simpson", "rect", "all"} and args.n is None:
+            p.error("Для выбранного метода требуется параметр -n")
+        if args.n == "auto" and args.method not in {"trapezoid", "simpson", "rect"}:
+            p.error("-n auto поддерживается для trapezoid, simpson и rect")
+        if args.n == "auto" and args.sweep is not None:
+            p.error("Для --sweep нужно явное -n: оценка ошибки зависит от параметров")
+
+    if args.cache is not None:
+        # Пакеты, серии и табличные данные считаются в обход integrate_*
+        for flag in ("batch", "sweep", "data"):
+            if getattr(args, flag) is not None:
+                p.error(f"--cache не поддерживается вместе с --{flag}")
+
+    cache = None
+    if args.cache is not None:
+        from result_cache import ResultCache
+
+        cache = ResultCache(args.cache)
+
+    with contextlib.ExitStack() as stack:
+        if args.profile is not None:
+            stack.enter_context(profiled(args.profile))
+        if args.stats is not None:
+            stack.enter_context(collect(_stats_hook(args.stats)))
+        if args.batch is not None:
+            _run_batch(args.batch, args.batch_format)
+        elif args.data is not None:
+            _run_data(args)
+        elif args.sweep is not None:
+            _run_sweep(args)
+        elif args.symbolic is None or not _run_symbolic(args):
+            _run_method(args, cache)
+
+    if cache is not None:
+        stats = cache.stats()
+        print(
+            f"Cache: hits={stats['hits']} misses={stats['misses']} "
+            f"entries={stats['entries']}",
+            file=sys.stderr,
         )
-        print(f"Integral (rect/{args.mode}): {val}")
-        if args.verbose:
-            _print_steps(steps)
-    else:  # mc
-        val = integrate_monte_carlo(args.expr, args.a, args.b, samples=args.samples)
-        print(f"Integral (monte-carlo): {val}")
+        cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,253 @@
+"""
+Многомерное интегрирование f(x[, y, z]) по прямоугольному параллелепипеду.
+
+Правила: тензорные Симпсон и Гаусс–Лежандр, разреженная сетка Смоляка на
+вложенных правилах Кленшоу–Кертиса, Монте‑Карло и квази‑Монте‑Карло
+(Соболь/Холтон). Подынтегральная функция вычисляется векторно на плоских
+массивах узлов блоками по chunk_size точек, а не поточечно. Требуется NumPy.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from itertools import product
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import qmc
+from gauss_quadrature import gauss_nodes
+from integrators import (
+    _DEFAULT_BLOCK,
+    FuncOrExpr,
+    Number,
+    _as_callable,
+    _combine_moments,
+    _dataclass_codec,
+    _result_cache,
+)
+
+# Переменные выражения по порядку измерений
+_VARIABLES = ("x", "y", "z")
+
+_ND_METHODS = ("simpson", "gauss", "sparse", "mc", "sobol", "halton")
+_ND_SAMPLING = ("mc", "sobol", "halton")
+
+
+@dataclass
+class NDResult:
+    value: float
+    # Оценка ошибки: стандартная ошибка для выборочных методов, иначе None
+    error: Optional[float]
+    evals: int
+
+
+def _eval_nd(f: Callable[..., float], cols: List[np.ndarray]) -> np.ndarray:
+    """Значения f в точках, заданных столбцами координат (векторно, если можно)."""
+    eval_array = getattr(f, "eval_array", None)
+    try:
+        ys = np.asarray(eval_array(*cols) if eval_array else f(*cols), dtype=float)
+    except Exception:
+        ys = None
+    if ys is None or ys.shape != cols[0].shape:
+        ys = np.fromiter(
+            (f(*map(float, point)) for point in zip(*cols)),
+            dtype=float,
+            count=len(cols[0]),
+        )
+    return ys
+
+
+def _simpson_1d(a: float, b: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    if n <= 0 or n % 2 != 0:
+        raise ValueError("Для метода Симпсона n должно быть положительным чётным")
+    h = (b - a) / n
+    idx = np.arange(n + 1)
+    nodes = a + idx * h
+    nodes[-1] = b
+    weights = np.where(idx % 2 == 1, 4.0, 2.0)
+    weights[0] = weights[-1] = 1.0
+    return nodes, weights * (h / 3.0)
+
+
+def _gauss_1d(a: float, b: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    t, w = gauss_nodes("legendre", n)
+    half = 0.5 * (b - a)
+    return a + half * (t + 1.0), half * w
+
+
+def _tensor_sum(
+    f: Callable[..., float],
+    rules: List[Tuple[np.ndarray, np.ndarray]],
+    chunk_size: int,
+) -> Tuple[float, int]:
+    """Σ w·f по тензорной сетке, перебираемой плоскими блоками точек."""
+    shape = tuple(len(nodes) for nodes, _ in rules)
+    total = int(np.prod(shape))
+    acc = 0.0
+    for start in range(0, total, chunk_size):
+        flat = np.arange(start, min(start + chunk_size, total))
+        multi = np.unravel_index(flat, shape)
+        cols = [nodes[i] for (nodes, _), i in zip(rules, multi)]
+        weights = np.prod([w[i] for (_, w), i in zip(rules, multi)], axis=0)
+        acc += float(np.dot(weights, _eval_nd(f, cols)))
+    return acc, total
+
+
+def _clenshaw_curtis(level: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Вложенное правило Кленшоу–Кертиса уровня level на [-1, 1]."""
+    if level == 1:
+        return np.zeros(1), np.full(1, 2.0)
+    m = 2 ** (level - 1)
+    theta = np.pi * np.arange(m + 1) / m
+    weights = np.ones(m + 1)
+    for j in range(1, m // 2 + 1):
+        bj = 1.0 if 2 * j == m else 2.0
+        weights -= bj * np.cos(2 * j * theta) / (4 * j * j - 1)
+    weights *= 2.0 / m
+    weights[0] /= 2.0
+    weights[-1] /= 2.0
+    # Узлы строятся симметрично с точным нулём в центре: cos(π/2) ≠ 0 в
+    # плавающей точке, и центр не совпал бы с узлом 0.0 уровня 1. Левая
+    # половина -cos(πk/m) побитово совпадает с узлами других уровней
+    half = m // 2
+    nodes = np.zeros(m + 1)
+    nodes[:half] = -np.cos(theta[:half])
+    nodes[half + 1 :] = -nodes[:half][::-1]
+    return nodes, weights
+
+
+def _smolyak_grid(dim: int, level: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Узлы (k, dim) на [-1, 1]^dim и веса разреженной сетки (комбинационная техника).
+
+    Совпадающие узлы разных тензорных сеток объединяются: вложенные правила
+    дают побитово одинаковые координаты (см. _clenshaw_curtis), так что
+    каждая точка вычисляется один раз.
+    """
+    q = level + dim - 1
+    points, weights = [], []
+    for multi in product(range(1, level + 1), repeat=dim):
+        norm = sum(multi)
+        if not q - dim + 1 <= norm <= q:
+            continue
+        coeff = (-1) ** (q - norm) * math.comb(dim - 1, q - norm)
+        rules = [_clenshaw_curtis(lv) for lv in multi]
+        mesh = np.meshgrid(*[nodes for nodes, _ in rules], indexing="ij")
+        wmesh = np.meshgrid(*[w for _, w in rules], indexing="ij")
+        points.append(np.column_stack([m.ravel() for m in mesh]))
+        weights.append(coeff * np.prod([w.ravel() for w in wmesh], axis=0))
+    unique, inverse = np.unique(np.vstack(points), axis=0, return_inverse=True)
+    merged = np.bincount(inverse.ravel(), weights=np.concatenate(weights))
+    return unique, merged
+
+
+@_result_cache(
+    *_dataclass_codec(NDResult),
+    cacheable=lambda params: params["method"] not in _ND_SAMPLING
+    or params["seed"] is not None,
+)
+def integrate_nd(
+    func_or_expr: FuncOrExpr,
+    bounds: Sequence[Tuple[Number, Number]],
+    *,
+    method: str = "simpson",
+    n: int = 20,
+    level: int = 6,
+    samples: int = 100_000,
+    seed: Optional[int] = None,
+    replicates: int = 16,
+    chunk_size: Optional[int] = None,
+) -> NDResult:
+    """Интеграл f по параллелепипеду bounds = [(a_x, b_x), (a_y, b_y), ...].
+
+    Переменные — x, y, z по порядку (1–3 измерения); функция-callable
+    получает столько же аргументов.
+    method: simpson (n отрезков по оси, n чётное) | gauss (n узлов по оси) |
+    sparse (Смоляк уровня level) | mc (samples точек) | sobol | halton
+    (samples точек в replicates рандомизациях равного размера — samples
+    должно делиться на replicates; ошибка — по их разбросу).
+    """
+    dim = len(bounds)
+    if not 1 <= dim <= len(_VARIABLES):
+        raise ValueError("Поддерживаются от 1 до 3 измерений (x, y, z)")
+    if method not in _ND_METHODS:
+        raise ValueError("method должен быть одним из: " + ", ".join(_ND_METHODS))
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size должно быть положительным")
+    lows = np.array([float(lo) for lo, _ in bounds])
+    highs = np.array([float(hi) for _, hi in bounds])
+    if not (np.all(np.isfinite(lows)) and np.all(np.isfinite(highs))):
+        raise ValueError("Пределы должны быть конечными")
+    f = _as_callable(func_or_expr)
+    block = chunk_size or _DEFAULT_BLOCK
+    volume = float(np.prod(highs - lows))
+
+    if method in ("simpson", "gauss"):
+        build = _simpson_1d if method == "simpson" else _gauss_1d
+        rules = [build(lo, hi, n) for lo, hi in zip(lows, highs)]
+        value, evals = _tensor_sum(f, rules, block)
+        return NDResult(value=value, error=None, evals=evals)
+
+    if method == "sparse":
+        if level < 1:
+            raise ValueError("level должно быть положительным")
+        nodes, weights = _smolyak_grid(dim, level)
+        half = 0.5 * (highs - lows)
+        value = 0.0
+        for start in range(0, len(nodes), block):
+            chunk = lows + half * (nodes[start : start + block] + 1.0)
+            ys = _eval_nd(f, list(chunk.T))
+            value += float(np.dot(weights[start : start + block], ys))
+        return NDResult(
+            value=value * float(np.prod(half)), error=None, evals=len(nodes)
+        )
+
+    if samples <= 0:
+        raise ValueError("samples должно быть положительным")
+    if method == "mc":
+        sizes = [min(block, samples - s) for s in range(0, samples, block)]
+        moments = None
+        for m, stream in zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes))):
+            u = np.random.default_rng(stream).random((m, dim))
+            ys = _eval_nd(f, list((lows + (highs - lows) * u).T))
+            mean = float(np.mean(ys))
+            block_moments = (m, mean, float(np.sum((ys - mean) ** 2)))
+            moments = (
+                block_moments
+                if moments is None
+                else _combine_moments(moments, block_moments)
+            )
+        count, mean, m2 = moments
+        stderr = math.sqrt(m2 / (count - 1) / count) if count > 1 else math.inf
+        return NDResult(value=volume * mean, error=abs(volume) * stderr, evals=count)
+
+    # sobol / halton: независимые рандомизации одной последовательности
+    if replicates < 2 or samples < replicates:
+        raise ValueError("Нужно 2 <= replicates <= samples")
+    if samples % replicates:
+        raise ValueError("samples должно делиться на replicates без остатка")
+    m = samples // replicates
+    means = []
+    for stream in np.random.SeedSequence(seed).spawn(replicates):
+        rng = np.random.default_rng(stream)
+        if method == "sobol":
+            scramble = qmc.sobol_scramble(dim, rng)
+        else:
+            shift = rng.random(dim)
+        acc = 0.0
+        for start in range(0, m, block):
+            count = min(block, m - start)
+            if method == "sobol":
+                u = qmc.sobol_points(start, count, dim, scramble)
+            else:
+                u = qmc.halton_points(start, count, dim, shift)
+            acc += float(np.sum(_eval_nd(f, list((lows + (highs - lows) * u).T))))
+        means.append(acc / m)
+    mean = math.fsum(means) / replicates
+    var_of_mean = math.fsum((v - mean) ** 2 for v in means) / (replicates - 1)
+    return NDResult(
+        value=volume * mean,
+        error=abs(volume) * math.sqrt(var_of_mean / replicates),
+        evals=m * replicates,
+    )
@@ -1,13 +1,20 @@
 import numpy as np
 
+from tabulated import integrate_samples
+
 
 def main() -> None:
     # Demo arrays
     x = np.array([0.3, 0.7, 0.9, 1.4, 1.7, 1.9, 2.3, 2.6])
     y = np.array([-4.3, -1.6, 0.4, 0.9, 1.2, 1.4, 1.5, 1.5])
 
-    integral = float(np.trapz(y, x))
-    print(f"Integral (np.trapz): {integral}")
+    # np.trapz убран в NumPy 2.x: его замена — np.trapezoid
+    trapezoid = getattr(np, "trapezoid", None) or np.trapz
+    integral = float(trapezoid(y, x))
+    print(f"Integral (np.{trapezoid.__name__}): {integral}")
+    # То же блоками (годится для np.memmap) и Симпсоном по неравномерной сетке
+    print(f"Integral (integrate_samples): {integrate_samples(y, x)}")
+    print(f"Integral (simpson): {integrate_samples(y, x, method='simpson')}")
 
 
 if __name__ == "__main__":
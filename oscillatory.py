@@ -0,0 +1,288 @@
+"""
+Квадратура Филона для быстро осциллирующих функций g(x)·sin(ω·x + φ).
+
+Правила Симпсона и трапеций требуют нескольких узлов на период, и n
+растёт вместе с ω. Квадратура Филона интерполирует на панелях из двух
+отрезков только гладкую амплитуду g (квадратичной параболой), а
+произведение параболы на e^{iωx} интегрирует точно — через моменты
+μ_k(θ) = ∫_{-1}^{1} t^k e^{iθt} dt, θ = ω·h. Число узлов зависит от
+гладкости g, а не от ω.
+
+find_oscillation ищет в проверенном AST выражения множитель sin или cos
+с линейным по x аргументом; integrate_oscillatory считает по Филону,
+если множитель найден или частота задана явно (omega=), а иначе —
+обычным integrate_adaptive.
+"""
+
+from __future__ import annotations
+
+import ast
+import cmath
+import copy
+import math
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from integrators import (
+    _ALLOWED_NAMES,
+    FuncOrExpr,
+    Number,
+    _as_callable,
+    _dataclass_codec,
+    _eval_points,
+    _result_cache,
+    compile_expr,
+    integrate_adaptive,
+    np,
+)
+
+# Ниже этого θ моменты считаются рядом Тейлора: в явных формулах
+# деление на θ³ съедает точность
+_SERIES_THETA = 1.0
+_SERIES_TERMS = 24
+
+
+@dataclass
+class Oscillation:
+    """f(x) = amplitude(x) · kind(omega·x + phase)."""
+
+    kind: str  # sin | cos
+    omega: float
+    phase: float
+    amplitude: str
+
+
+@dataclass
+class OscillatoryResult:
+    value: float
+    error: float
+    evals: int
+    method: str  # filon | adaptive
+    omega: Optional[float]
+    converged: bool
+
+
+def _linear(node: ast.AST) -> Optional[Tuple[float, float]]:
+    """(k, c), если узел — k·x + c с числовыми k и c, иначе None."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return 0.0, float(node.value)
+    if isinstance(node, ast.Name):
+        if node.id == "x":
+            return 1.0, 0.0
+        value = _ALLOWED_NAMES.get(node.id)
+        return (0.0, float(value)) if isinstance(value, float) else None
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        inner = _linear(node.operand)
+        if inner is None or isinstance(node.op, ast.UAdd):
+            return inner
+        return -inner[0], -inner[1]
+    if not isinstance(node, ast.BinOp):
+        return None
+    left, right = _linear(node.left), _linear(node.right)
+    if left is None or right is None:
+        return None
+    (k1, c1), (k2, c2) = left, right
+    if isinstance(node.op, ast.Add):
+        return k1 + k2, c1 + c2
+    if isinstance(node.op, ast.Sub):
+        return k1 - k2, c1 - c2
+    if isinstance(node.op, ast.Mult) and (k1 == 0 or k2 == 0):
+        return k1 * c2 + k2 * c1, c1 * c2
+    if isinstance(node.op, ast.Div) and k2 == 0 and c2 != 0:
+        return k1 / c2, c1 / c2
+    if isinstance(node.op, ast.Pow) and k1 == 0 and k2 == 0:
+        try:
+            return 0.0, float(c1**c2)
+        except (ArithmeticError, TypeError):
+            return None
+    return None
+
+
+def _factors(node: ast.AST) -> Iterator[ast.Call]:
+    """Вызовы sin/cos, входящие в выражение множителем (через *, / и унарный −)."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        if node.func.id in ("sin", "cos") and len(node.args) == 1:
+            yield node
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+        yield from _factors(node.left)
+        yield from _factors(node.right)
+    elif isinstance(node, ast.BinOp) and isinstance(node.op, ast.Div):
+        yield from _factors(node.left)
+    elif isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.UAdd, ast.USub)):
+        yield from _factors(node.operand)
+
+
+def _without(node: ast.AST, target: ast.Call) -> ast.AST:
+    """Выражение, в котором множитель target заменён единицей."""
+    if node is target:
+        return ast.Constant(1.0)
+    if isinstance(node, ast.BinOp):
+        left, right = _without(node.left, target), _without(node.right, target)
+        if isinstance(node.op, ast.Mult) and node.left is target:
+            return right
+        if isinstance(node.op, ast.Mult) and node.right is target:
+            return left
+        return ast.BinOp(left, node.op, right)
+    if isinstance(node, ast.UnaryOp):
+        return ast.UnaryOp(node.op, _without(node.operand, target))
+    return node
+
+
+def find_oscillation(expr: str) -> Optional[Oscillation]:
+    """Множитель sin/cos(ω·x + φ) выражения или None, если его нет.
+
+    Из нескольких таких множителей выбирается самый быстрый (наибольшая
+    |ω|); остальное выражение — амплитуда.
+    """
+    tree = copy.deepcopy(compile_expr(expr).tree)
+    best: Optional[Tuple[ast.Call, float, float]] = None
+    for call in _factors(tree.body):
+        linear = _linear(call.args[0])
+        if linear is None or linear[0] == 0:
+            continue
+        if best is None or abs(linear[0]) > abs(best[1]):
+            best = (call, *linear)
+    if best is None:
+        return None
+    call, omega, phase = best
+    amplitude = ast.unparse(ast.fix_missing_locations(_without(tree.body, call)))
+    return Oscillation(call.func.id, omega, phase, amplitude)
+
+
+def _moments(theta: float) -> Tuple[complex, complex, complex]:
+    """μ_k = ∫_{-1}^{1} t^k e^{iθt} dt для k = 0, 1, 2."""
+    if abs(theta) < _SERIES_THETA:
+        # Ряд: μ_k = Σ (iθ)^m / m! · 2 / (k + m + 1) по чётным k + m
+        mu = [0j, 0j, 0j]
+        term = 1 + 0j
+        for m in range(_SERIES_TERMS):
+            for k in range(3):
+                if (k + m) % 2 == 0:
+                    mu[k] += term * 2.0 / (k + m + 1)
+            term *= 1j * theta / (m + 1)
+        return mu[0], mu[1], mu[2]
+    s, c = math.sin(theta), math.cos(theta)
+    return (
+        2.0 * s / theta,
+        2j * (s - theta * c) / theta**2,
+        2.0 * ((theta**2 - 2.0) * s + 2.0 * theta * c) / theta**3,
+    )
+
+
+def _filon_sum(g: List[float], a: float, h: float, omega: float) -> complex:
+    """∫ g(x)·e^{iωx} dx по значениям g в узлах a + j·h (чётное число отрезков).
+
+    На панели с центром c парабола через три узла даёт
+    h·e^{iωc}·(w0·g0 + w1·g1 + w2·g2) с весами из моментов μ0, μ1, μ2.
+    """
+    mu0, mu1, mu2 = _moments(omega * h)
+    w0, w1, w2 = 0.5 * (mu2 - mu1), mu0 - mu2, 0.5 * (mu2 + mu1)
+    # e^{iωc} = e^{iωa}·e^{iω(c − a)}: фаза не теряет точность при больших a
+    base = cmath.exp(1j * omega * a)
+    if np is not None:
+        ys = np.asarray(g)
+        offsets = h * np.arange(1, len(ys), 2)
+        panels = w0 * ys[:-1:2] + w1 * ys[1::2] + w2 * ys[2::2]
+        return base * h * complex(np.sum(np.exp(1j * omega * offsets) * panels))
+    total = 0j
+    for p in range(1, len(g), 2):
+        panel = w0 * g[p - 1] + w1 * g[p] + w2 * g[p + 1]
+        total += cmath.exp(1j * omega * p * h) * panel
+    return base * h * total
+
+
+def _interleave(old: List[float], new: List[float]) -> List[float]:
+    """Значения на удвоенной сетке: старые узлы — чётные, новые — нечётные."""
+    out = [0.0] * (len(old) + len(new))
+    out[0::2] = old
+    out[1::2] = new
+    return out
+
+
+@_result_cache(*_dataclass_codec(OscillatoryResult))
+def integrate_oscillatory(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    *,
+    omega: Optional[float] = None,
+    kind: str = "sin",
+    phase: float = 0.0,
+    rtol: float = 1e-10,
+    atol: float = 1e-12,
+    n0: int = 16,
+    max_levels: int = 16,
+    min_levels: int = 3,
+) -> OscillatoryResult:
+    """∫ f dx на [a, b] для f = g(x)·sin(ω·x + φ) или g(x)·cos(ω·x + φ).
+
+    Без omega множитель ищется в выражении (find_oscillation); если его
+    нет или f — функция Python, считает integrate_adaptive с теми же
+    rtol/atol. С omega func_or_expr — амплитуда g, а множитель задают
+    kind (sin | cos) и phase.
+
+    Составное правило Филона с n0 отрезками; число отрезков удваивается
+    (старые узлы не пересчитываются), ошибка — разность соседних уровней.
+    Пределы должны быть конечными.
+    """
+    if kind not in ("sin", "cos"):
+        raise ValueError("kind должен быть sin или cos")
+    if n0 <= 0 or n0 % 2:
+        raise ValueError("n0 должно быть положительным чётным")
+    if max_levels < 2 or min_levels < 2 or min_levels > max_levels:
+        raise ValueError("Нужно 2 <= min_levels <= max_levels")
+    if rtol < 0 or atol < 0 or (rtol == 0 and atol == 0):
+        raise ValueError("rtol и atol неотрицательны и не равны нулю одновременно")
+
+    amplitude = func_or_expr
+    if omega is None:
+        found = (
+            find_oscillation(func_or_expr) if isinstance(func_or_expr, str) else None
+        )
+        if found is None:
+            res = integrate_adaptive(func_or_expr, a, b, rtol=rtol, atol=atol)
+            return OscillatoryResult(
+                res.value, res.error, res.evals, "adaptive", None, res.converged
+            )
+        amplitude, omega, kind, phase = (
+            found.amplitude,
+            found.omega,
+            found.kind,
+            found.phase,
+        )
+
+    a, b = float(a), float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ValueError("Квадратура Филона — только для конечного отрезка")
+    g = _as_callable(amplitude)
+    omega = float(omega)
+    rotate = cmath.exp(1j * phase)
+
+    def value_of(ys: List[float], h: float) -> float:
+        z = rotate * _filon_sum(ys, a, h, omega)
+        return z.imag if kind == "sin" else z.real
+
+    n = n0
+    h = (b - a) / n
+    ys = _eval_points(g, [a + j * h for j in range(n + 1)])
+    evals = n + 1
+    value, error = value_of(ys, h), math.inf
+    for level in range(1, max_levels):
+        h *= 0.5
+        new = _eval_points(g, [a + (2 * j + 1) * h for j in range(n)])
+        evals += n
+        n *= 2
+        ys = _interleave(ys, new)
+        prev, value = value, value_of(ys, h)
+        error = abs(value - prev)
+        done = error <= max(atol, rtol * abs(value))
+        if done and level + 1 >= min_levels:
+            break
+    return OscillatoryResult(
+        value=value,
+        error=error,
+        evals=evals,
+        method="filon",
+        omega=omega,
+        converged=error <= max(atol, rtol * abs(value)),
+    )
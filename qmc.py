@@ -0,0 +1,136 @@
+"""
+Квазислучайные (низкодисперсные) последовательности Соболя и Холтона.
+
+Точки строятся векторно по диапазону индексов [start, start + count), так
+что длинную последовательность можно генерировать блоками. Рандомизация
+(scramble/shift) делает каждую реализацию несмещённой оценкой, а разброс
+между независимыми реализациями даёт оценку ошибки RQMC. Требуется NumPy.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Разрядность точек Соболя: до 2^32 точек с шагом 2^-32
+_BITS = 32
+
+# Направляющие числа Джо–Куо (new-joe-kuo-6.21201) для измерений 2..8:
+# (степень s, коэффициенты a, начальные m_1..m_s). Первое измерение — m_k = 1.
+_JOE_KUO: Tuple[Tuple[int, int, Tuple[int, ...]], ...] = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+)
+
+SOBOL_MAX_DIM = len(_JOE_KUO) + 1
+
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53)
+
+HALTON_MAX_DIM = len(_PRIMES)
+
+
+def _direction_numbers(dim: int) -> np.ndarray:
+    """Массив (dim, 32) направляющих чисел v_k·2^32 как целых."""
+    table = np.zeros((dim, _BITS), dtype=np.uint64)
+    table[0] = [1 << (_BITS - k) for k in range(1, _BITS + 1)]
+    for d in range(1, dim):
+        s, a, m = _JOE_KUO[d - 1]
+        v = [0] * (_BITS + 1)
+        for k in range(1, s + 1):
+            v[k] = m[k - 1] << (_BITS - k)
+        for k in range(s + 1, _BITS + 1):
+            v[k] = v[k - s] ^ (v[k - s] >> s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    v[k] ^= v[k - j]
+        table[d] = v[1:]
+    return table
+
+
+def _check_dim(dim: int, max_dim: int) -> None:
+    if not 1 <= dim <= max_dim:
+        raise ValueError(f"Размерность должна быть от 1 до {max_dim}")
+
+
+def sobol_scramble(dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Скрамблированные направляющие числа (Матушек: LMS + цифровой сдвиг).
+
+    Возвращает массив (dim, 33): 32 направляющих числа и сдвиг XOR.
+    """
+    _check_dim(dim, SOBOL_MAX_DIM)
+    table = _direction_numbers(dim)
+    out = np.zeros((dim, _BITS + 1), dtype=np.uint64)
+    for d in range(dim):
+        # Строка k нижнетреугольной матрицы с единичной диагональю — маска
+        # входных цифр 1..k (цифра 1 — старший бит)
+        rows = []
+        for k in range(1, _BITS + 1):
+            low = int(rng.integers(0, 1 << (k - 1))) if k > 1 else 0
+            rows.append(((low << 1) | 1) << (_BITS - k))
+        for j, v in enumerate(table[d].tolist()):
+            scrambled = 0
+            for k, row in enumerate(rows, start=1):
+                if bin(v & row).count("1") & 1:
+                    scrambled |= 1 << (_BITS - k)
+            out[d, j] = scrambled
+        out[d, _BITS] = int(rng.integers(0, 1 << _BITS, dtype=np.uint64))
+    return out
+
+
+def sobol_points(
+    start: int, count: int, dim: int = 1, scramble: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Точки Соболя с индексами [start, start + count), форма (count, dim).
+
+    scramble — результат sobol_scramble (без него — исходная
+    последовательность, начинающаяся с нуля).
+    """
+    _check_dim(dim, SOBOL_MAX_DIM)
+    if start < 0 or start + count > 1 << _BITS:
+        raise ValueError("Индексы точек Соболя должны лежать в [0, 2^32)")
+    if scramble is None:
+        table = _direction_numbers(dim)
+        shift = np.zeros(dim, dtype=np.uint64)
+    else:
+        table, shift = scramble[:dim, :_BITS], scramble[:dim, _BITS]
+    idx = np.arange(start, start + count, dtype=np.uint64)
+    gray = idx ^ (idx >> np.uint64(1))
+    bits = np.zeros((count, dim), dtype=np.uint64)
+    for j in range(_BITS):
+        mask = ((gray >> np.uint64(j)) & np.uint64(1)).astype(bool)
+        if mask.any():
+            bits[mask] ^= table[:, j]
+    return (bits ^ shift).astype(np.float64) / float(1 << _BITS)
+
+
+def _radical_inverse(idx: np.ndarray, base: int) -> np.ndarray:
+    out = np.zeros(idx.shape, dtype=np.float64)
+    scale = 1.0 / base
+    i = idx.copy()
+    while np.any(i > 0):
+        out += scale * (i % base)
+        i //= base
+        scale /= base
+    return out
+
+
+def halton_points(
+    start: int, count: int, dim: int = 1, shift: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Точки Холтона с индексами [start, start + count), форма (count, dim).
+
+    shift — случайный сдвиг по модулю 1 (Крэнли–Паттерсон) для каждого
+    измерения; без него — детерминированная последовательность (с индекса 1).
+    """
+    _check_dim(dim, HALTON_MAX_DIM)
+    idx = np.arange(start + 1, start + count + 1, dtype=np.int64)
+    points = np.column_stack([_radical_inverse(idx, p) for p in _PRIMES[:dim]])
+    if shift is not None:
+        points = np.mod(points + shift[:dim], 1.0)
+    return points
@@ -0,0 +1,138 @@
+"""
+Постоянный кэш результатов интегрирования на SQLite.
+
+Ключ строится в integrators (каноническая форма выражения из проверенного
+AST, пределы, метод и все параметры, влияющие на результат); здесь — только
+хранилище: ограниченный размер с вытеснением давно не использованных
+записей (LRU) и безопасный доступ из нескольких процессов (режим WAL,
+собственное соединение в каждом процессе).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Сколько ждать блокировку базы другим процессом, секунд
+_BUSY_TIMEOUT = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+-- Число записей ведут триггеры в той же транзакции: put не сканирует таблицу
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (name, value)
+    VALUES ('count', (SELECT COUNT(*) FROM results));
+CREATE TRIGGER IF NOT EXISTS results_count_insert AFTER INSERT ON results
+BEGIN
+    UPDATE meta SET value = value + 1 WHERE name = 'count';
+END;
+CREATE TRIGGER IF NOT EXISTS results_count_delete AFTER DELETE ON results
+BEGIN
+    UPDATE meta SET value = value - 1 WHERE name = 'count';
+END;
+"""
+
+# Замена записи — обновление на месте (REPLACE удалил бы строку без триггера)
+_UPSERT = (
+    "INSERT INTO results (key, value, last_used) VALUES (?, ?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET "
+    "value = excluded.value, last_used = excluded.last_used"
+)
+_COUNT = "SELECT value FROM meta WHERE name = 'count'"
+
+
+class ResultCache:
+    """Кэш результатов: ключ — строка, значение — JSON-совместимый объект.
+
+    path — файл базы (":memory:" — только в этом процессе). При превышении
+    max_entries вытесняются записи с самым старым временем использования.
+    Счётчики hits/misses ведутся для этого экземпляра.
+    """
+
+    def __init__(self, path: str = ":memory:", *, max_entries: int = 100_000) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries должно быть положительным")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid = -1
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединение SQLite нельзя наследовать через fork — открываем своё
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(
+                self.path, timeout=_BUSY_TIMEOUT, check_same_thread=False
+            )
+            if self.path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """Значение по ключу или None; попадание обновляет время использования."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                row = conn.execute(
+                    "SELECT value FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE results SET last_used = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(_UPSERT, (key, json.dumps(value), time.time()))
+                (count,) = conn.execute(_COUNT).fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM results WHERE key IN (SELECT key FROM results "
+                        "ORDER BY last_used ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM results")
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection().execute(_COUNT).fetchone()
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        """Попадания, промахи и число записей."""
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
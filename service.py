@@ -0,0 +1,562 @@
+"""
+Асинхронный HTTP-сервис интегрирования (только стандартная библиотека).
+
+    python service.py --port 8000 --workers 4
+
+POST /integrate — задание JSON в формате batch (expr, a, b, method и по
+методу n, mode, samples, seed, rtol, atol; необязательный id). Ответ —
+JSON с value (и stderr / error_estimate, как в batch). С ?stream=1 ответ
+идёт построчно (NDJSON, chunked): queued, started, progress, а в конце
+result или error. GET /stats — счётчики сервиса.
+
+Счёт идёт в пуле процессов; цикл событий только принимает запросы и
+раздаёт результаты. Одинаковые задания, пришедшие, пока первое ещё
+считается (ключ — каноническая форма выражения, пределы, метод и
+параметры), объединяются в одно вычисление. Очередь заданий ограничена:
+при переполнении сервис сразу отвечает 503 с Retry-After. Трапеции,
+Симпсон и прямоугольники считаются блоками узлов (как integrate_* с
+chunk_size) — по ним и сообщается прогресс; остальные методы — одной
+задачей, о которой периодически сообщается, что она ещё идёт.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from batch import _normalize, _single
+from integrators import (
+    _DEFAULT_BLOCK,
+    _RULE_NODES,
+    _neumaier_add,
+    _rule_block_size,
+    _rule_block_sum,
+    _rule_blocks,
+    _rule_setup,
+    _shippable,
+    canonical_expr,
+)
+
+# Заданий в очереди (не считая уже выполняющихся и объединённых)
+DEFAULT_QUEUE = 64
+
+# Не чаще раза за столько секунд сообщается прогресс задания
+PROGRESS_INTERVAL = 0.5
+
+# Предельный размер тела запроса
+MAX_BODY = 1 << 20
+
+_RULE_METHODS = ("trapezoid", "simpson", "rect")
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    503: "Service Unavailable",
+}
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def job_key(job: Mapping[str, Any]) -> str:
+    """Ключ объединения: каноническое выражение и параметры задания без id."""
+    params = {k: v for k, v in job.items() if k not in ("expr", "id")}
+    text = json.dumps([canonical_expr(job["expr"]), params], sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _Job:
+    """Выполняющееся или ждущее в очереди задание и его слушатели."""
+
+    __slots__ = ("key", "spec", "future", "listeners")
+
+    def __init__(self, key: str, spec: Dict[str, Any]) -> None:
+        self.key = key
+        self.spec = spec
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.listeners: List[asyncio.Queue] = []
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        for listener in self.listeners:
+            listener.put_nowait(event)
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        if self.future.done():
+            return
+        self.future.set_result(result)
+        if "error" in result:
+            self.publish({"event": "error", **result})
+        else:
+            self.publish({"event": "result", **result})
+
+
+class IntegrationService:
+    """Сервис: HTTP-сервер, ограниченная очередь заданий и пул процессов.
+
+    workers — процессов в пуле (по умолчанию os.cpu_count()); max_running —
+    одновременно выполняющихся заданий (по умолчанию workers); max_queue —
+    длина очереди; block — узлов в блоке для правил с фиксированным шагом.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_running: Optional[int] = None,
+        max_queue: int = DEFAULT_QUEUE,
+        block: int = _DEFAULT_BLOCK,
+        progress_interval: float = PROGRESS_INTERVAL,
+    ) -> None:
+        if max_queue <= 0 or block <= 0:
+            raise ValueError("max_queue и block должны быть положительными")
+        self.workers = workers or os.cpu_count() or 1
+        self.max_running = max_running or self.workers
+        self.max_queue = max_queue
+        self.block = block
+        self.progress_interval = progress_interval
+        self.counters = collections.Counter(
+            submitted=0, coalesced=0, rejected=0, completed=0, failed=0
+        )
+        self._inflight: Dict[str, _Job] = {}
+        self._running = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dispatchers: List[asyncio.Task] = []
+
+    # --- жизненный цикл ---
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """Запускает пул и сервер; возвращает фактический (host, port)."""
+        self._queue = asyncio.Queue(self.max_queue)
+        self._pool = self._new_pool()
+        self._dispatchers = [
+            asyncio.create_task(self._dispatch()) for _ in range(self.max_running)
+        ]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        assert self._server is not None, "сначала start()"
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Останавливает приём, отменяет незавершённые задания и пул."""
+        if self._server is not None:
+            self._server.close()
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        for job in list(self._inflight.values()):
+            job.finish({"error": "Сервис остановлен"})
+        self._inflight.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "IntegrationService":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            **self.counters,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "running": self._running,
+            "inflight": len(self._inflight),
+        }
+
+    # --- задания ---
+
+    def submit(self, raw: Mapping[str, Any]) -> Tuple[_Job, bool]:
+        """Ставит задание в очередь; (задание, объединено ли с уже идущим).
+
+        ValueError/SyntaxError — некорректное задание, asyncio.QueueFull —
+        очередь заполнена.
+        """
+        if self._queue is None:
+            raise RuntimeError("Сервис не запущен")
+        spec = _normalize(raw)
+        key = job_key(spec)
+        job = self._inflight.get(key)
+        if job is not None:
+            self.counters["coalesced"] += 1
+            return job, True
+        job = _Job(key, spec)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise
+        self._inflight[key] = job
+        self.counters["submitted"] += 1
+        return job, False
+
+    async def _dispatch(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            self._running += 1
+            job.publish({"event": "started"})
+            try:
+                result = await self._execute(job)
+            except asyncio.CancelledError:
+                job.finish({"error": "Сервис остановлен"})
+                raise
+            except BrokenProcessPool as exc:
+                # Процесс пула упал (например, по памяти) — пул пересоздаётся
+                self._restart_pool()
+                self.counters["failed"] += 1
+                job.finish({"error": f"Процесс-исполнитель завершился: {exc}"})
+            except Exception as exc:
+                self.counters["failed"] += 1
+                job.finish({"error": str(exc)})
+            else:
+                self.counters["completed"] += 1
+                job.finish(result)
+            finally:
+                self._running -= 1
+                self._inflight.pop(job.key, None)
+                self._queue.task_done()
+
+    def _restart_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn, а не fork: процессы пула создаются по мере надобности, и при
+        # fork унаследовали бы открытые сокеты клиентов (соединение не
+        # закрывалось бы, пока жив процесс)
+        context = multiprocessing.get_context("spawn")
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    async def _execute(self, job: _Job) -> Dict[str, Any]:
+        if job.spec["method"] in _RULE_METHODS:
+            return await self._run_rule(job)
+        return await self._run_single(job)
+
+    async def _run_single(self, job: _Job) -> Dict[str, Any]:
+        """Задание целиком в одном процессе; пока считается — progress с elapsed."""
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._pool, _single, job.spec)
+        start = loop.time()
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=self.progress_interval)
+            if done:
+                return future.result()
+            job.publish({"event": "progress", "elapsed": loop.time() - start})
+
+    async def _run_rule(self, job: _Job) -> Dict[str, Any]:
+        """Правило с фиксированным шагом блоками узлов в пуле.
+
+        Суммы блоков складываются по порядку с компенсацией, как в
+        integrate_* с chunk_size=block, поэтому значение побитово совпадает
+        с таким вызовом. В пуле одновременно не больше 2·workers блоков
+        задания, а границы блоков перебираются лениво — память и очередь
+        пула не растут с n. Подготовка (компиляция, проверка концов, замена
+        переменной) идёт в потоке, чтобы не задерживать цикл событий.
+        """
+        spec = job.spec
+        rule = spec["mode"] if spec["method"] == "rect" else spec["method"]
+        n = spec["n"]
+        loop = asyncio.get_running_loop()
+        f, a, h, s0, scale = await loop.run_in_executor(
+            None, _rule_setup, spec["expr"], spec["a"], spec["b"], n, rule, None
+        )
+        target = _shippable(f)
+        block = _rule_block_size(rule, self.block)
+        first, last, _ = _RULE_NODES[rule]
+        count = math.ceil(max(0, n + last + 1 - first) / block)
+
+        window: collections.deque = collections.deque()
+        total, comp = s0, 0.0
+        done, reported = 0, loop.time()
+
+        async def take() -> None:
+            nonlocal total, comp, done, reported
+            total, comp = _neumaier_add(total, comp, await window.popleft())
+            done += 1
+            now = loop.time()
+            if now - reported >= self.progress_interval or done == count:
+                reported = now
+                job.publish({"event": "progress", "done": done, "total": count})
+
+        try:
+            for lo, hi in _rule_blocks(n, rule, block):
+                window.append(
+                    loop.run_in_executor(
+                        self._pool, _rule_block_sum, target, a, h, rule, lo, hi
+                    )
+                )
+                if len(window) >= 2 * self.workers:
+                    await take()
+            while window:
+                await take()
+        finally:
+            for future in window:
+                future.cancel()
+        return {"value": scale * (total + comp)}
+
+    # --- HTTP ---
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            try:
+                method, target, body = await _read_request(reader)
+                await self._route(method, target, body, writer)
+            except _HTTPError as exc:
+                await _send_json(writer, exc.status, {"error": str(exc)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _route(
+        self, method: str, target: str, body: bytes, writer: asyncio.StreamWriter
+    ) -> None:
+        url = urlsplit(target)
+        if url.path == "/stats":
+            if method != "GET":
+                raise _HTTPError(405, "Нужен GET")
+            await _send_json(writer, 200, self.stats())
+            return
+        if url.path != "/integrate":
+            raise _HTTPError(404, f"Неизвестный путь: {url.path}")
+        if method != "POST":
+            raise _HTTPError(405, "Нужен POST")
+        try:
+            raw = json.loads(body)
+        except ValueError as exc:
+            raise _HTTPError(400, f"Некорректный JSON: {exc}") from exc
+        if not isinstance(raw, dict):
+            raise _HTTPError(400, "Задание должно быть объектом JSON")
+        try:
+            job, coalesced = self.submit(raw)
+        except asyncio.QueueFull:
+            await _send_json(
+                writer,
+                503,
+                {"error": "Очередь заданий заполнена"},
+                ("Retry-After: 1",),
+            )
+            return
+        except (ValueError, TypeError, SyntaxError) as exc:
+            raise _HTTPError(400, str(exc)) from exc
+
+        head = {"id": raw["id"]} if "id" in raw else {}
+        stream = parse_qs(url.query).get("stream", ["0"])[-1] not in ("0", "")
+        if stream:
+            await self._stream(job, coalesced, head, writer)
+            return
+        # shield: отключившийся клиент не отменяет общее вычисление
+        result = await asyncio.shield(job.future)
+        status = 422 if "error" in result else 200
+        await _send_json(writer, status, {**head, **result, "coalesced": coalesced})
+
+    async def _stream(
+        self,
+        job: _Job,
+        coalesced: bool,
+        head: Dict[str, Any],
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        listener: asyncio.Queue = asyncio.Queue()
+        job.listeners.append(listener)
+        try:
+            writer.write(
+                _head(200, "application/x-ndjson", ("Transfer-Encoding: chunked",))
+            )
+            event: Dict[str, Any] = {"event": "queued", "coalesced": coalesced}
+            if job.future.done():
+                result = job.future.result()
+                event = {"event": "error" if "error" in result else "result", **result}
+            while True:
+                line = json.dumps({**head, **event}) + "\n"
+                writer.write(_chunk(line.encode("utf-8")))
+                # drain — противодавление медленному клиенту
+                await writer.drain()
+                if event["event"] in ("result", "error"):
+                    break
+                event = await listener.get()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            job.listeners.remove(listener)
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Tuple[str, str, bytes]:
+    """(метод, путь, тело) запроса HTTP/1.x."""
+    line = await reader.readline()
+    try:
+        method, target, _version = line.decode("latin-1").split()
+    except ValueError as exc:
+        raise _HTTPError(400, "Некорректная строка запроса") from exc
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError as exc:
+        raise _HTTPError(400, "Некорректный Content-Length") from exc
+    if length > MAX_BODY:
+        raise _HTTPError(413, f"Тело запроса больше {MAX_BODY} байт")
+    body = await reader.readexactly(length) if length > 0 else b""
+    return method.upper(), target, body
+
+
+def _head(status: int, content_type: str, extra: Tuple[str, ...] = ()) -> bytes:
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        "Connection: close",
+        *extra,
+    ]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _chunk(data: bytes) -> bytes:
+    return f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n"
+
+
+async def _send_json(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: Any,
+    extra: Tuple[str, ...] = (),
+) -> None:
+    data = json.dumps(payload).encode("utf-8")
+    headers = (f"Content-Length: {len(data)}", *extra)
+    writer.write(_head(status, "application/json", headers) + data)
+    await writer.drain()
+
+
+# --- клиент ---
+
+
+async def request(
+    host: str,
+    port: int,
+    method: str,
+    path: str,
+    payload: Any = None,
+) -> Tuple[int, Any]:
+    """Минимальный клиент: (статус, JSON ответа; для потока — список событий)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        writer.write(
+            (
+                f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+            ).encode("latin-1")
+            + body
+        )
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding") != "chunked":
+            length = int(headers.get("content-length", "0"))
+            return status, json.loads(await reader.readexactly(length))
+        events = []
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                break
+            events.append(json.loads(await reader.readexactly(size)))
+            await reader.readexactly(2)
+        return status, events
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def post_job(
+    host: str, port: int, job: Mapping[str, Any], *, stream: bool = False
+) -> Tuple[int, Any]:
+    """Отправляет задание; stream=True — список событий вместо одного ответа."""
+    path = "/integrate?stream=1" if stream else "/integrate"
+    return await request(host, port, "POST", path, dict(job))
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8000, **options: Any) -> None:
+    async with IntegrationService(**options) as service:
+        host, port = await service.start(host, port)
+        print(f"Listening on http://{host}:{port}", flush=True)
+        await service.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="HTTP-сервис численного интегрирования"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="Процессов в пуле")
+    parser.add_argument(
+        "--max-running", type=int, default=None, help="Одновременных заданий"
+    )
+    parser.add_argument(
+        "--queue", type=int, default=DEFAULT_QUEUE, help="Длина очереди заданий"
+    )
+    parser.add_argument(
+        "--block", type=int, default=_DEFAULT_BLOCK, help="Узлов в блоке"
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                workers=args.workers,
+                max_running=args.max_running,
+                max_queue=args.queue,
+                block=args.block,
+            )
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
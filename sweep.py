@@ -0,0 +1,151 @@
+"""
+Параметрические серии: ∫ f(x, y, z) dx по x для тысяч значений y и z сразу.
+
+Выражение компилируется один раз, сетка узлов по x одна на всю серию, а
+значения вычисляются векторно на матрице «параметры × узлы» блоками не
+больше chunk_size элементов; интегралы блока — произведение матрицы на
+вектор весов правила. Так строятся таблицы значений интеграла по
+параметрам. Требуется NumPy.
+"""
+
+from __future__ import annotations
+
+import csv
+import math
+from typing import Any, Callable, Dict, Mapping, Optional, TextIO, Tuple
+
+import numpy as np
+
+import instrumentation as _instr
+from integrators import _DEFAULT_BLOCK, _RULE_NODES, FuncOrExpr, Number, _as_callable
+
+# Параметры выражения; x — переменная интегрирования
+SWEEP_PARAMS = ("y", "z")
+
+SWEEP_METHODS = ("trapezoid", "simpson", "left", "right", "midpoint")
+
+# Элементов матрицы значений в одном блоке по умолчанию (8 МБ float64)
+DEFAULT_CHUNK = 16 * _DEFAULT_BLOCK
+
+
+def _rule_grid(a: float, b: float, n: int, method: str) -> Tuple[Any, Any]:
+    """Узлы правила method с n отрезками и веса (уже с множителем h или h/3)."""
+    h = (b - a) / float(n)
+    first, last, shift = _RULE_NODES[method]
+    if method in ("trapezoid", "simpson"):
+        # Концы отрезка — в той же сетке, что и внутренние узлы
+        first, last = 0, 0
+    idx = np.arange(first, n + last + 1)
+    xs = a + (idx + shift) * h
+    if method == "simpson":
+        weights = np.where(idx % 2 == 1, 4.0, 2.0) * (h / 3.0)
+        weights[[0, -1]] = h / 3.0
+    else:
+        weights = np.full(len(idx), h)
+        if method == "trapezoid":
+            weights[[0, -1]] = 0.5 * h
+    return xs, weights
+
+
+def _broadcast_params(params: Mapping[str, Any]) -> Dict[str, Any]:
+    """Массивы параметров, приведённые к общей форме."""
+    unknown = sorted(set(params) - set(SWEEP_PARAMS))
+    if unknown:
+        raise ValueError(
+            f"Параметры серии — только {', '.join(SWEEP_PARAMS)}, "
+            f"а не {', '.join(unknown)}"
+        )
+    names = [name for name in SWEEP_PARAMS if name in params]
+    arrays = np.broadcast_arrays(
+        *(np.asarray(params[name], dtype=float) for name in names)
+    )
+    return dict(zip(names, arrays))
+
+
+def _eval_block(f: Callable[..., Any], xs: Any, columns: Dict[str, Any]) -> Any:
+    """Матрица f(x_j, y_i, z_i): строка на набор параметров, столбец на узел."""
+    rows = len(next(iter(columns.values()))) if columns else 1
+    args = {name: column[:, None] for name, column in columns.items()}
+    eval_array = getattr(f, "eval_array", None)
+    out = eval_array(xs, **args) if eval_array else f(xs, **args)
+    # Выражение без x или без параметров даёт меньшую форму — растягиваем
+    return np.broadcast_to(np.asarray(out, dtype=float), (rows, len(xs)))
+
+
+def integrate_sweep(
+    func_or_expr: FuncOrExpr,
+    a: Number,
+    b: Number,
+    params: Mapping[str, Any],
+    method: str = "simpson",
+    n: int = 100,
+    *,
+    chunk_size: Optional[int] = None,
+) -> Any:
+    """Интегралы f(x, y, z) по x на [a, b] для всех значений параметров.
+
+    params — {"y": массив, "z": массив}; массивы согласуются по правилам
+    broadcasting NumPy (например, y[:, None] и z[None, :] дают таблицу), и
+    результат имеет их общую форму. method: trapezoid | simpson | left |
+    right | midpoint, n — число отрезков. Функция Python вызывается как
+    f(x, y=..., z=...) с массивами. chunk_size — наибольшее число значений
+    f в одном блоке (память не зависит от числа параметров).
+    """
+    if method not in SWEEP_METHODS:
+        raise ValueError("method должен быть одним из: " + ", ".join(SWEEP_METHODS))
+    if n <= 0:
+        raise ValueError("n должно быть положительным")
+    if method == "simpson" and n % 2:
+        raise ValueError("Для метода Симпсона n должно быть положительным чётным")
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError("chunk_size должно быть положительным")
+    a, b = float(a), float(b)
+    if not (math.isfinite(a) and math.isfinite(b)):
+        raise ValueError("Пределы серии должны быть конечными")
+
+    f = _as_callable(func_or_expr)
+    arrays = _broadcast_params(params)
+    shape = next(iter(arrays.values())).shape if arrays else ()
+    flat = {name: array.ravel() for name, array in arrays.items()}
+    size = math.prod(shape)
+    xs, weights = _rule_grid(a, b, n, method)
+    chunk = chunk_size or DEFAULT_CHUNK
+    rows = max(1, chunk // len(xs))
+    cols = min(len(xs), chunk)
+    _instr.add_evals(size * len(xs))
+
+    out = np.zeros(size)
+    for start in range(0, size, rows):
+        block = {name: v[start : start + rows] for name, v in flat.items()}
+        for lo in range(0, len(xs), cols):
+            with _instr.phase("evaluate"):
+                values = _eval_block(f, xs[lo : lo + cols], block)
+            with _instr.phase("sum"):
+                out[start : start + rows] += values @ weights[lo : lo + cols]
+    return out.reshape(shape)
+
+
+def read_params(stream: TextIO) -> Dict[str, Any]:
+    """Читает сетку параметров из CSV: заголовок y и/или z, строка на набор."""
+    reader = csv.DictReader(stream)
+    names = [name.strip() for name in reader.fieldnames or []]
+    unknown = sorted(set(names) - set(SWEEP_PARAMS))
+    if not names or unknown:
+        raise ValueError(
+            f"Заголовок CSV — столбцы {', '.join(SWEEP_PARAMS)}, "
+            f"получено: {', '.join(names) or 'пусто'}"
+        )
+    columns: Dict[str, list] = {name: [] for name in names}
+    for row in reader:
+        for key, value in row.items():
+            columns[key.strip()].append(float(value))
+    return {name: np.array(values) for name, values in columns.items()}
+
+
+def write_table(stream: TextIO, params: Mapping[str, Any], values: Any) -> None:
+    """Пишет CSV: столбцы параметров и value, строка на набор параметров."""
+    names = list(params)
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow([*names, "value"])
+    columns = [np.asarray(params[name]).ravel().tolist() for name in names]
+    writer.writerows(zip(*columns, np.asarray(values).ravel().tolist()))
@@ -0,0 +1,236 @@
+"""
+Интегрирование табличных данных: замеры y (и, при неравномерной сетке, x).
+
+Данные обрабатываются блоками по chunk_size отсчётов с перекрытием в один
+отсчёт, поэтому np.memmap на файле любого размера не загружается в память
+целиком: в памяти одновременно только текущий блок. Суммы блоков
+складываются с компенсацией (как в integrators). Кумулятивный интеграл
+пишется блоками прямо в выходной массив (например, np.memmap файла).
+
+Двоичный файл — подряд записанные значения y (или пары x, y при
+columns=2) в формате dtype; CSV — столбец y или столбцы x, y. Требуется NumPy.
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+import instrumentation as _instr
+from integrators import _neumaier_add
+
+SAMPLE_METHODS = ("trapezoid", "simpson", "cumulative")
+
+# Отсчётов в блоке по умолчанию (8 МиБ на массив float64)
+DEFAULT_CHUNK = 1 << 20
+
+# Блок: (ширины интервалов — массив или скаляр dx, значения y с перекрытием)
+Window = Tuple[Union[np.ndarray, float], np.ndarray]
+
+
+def _array_windows(
+    y: Any, x: Optional[Any], dx: float, chunk_size: int
+) -> Iterator[Window]:
+    """Блоки из массивов (в том числе memmap): срезы читаются по одному."""
+    n = len(y)
+    for start in range(0, n - 1, chunk_size):
+        stop = min(start + chunk_size, n - 1) + 1
+        ys = np.asarray(y[start:stop], dtype=float)
+        if x is None:
+            yield dx, ys
+        else:
+            yield np.diff(np.asarray(x[start:stop], dtype=float)), ys
+
+
+def _csv_windows(
+    path: str, dx: float, chunk_size: int, delimiter: str = ","
+) -> Iterator[Window]:
+    """Блоки из CSV (столбец y или x, y), читаемого по chunk_size строк."""
+    with open(path, encoding="utf-8") as fh:
+        prev: Optional[np.ndarray] = None
+        while True:
+            lines = list(itertools.islice(fh, chunk_size))
+            if not lines:
+                break
+            block = np.loadtxt(lines, delimiter=delimiter, ndmin=2)
+            if block.shape[1] > 2:
+                raise ValueError("CSV должен содержать столбец y или столбцы x, y")
+            if prev is not None:
+                block = np.vstack([prev, block])
+            prev = block[-1:]
+            if len(block) < 2:
+                continue
+            ys = block[:, -1]
+            yield (np.diff(block[:, 0]) if block.shape[1] == 2 else dx), ys
+
+
+def _trapezoid(windows: Iterator[Window]) -> float:
+    total, comp = 0.0, 0.0
+    count = 0
+    for h, ys in windows:
+        total, comp = _neumaier_add(
+            total, comp, float(np.sum(h * (ys[:-1] + ys[1:]))) * 0.5
+        )
+        count += len(ys) - 1
+    _instr.add_evals(count + 1 if count else 0)
+    return total + comp
+
+
+def _simpson(windows: Iterator[Window]) -> float:
+    """Составной Симпсон для неравномерной сетки (парами интервалов).
+
+    При нечётном числе интервалов последний добавляется с поправкой по
+    трём последним отсчётам (как scipy.integrate.simpson).
+    """
+    total, comp = 0.0, 0.0
+    # Непарный интервал, ждущий следующего блока, и хвост всех данных
+    pend_h, pend_y = np.empty(0), np.empty(0)
+    last_h, last_y = np.empty(0), np.empty(0)
+    count = 0
+    for h, ys in windows:
+        hs = np.broadcast_to(np.asarray(h, dtype=float), (len(ys) - 1,))
+        count += len(hs)
+        last_h = np.concatenate([last_h, hs[-2:]])[-2:]
+        last_y = np.concatenate([last_y[:-1], ys[-3:]])[-3:]
+        hs = np.concatenate([pend_h, hs])
+        ys = np.concatenate([pend_y[:-1], ys])
+        p = 2 * (len(hs) // 2)
+        h0, h1 = hs[0:p:2], hs[1:p:2]
+        if np.any(h0 == 0) or np.any(h1 == 0):
+            raise ValueError("Совпадающие x: ширина интервала равна нулю")
+        y0, y1, y2 = ys[0:p:2], ys[1:p:2], ys[2 : p + 1 : 2]
+        hsum = h0 + h1
+        terms = (
+            (2.0 - h1 / h0) * y0 + hsum * hsum / (h0 * h1) * y1 + (2.0 - h0 / h1) * y2
+        )
+        total, comp = _neumaier_add(total, comp, float(np.sum(hsum / 6.0 * terms)))
+        pend_h, pend_y = hs[p:], ys[p:]
+    _instr.add_evals(count + 1 if count else 0)
+
+    if len(pend_h) == 1:
+        if count == 1:
+            return float(0.5 * pend_h[0] * (pend_y[0] + pend_y[1]))
+        h0, h1 = last_h
+        alpha = (2.0 * h1 * h1 + 3.0 * h0 * h1) / (6.0 * (h0 + h1))
+        beta = (h1 * h1 + 3.0 * h0 * h1) / (6.0 * h0)
+        eta = h1**3 / (6.0 * h0 * (h0 + h1))
+        tail = alpha * last_y[2] + beta * last_y[1] - eta * last_y[0]
+        total, comp = _neumaier_add(total, comp, float(tail))
+    return total + comp
+
+
+def _cumulative(windows: Iterator[Window], out: Optional[Any]) -> Any:
+    """Кумулятивные трапеции: out[0] = 0, out[k] — интеграл по первым k интервалам.
+
+    Без out значения собираются в новый массив.
+    """
+    parts: List[np.ndarray] = []
+    pos = 1
+    carry = 0.0
+    if out is not None:
+        if len(out) == 0:
+            raise ValueError("Выходной массив пуст")
+        out[0] = 0.0
+    for h, ys in windows:
+        running = carry + np.cumsum(h * (ys[:-1] + ys[1:]) * 0.5)
+        if out is None:
+            parts.append(running)
+        else:
+            if pos + len(running) > len(out):
+                raise ValueError("Длина out должна совпадать с числом отсчётов")
+            out[pos : pos + len(running)] = running
+        pos += len(running)
+        carry = float(running[-1])
+    _instr.add_evals(pos)
+    if out is None:
+        return np.concatenate([np.zeros(1)] + parts)
+    if pos != len(out):
+        raise ValueError("Длина out должна совпадать с числом отсчётов")
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def _integrate_windows(
+    windows: Iterator[Window], method: str, out: Optional[Any]
+) -> Union[float, Any]:
+    if method not in SAMPLE_METHODS:
+        raise ValueError("method должен быть одним из: " + ", ".join(SAMPLE_METHODS))
+    with _instr.phase("evaluate"):
+        if method == "trapezoid":
+            return _trapezoid(windows)
+        if method == "simpson":
+            return _simpson(windows)
+        return _cumulative(windows, out)
+
+
+def integrate_samples(
+    y: Any,
+    x: Optional[Any] = None,
+    *,
+    dx: float = 1.0,
+    method: str = "trapezoid",
+    chunk_size: int = DEFAULT_CHUNK,
+    out: Optional[Any] = None,
+) -> Union[float, Any]:
+    """Интеграл по отсчётам y (одномерный массив, список или np.memmap).
+
+    x — узлы той же длины (сетка может быть неравномерной); без x шаг
+    постоянен и равен dx. method: trapezoid | simpson — число;
+    cumulative — массив длины len(y) с накопленным интегралом (out[0] = 0),
+    записанный в out, если он передан (например, np.memmap на запись).
+    """
+    if method not in SAMPLE_METHODS:
+        raise ValueError("method должен быть одним из: " + ", ".join(SAMPLE_METHODS))
+    if chunk_size <= 0:
+        raise ValueError("chunk_size должно быть положительным")
+    if not isinstance(y, np.ndarray):
+        y = np.asarray(y, dtype=float)
+    if y.ndim != 1:
+        raise ValueError("y должен быть одномерным")
+    if x is not None:
+        if not isinstance(x, np.ndarray):
+            x = np.asarray(x, dtype=float)
+        if x.shape != y.shape:
+            raise ValueError("x и y должны быть одной длины")
+    if len(y) < 2:
+        if method == "cumulative":
+            return _cumulative(iter(()), out) if len(y) else np.zeros(0)
+        return 0.0
+    return _integrate_windows(_array_windows(y, x, dx, chunk_size), method, out)
+
+
+def integrate_csv(
+    path: str,
+    *,
+    dx: float = 1.0,
+    method: str = "trapezoid",
+    chunk_size: int = DEFAULT_CHUNK,
+    out: Optional[Any] = None,
+    delimiter: str = ",",
+) -> Union[float, Any]:
+    """integrate_samples для CSV: столбец y или столбцы x, y; читается блоками."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size должно быть положительным")
+    windows = _csv_windows(path, dx, chunk_size, delimiter)
+    return _integrate_windows(windows, method, out)
+
+
+def open_samples(
+    path: str, dtype: str = "float64", *, columns: int = 1
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """(y, x) из двоичного файла как np.memmap без чтения в память.
+
+    columns=1 — в файле только y; columns=2 — пары x, y подряд.
+    """
+    if columns not in (1, 2):
+        raise ValueError("columns должно быть 1 или 2")
+    data = np.memmap(path, dtype=np.dtype(dtype), mode="r")
+    if columns == 1:
+        return data, None
+    if len(data) % 2:
+        raise ValueError("Для columns=2 число значений в файле должно быть чётным")
+    pairs = data.reshape(-1, 2)
+    return pairs[:, 1], pairs[:, 0]
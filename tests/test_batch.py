@@ -0,0 +1,89 @@
+import io
+import unittest
+
+from batch import integrate_many, read_jobs
+from integrators import (
+    DEFAULT_EXPR,
+    compile_expr,
+    integrate_rectangle,
+    integrate_simpson,
+    integrate_trapezoidal,
+)
+
+
+class TestBatch(unittest.TestCase):
+    def test_grouped_matches_single_calls(self):
+        bounds = [(0.0, 1.0), (-1.0, 2.0), (0.5, 0.75)]
+        jobs = [
+            {"expr": DEFAULT_EXPR, "a": a, "b": b, "method": m, "n": 64}
+            for a, b in bounds
+            for m in ("trapezoid", "simpson", "rect")
+        ]
+        compile_expr.cache_clear()
+        results = integrate_many(jobs)
+        self.assertEqual(compile_expr.cache_info().misses, 1)
+        for job, res in zip(jobs, results):
+            if job["method"] == "trapezoid":
+                expected, _ = integrate_trapezoidal(
+                    DEFAULT_EXPR, job["a"], job["b"], 64
+                )
+            elif job["method"] == "simpson":
+                expected, _ = integrate_simpson(DEFAULT_EXPR, job["a"], job["b"], 64)
+            else:
+                expected, _ = integrate_rectangle(DEFAULT_EXPR, job["a"], job["b"], 64)
+            self.assertAlmostEqual(res["value"], expected, places=13)
+
+    def test_errors_and_ids(self):
+        jobs = [
+            {"expr": "x", "a": 0, "b": 1, "method": "simpson", "n": 3},
+            {"expr": "x", "a": 0, "b": 1, "method": "adaptive", "id": "q"},
+            {"expr": "x", "b": 1, "method": "mc"},
+        ]
+        results = integrate_many(jobs)
+        self.assertIn("error", results[0])
+        self.assertEqual(results[1]["id"], "q")
+        self.assertAlmostEqual(results[1]["value"], 0.5)
+        self.assertIn("error", results[2])
+
+    def test_bad_jobs_do_not_abort(self):
+        jobs = [[1, 2], {"expr": "x", "a": 0, "b": 1, "method": "rect", "n": "ten"}]
+        jobs.append({"expr": "x", "a": 0, "b": 2, "method": "trapezoid", "n": 4})
+        results = integrate_many(jobs)
+        self.assertIn("error", results[0])
+        self.assertIn("error", results[1])
+        self.assertAlmostEqual(results[2]["value"], 2.0)
+
+        text = '{"expr": "x", "a": 0, "b": 1, "method": "adaptive"}\n\n{"expr": \n[3]\n'
+        results = integrate_many(read_jobs(io.StringIO(text)))
+        self.assertEqual(len(results), 3)
+        self.assertAlmostEqual(results[0]["value"], 0.5)
+        self.assertEqual(results[1]["line"], 3)
+        self.assertIn("Строка 3", results[1]["error"])
+        self.assertIn("error", results[2])
+
+    def test_infinite_and_singular_jobs(self):
+        jobs = [
+            {"expr": "exp(-x)", "a": 0, "b": "inf", "method": "trapezoid", "n": 200},
+            {"expr": "1/sqrt(x)", "a": 0, "b": 1, "method": "simpson", "n": 200},
+        ]
+        results = integrate_many(jobs)
+        expected = [
+            integrate_trapezoidal("exp(-x)", 0.0, float("inf"), 200)[0],
+            integrate_simpson("1/sqrt(x)", 0.0, 1.0, 200)[0],
+        ]
+        for res, value in zip(results, expected):
+            self.assertEqual(res["value"], value)
+        self.assertAlmostEqual(results[0]["value"], 1.0, places=5)
+        self.assertAlmostEqual(results[1]["value"], 2.0, places=10)
+
+    def test_csv_jobs(self):
+        text = (
+            "expr,a,b,method,n,mode\nx**2,0,1,rect,100,midpoint\nx**2,0,3,rect,100,\n"
+        )
+        results = integrate_many(read_jobs(io.StringIO(text), "csv"))
+        self.assertAlmostEqual(results[0]["value"], 1 / 3, places=4)
+        self.assertAlmostEqual(results[1]["value"], 9.0, delta=0.3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,28 @@
+import unittest
+
+from benchmarks import compare_results, run_suite
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_suite_small(self):
+        report = run_suite((100,), methods=["simpson"], problems=["default"], repeat=1)
+        names = [r["name"] for r in report["results"]]
+        self.assertIn("simpson/default/str/n=100", names)
+        self.assertIn("simpson/default/callable/n=100", names)
+        self.assertIn("simpson[neumaier]/default/str/n=100", names)
+        for r in report["results"]:
+            self.assertLess(r["abs_error"], 1e-6)
+
+    def test_compare_flags_regressions(self):
+        old = {
+            "results": [{"name": "a", "seconds": 1.0}, {"name": "b", "seconds": 1.0}]
+        }
+        new = {
+            "results": [{"name": "a", "seconds": 1.5}, {"name": "b", "seconds": 1.1}]
+        }
+        regressions = compare_results(old, new, threshold=0.2)
+        self.assertEqual([r["name"] for r in regressions], ["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
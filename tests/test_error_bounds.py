@@ -0,0 +1,67 @@
+import math
+import unittest
+
+import instrumentation
+from error_bounds import choose_n, error_bound
+from integrators import integrate_rectangle, integrate_simpson, integrate_trapezoidal
+
+EXACT = math.e - 1.0
+
+
+class TestErrorBounds(unittest.TestCase):
+    def test_auto_n_meets_tolerance(self):
+        for rule, tol in (("trapezoid", 1e-8), ("simpson", 1e-11), ("midpoint", 1e-8)):
+            choice = choose_n("exp(x)", 0.0, 1.0, rule, tol)
+            self.assertLessEqual(choice.bound, tol)
+            # n наименьшее: при меньшем n оценка уже больше tol
+            smaller = choice.n - (2 if rule == "simpson" else 1)
+            self.assertGreater(
+                error_bound(rule, 1.0, choice.derivative_max, smaller), tol
+            )
+
+        val, _ = integrate_trapezoidal("exp(x)", 0.0, 1.0, "auto", tol=1e-8)
+        self.assertLess(abs(val - EXACT), 1e-8)
+        val, _ = integrate_simpson("exp(x)", 0.0, 1.0, "auto", tol=1e-11)
+        self.assertLess(abs(val - EXACT), 1e-11)
+        val, _ = integrate_rectangle("exp(x)", 0.0, 1.0, "auto", mode="left", tol=1e-4)
+        self.assertLess(abs(val - EXACT), 1e-4)
+
+    def test_auto_reuses_prepared_interval(self):
+        # Как в CLI: сначала choose_n, затем интегратор с n="auto" — выбор и
+        # подготовленный отрезок берутся из памяти, без новой компиляции
+        choice = choose_n("exp(x)*x", 0.0, 2.0, "simpson", 1e-10)
+        self.assertIs(choose_n("exp(x)*x", 0, 2, "simpson", 1e-10), choice)
+        (val, _), stats = instrumentation.measure(
+            integrate_simpson, "exp(x)*x", 0.0, 2.0, "auto", tol=1e-10
+        )
+        self.assertEqual(val, integrate_simpson("exp(x)*x", 0.0, 2.0, choice.n)[0])
+        self.assertEqual(stats.evals, choice.n + 1)
+        self.assertEqual(stats.compile_hits + stats.compile_misses, 0)
+
+    def test_finite_difference_fallback(self):
+        choice = choose_n(math.exp, 0.0, 1.0, "simpson", 1e-10)
+        self.assertEqual(choice.source, "finite-difference")
+        self.assertAlmostEqual(choice.derivative_max, math.e, delta=0.1)
+        self.assertEqual(choice.n % 2, 0)
+        # Многочлен третьей степени Симпсон интегрирует точно
+        self.assertEqual(choose_n("x**3", 0.0, 2.0, "simpson", 1e-12).n, 2)
+
+    def test_symbolic_failures_fall_back(self):
+        # e — число Эйлера и для SymPy, а не свободный символ
+        val, _ = integrate_simpson("e**x", 0.0, 1.0, "auto", tol=1e-9)
+        self.assertLess(abs(val - EXACT), 1e-9)
+        # Упрощение производных abs в SymPy не ограничено по времени —
+        # по бюджету переходим к конечным разностям
+        choice = choose_n("abs(x-0.5)", 0.0, 1.0, "trapezoid", 1e-6)
+        self.assertEqual(choice.source, "finite-difference")
+        self.assertTrue(math.isfinite(choice.derivative_max))
+
+    def test_tol_requires_auto(self):
+        with self.assertRaises(ValueError):
+            integrate_trapezoidal("x", 0.0, 1.0, 10, tol=1e-6)
+        with self.assertRaises(ValueError):
+            choose_n("x", 0.0, 1.0, "simpson", 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import math
+import unittest
+
+from expr_optimizer import generate, generate_kernel, optimize
+from integrators import (
+    _ALLOWED_NAMES,
+    DEFAULT_EXPR,
+    _compile_expr,
+    compile_expr,
+)
+
+
+def _plain(expr, x):
+    # Эталон — неоптимизированное дерево, вычисленное eval по белому списку
+    code = compile(_compile_expr(expr), "<expr>", "eval")
+    env = {"__builtins__": {}, **_ALLOWED_NAMES}
+    return float(eval(code, env, {"x": x, "y": 0.0, "z": 0.0}))
+
+
+class TestExprOptimizer(unittest.TestCase):
+    def test_rewrites(self):
+        cases = {
+            DEFAULT_EXPR: "_t0 = exp(x)\n_t0 / (1 + _t0 * _t0)",
+            "2*pi*x": f"{2 * math.pi!r} * x",
+            "(x+1)**2 * sin(x+1)": "_t0 = x + 1\n_t0 * _t0 * sin(_t0)",
+            "e**x + x**0.5 + x**-1": "exp(x) + sqrt(x) + 1.0 / x",
+            "log(0) + x": "log(0) + x",
+        }
+        for expr, source in cases.items():
+            self.assertEqual(
+                optimize(_compile_expr(expr), _ALLOWED_NAMES).source(), source
+            )
+
+    def test_values_match_plain_eval(self):
+        exprs = (
+            DEFAULT_EXPR,
+            "x**2 + 3*x + 1",
+            "sin(50*x)*exp(-x)",
+            "sqrt(x)*x**3 - x**4/(1+x)**2",
+            "-x**2 + cot(x) + abs(-x)",
+        )
+        for expr in exprs:
+            f = compile_expr(expr)
+            for i in range(1, 50):
+                x = i / 7.0
+                self.assertAlmostEqual(f(x), _plain(expr, x), delta=4e-16 * abs(f(x)))
+        # x*x и sqrt — те же значения, что x**2 и x**0.5
+        for x in (0.1, 1.7, 123.456):
+            self.assertEqual(
+                compile_expr("x**2 + x**0.5")(x), _plain("x**2 + x**0.5", x)
+            )
+
+    def test_kernel_matches_pointwise_sum(self):
+        opt = optimize(_compile_expr(DEFAULT_EXPR), _ALLOWED_NAMES)
+        f = generate(opt, _ALLOWED_NAMES)
+        kernel = generate_kernel(opt, _ALLOWED_NAMES)
+        a, h = 0.0, 1.0 / 100
+        terms = [(4.0 if i % 2 else 2.0) * f(a + i * h) for i in range(1, 100)]
+        self.assertEqual(kernel(a, h, 0.0, 1, 100, True), math.fsum(terms))
+        # Выражение без имён окружения — функция без привязок
+        self.assertEqual(
+            generate(optimize(_compile_expr("x*y"), {}), {})(2.0, 3.0), 6.0
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import math
+import tempfile
+import unittest
+from pathlib import Path
+
+try:
+    import numpy as np
+
+    from gauss_quadrature import gauss_nodes, integrate_gauss
+except ImportError:  # pragma: no cover
+    np = None
+
+from integrators import DEFAULT_EXPR
+
+
+@unittest.skipIf(np is None, "нужен NumPy")
+class TestGaussQuadrature(unittest.TestCase):
+    def test_legendre_few_nodes(self):
+        exact = math.atan(math.e) - math.pi / 4
+        # 10 узлов Гаусса точнее, чем Симпсон на 200 отрезках
+        self.assertAlmostEqual(integrate_gauss(DEFAULT_EXPR, 0.0, 1.0, 10), exact, 14)
+
+    def test_composite_panels(self):
+        exact = (1 - math.cos(90.0)) / 30.0
+        val = integrate_gauss("sin(30*x)", 0.0, 3.0, 10, panels=20)
+        self.assertAlmostEqual(val, exact, places=12)
+
+    def test_infinite_rules(self):
+        val = integrate_gauss("x**2*exp(-x)", 0.0, math.inf, 10, kind="laguerre")
+        self.assertAlmostEqual(val, 2.0, places=12)
+        val = integrate_gauss(
+            "x**2", -math.inf, math.inf, 5, kind="hermite", weighted=True
+        )
+        self.assertAlmostEqual(val, math.sqrt(math.pi) / 2, places=12)
+        val = integrate_gauss("1", -1.0, 1.0, 7, kind="chebyshev", weighted=True)
+        self.assertAlmostEqual(val, math.pi, places=12)
+
+    def test_nodes_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            nodes, weights = gauss_nodes("legendre", 37, cache_dir=tmp)
+            self.assertTrue((Path(tmp) / "gauss_legendre_37.npz").exists())
+            self.assertIs(gauss_nodes("legendre", 37, cache_dir=tmp)[0], nodes)
+            self.assertFalse(nodes.flags.writeable)
+            self.assertAlmostEqual(float(np.sum(weights)), 2.0, places=13)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,47 @@
+import io
+import json
+import unittest
+
+import instrumentation
+from integrators import DEFAULT_EXPR, integrate_adaptive, integrate_simpson
+from result_cache import ResultCache
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_disabled_by_default(self):
+        integrate_simpson(DEFAULT_EXPR, 0, 1, 100)
+        self.assertIsNone(instrumentation.ACTIVE)
+
+    def test_counts_evals_and_phases(self):
+        value, stats = instrumentation.measure(
+            integrate_simpson, DEFAULT_EXPR, 0, 1, 100, chunk_size=16
+        )
+        self.assertEqual(stats.evals, 101)
+        self.assertEqual(stats.compile_hits + stats.compile_misses, 1)
+        self.assertIn("evaluate", stats.phases)
+        self.assertIn("total", stats.phases)
+        self.assertIsNone(instrumentation.ACTIVE)
+
+        res, stats = instrumentation.measure(integrate_adaptive, "sqrt(x)", 0, 1)
+        self.assertEqual(stats.evals, res.evals)
+
+    def test_cache_events_and_hooks(self):
+        cache = ResultCache()
+        out = io.StringIO()
+        with instrumentation.collect(
+            instrumentation.json_lines_hook(out, run="t")
+        ) as stats:
+            integrate_simpson(DEFAULT_EXPR, 0, 1, 100, cache=cache)
+            integrate_simpson(DEFAULT_EXPR, 0, 1, 100, cache=cache)
+        self.assertEqual((stats.cache_hits, stats.cache_misses), (1, 1))
+        record = json.loads(out.getvalue())
+        self.assertEqual(record["run"], "t")
+        self.assertEqual(record["evals"], 101)
+
+        text = instrumentation.format_prometheus(stats)
+        self.assertIn("numint_evals_total 101", text)
+        self.assertIn('numint_phase_calls_total{phase="total"} 1', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
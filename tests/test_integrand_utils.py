@@ -0,0 +1,53 @@
+import importlib.util
+import math
+import subprocess
+import sys
+import unittest
+
+from integrators import integrate_simpson, np
+
+if importlib.util.find_spec("sympy") is not None:
+    from integrand_utils import (
+        _sympify,
+        derivative_function,
+        extract_variable,
+        symbolic_integral,
+        to_numeric,
+    )
+
+
+@unittest.skipIf(importlib.util.find_spec("sympy") is None, "нужен SymPy")
+class TestIntegrandUtils(unittest.TestCase):
+    def test_sympy_imported_lazily(self):
+        code = "import sys, integrand_utils; print('sympy' in sys.modules)"
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_memoized_cas(self):
+        self.assertEqual(derivative_function("x**3"), "3*x**2")
+        self.assertEqual(derivative_function("x**3"), "3*x**2")
+        self.assertGreaterEqual(derivative_function.cache_info().hits, 1)
+        roots = extract_variable("y**2 - 4", "y")
+        roots.append("mutated")
+        self.assertEqual(sorted(extract_variable("y**2 - 4", "y")), ["-2", "2"])
+        self.assertIs(_sympify("y**2 - 4"), _sympify("y**2 - 4"))
+
+    def test_to_numeric_in_integrators(self):
+        f = to_numeric(derivative_function("sin(x)**2"))
+        if np is not None:
+            self.assertEqual(f(np.linspace(0.0, 1.0, 5)).shape, (5,))
+        val, _ = integrate_simpson(f, 0.0, 1.0, 100)
+        self.assertAlmostEqual(val, math.sin(1.0) ** 2, places=8)
+
+    def test_symbolic_integral(self):
+        self.assertAlmostEqual(symbolic_integral("x**2", 0, 1), 1 / 3, places=15)
+        value = symbolic_integral("exp(-x*x)", -math.inf, math.inf, timeout=5.0)
+        self.assertAlmostEqual(value, math.sqrt(math.pi), places=15)
+        # Первообразной в элементарных функциях нет
+        self.assertIsNone(symbolic_integral("x**x", 0, 1, timeout=5.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
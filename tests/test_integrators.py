@@ -1,13 +1,29 @@
+import io
 import math
+import random
 import unittest
 
+import instrumentation
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
 from integrators import (
     DEFAULT_EXPR,
+    TRACE_DTYPE,
+    StepTrace,
+    compile_expr,
+    integrate_adaptive,
+    integrate_compare,
     integrate_monte_carlo,
     integrate_rectangle,
+    integrate_romberg,
     integrate_simpson,
     integrate_trapezoidal,
     safe_eval_expr,
+    trapezoid_sequence,
 )
 
 
@@ -21,6 +37,131 @@ class TestIntegrators(unittest.TestCase):
         val = safe_eval_expr("exp(x)/(1+exp(2*x))", x=0.5)
         self.assertAlmostEqual(val, math.exp(0.5) / (1 + math.exp(1.0)))
 
+    def test_compile_cache(self):
+        compile_expr.cache_clear()
+        integrate_simpson("sin(x)**2", 0.0, 1.0, 100)
+        safe_eval_expr("sin(x)**2", x=0.3)
+        info = compile_expr.cache_info()
+        # Выражение разбирается один раз на все узлы и повторные вызовы
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+        with self.assertRaises(ValueError):
+            compile_expr("__import__('os')")
+
+    def test_scalar_callable_fallback(self):
+        # math.* не принимает массивы — должен сработать поточечный путь
+        def f(x):
+            return math.exp(x) / (1 + math.exp(2 * x))
+
+        for integrate, n in ((integrate_trapezoidal, 500), (integrate_simpson, 500)):
+            val_expr, _ = integrate(DEFAULT_EXPR, 0.0, 1.0, n)
+            val_func, _ = integrate(f, 0.0, 1.0, n)
+            self.assertAlmostEqual(val_expr, val_func, places=12)
+
+    def test_verbose_steps(self):
+        val, steps = integrate_rectangle("1", 0.0, 2.0, 4, mode="right", verbose=True)
+        self.assertAlmostEqual(val, 2.0)
+        self.assertEqual([st.i for st in steps], [1, 2, 3, 4])
+        self.assertEqual([st.s for st in steps], [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(steps[-1].x, 2.0)
+
+    def test_chunked_matches_full(self):
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        for integrate in (
+            integrate_trapezoidal,
+            integrate_simpson,
+            integrate_rectangle,
+        ):
+            full, _ = integrate(DEFAULT_EXPR, 0.0, 1.0, 1000)
+            chunked, _ = integrate(DEFAULT_EXPR, 0.0, 1.0, 1000, chunk_size=97)
+            self.assertAlmostEqual(full, chunked, places=13)
+        res = integrate_monte_carlo(
+            DEFAULT_EXPR, 0.0, 1.0, samples=50_000, seed=1, chunk_size=4096
+        )
+        self.assertAlmostEqual(res.value, exact, places=2)
+
+    def test_chunked_steps_are_streamed(self):
+        val, steps = integrate_trapezoidal(
+            "x", 0.0, 1.0, 10, verbose=True, chunk_size=3
+        )
+        self.assertNotIsInstance(steps, list)
+        _, full_steps = integrate_trapezoidal("x", 0.0, 1.0, 10, verbose=True)
+        self.assertEqual([st.i for st in steps], [st.i for st in full_steps])
+        self.assertAlmostEqual(val, 0.5)
+
+    def test_step_trace_columns_and_writers(self):
+        _, trace = integrate_simpson("x", 0.0, 1.0, 8, verbose=True)
+        self.assertIsInstance(trace, StepTrace)
+        self.assertEqual(len(trace), 7)
+        self.assertEqual(trace[0].i, 1)
+        self.assertEqual([st.s for st in trace[-2:]], list(trace.s[-2:]))
+        csv_out = io.StringIO()
+        trace.to_csv(csv_out)
+        lines = csv_out.getvalue().splitlines()
+        self.assertEqual(lines[0], "i,x,term,s")
+        self.assertEqual(len(lines), 8)
+
+        _, streamed = integrate_simpson("x", 0.0, 1.0, 8, verbose=True, chunk_size=3)
+        streamed_out = io.StringIO()
+        streamed.to_csv(streamed_out)
+        self.assertEqual(streamed_out.getvalue(), csv_out.getvalue())
+
+    @unittest.skipIf(np is None, "нужен NumPy")
+    def test_step_trace_binary(self):
+        _, trace = integrate_trapezoidal("x", 0.0, 1.0, 100, verbose=True)
+        buf = io.BytesIO()
+        trace.to_binary(buf)
+        records = np.frombuffer(buf.getvalue(), dtype=TRACE_DTYPE)
+        self.assertTrue(np.array_equal(records["s"], trace.s))
+        self.assertEqual(records["i"][-1], 99)
+        # Потоковая таблица пишет настоящий .npy: заголовок, затем блоки
+        _, streamed = integrate_trapezoidal(
+            "x", 0.0, 1.0, 100, verbose=True, chunk_size=16
+        )
+        buf = io.BytesIO()
+        streamed.to_npy(buf)
+        buf.seek(0)
+        loaded = np.load(buf)
+        self.assertEqual(loaded.dtype, TRACE_DTYPE)
+        self.assertTrue(np.array_equal(loaded["term"], trace.term))
+        # Накопленная сумма продолжается от блока к блоку — с другим округлением
+        self.assertTrue(np.allclose(loaded["s"], trace.s, rtol=1e-14))
+
+    def test_workers_bit_identical(self):
+        for integrate, n in ((integrate_simpson, 3000), (integrate_rectangle, 3001)):
+            serial, _ = integrate(DEFAULT_EXPR, 0.0, 1.0, n, chunk_size=256, workers=1)
+            for workers in (2, 3):
+                val, _ = integrate(
+                    DEFAULT_EXPR, 0.0, 1.0, n, chunk_size=256, workers=workers
+                )
+                self.assertEqual(val, serial)
+        # Без chunk_size блоки те же, что и с исполнителями: workers=None
+        # даёт то же значение, что и любое число процессов
+        n = 300_000
+        serial, _ = integrate_simpson(DEFAULT_EXPR, 0.0, 1.0, n)
+        for workers in (1, 2):
+            val, _ = integrate_simpson(DEFAULT_EXPR, 0.0, 1.0, n, workers=workers)
+            self.assertEqual(val, serial)
+        val, steps = integrate_simpson(DEFAULT_EXPR, 0.0, 1.0, n, verbose=True)
+        self.assertEqual(val, serial)
+        mc = [
+            integrate_monte_carlo(
+                DEFAULT_EXPR,
+                0.0,
+                1.0,
+                samples=20_000,
+                seed=7,
+                chunk_size=3000,
+                workers=w,
+            ).value
+            for w in (None, 1, 2, 3)
+        ]
+        self.assertEqual(len(set(mc)), 1)
+
+    def test_workers_reject_unpicklable(self):
+        with self.assertRaises(TypeError):
+            integrate_trapezoidal(lambda x: x, 0.0, 1.0, 10, workers=2)
+
     def test_trapezoid(self):
         exact = exact_integral_exp_expr(0.0, 1.0)
         val, _ = integrate_trapezoidal(DEFAULT_EXPR, 0.0, 1.0, 2000)
@@ -46,10 +187,171 @@ class TestIntegrators(unittest.TestCase):
         # Правый прямоугольник сходится медленнее (O(1/n)) — проверим 3 знака
         self.assertAlmostEqual(val_right, exact, places=3)
 
+    def test_adaptive(self):
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        for rule in ("gk15", "simpson"):
+            res = integrate_adaptive(DEFAULT_EXPR, 0.0, 1.0, rtol=1e-10, rule=rule)
+            self.assertTrue(res.converged)
+            self.assertAlmostEqual(res.value, exact, places=10)
+        # Особенность производной в нуле: отрезки дробятся у левого конца
+        res = integrate_adaptive("sqrt(x)", 0.0, 1.0, rtol=1e-10)
+        self.assertAlmostEqual(res.value, 2.0 / 3.0, places=10)
+        self.assertLess(res.evals, res.uniform_evals)
+
+    def test_adaptive_budget(self):
+        res = integrate_adaptive("sin(200*x)", 0.0, 10.0, rtol=1e-14, max_evals=100)
+        self.assertFalse(res.converged)
+        self.assertLessEqual(res.evals, 100)
+
+    def test_trapezoid_sequence_reuses_nodes(self):
+        seq = trapezoid_sequence(DEFAULT_EXPR, 0.0, 1.0)
+        for _ in range(6):
+            n, t = next(seq)
+            full, _ = integrate_trapezoidal(DEFAULT_EXPR, 0.0, 1.0, n)
+            self.assertAlmostEqual(t, full, places=14)
+
+    def test_romberg(self):
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        res = integrate_romberg(DEFAULT_EXPR, 0.0, 1.0, rtol=1e-12)
+        self.assertTrue(res.converged)
+        self.assertAlmostEqual(res.value, exact, places=12)
+        # 2^k + 1 узлов на последнем уровне — ни одно значение не посчитано дважды
+        self.assertEqual(res.evals, res.history[-1][0] + 1)
+
+    def test_endpoints_evaluated_once(self):
+        # Проверка концов на особенность не должна вычислять f(a), f(b) ещё раз
+        def counting():
+            def f(x):
+                # Считаем после вычисления: векторный вызов с массивом падает
+                y = math.exp(x) / (1 + math.exp(2 * x))
+                f.calls += 1
+                return y
+
+            f.calls = 0
+            return f
+
+        for run, expected in (
+            (lambda f: integrate_trapezoidal(f, 0.0, 1.0, 10), 11),
+            (lambda f: integrate_simpson(f, 0.0, 1.0, 10), 11),
+            (lambda f: integrate_compare(f, 0.0, 1.0, 10).evals, 21),
+            (lambda f: integrate_romberg(f, 0.0, 1.0, rtol=1e-12).evals, None),
+            (lambda f: integrate_adaptive(f, 0.0, 1.0, rule="simpson").evals, None),
+        ):
+            f = counting()
+            value, stats = instrumentation.measure(run, f)
+            if expected is None:
+                expected = value
+            self.assertEqual(f.calls, expected)
+            self.assertEqual(stats.evals, expected)
+
+    def test_compare(self):
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        res = integrate_compare(DEFAULT_EXPR, 0.0, 1.0, 100)
+        self.assertEqual(res.evals, 201)
+        separate = {
+            "trapezoid": integrate_trapezoidal(DEFAULT_EXPR, 0.0, 1.0, 100)[0],
+            "simpson": integrate_simpson(DEFAULT_EXPR, 0.0, 1.0, 100)[0],
+        }
+        for mode in ("midpoint", "left", "right"):
+            separate[mode] = integrate_rectangle(
+                DEFAULT_EXPR, 0.0, 1.0, 100, mode=mode
+            )[0]
+        self.assertEqual(
+            list(res.values), ["trapezoid", "simpson", "midpoint", "left", "right"]
+        )
+        for rule, value in res.values.items():
+            self.assertAlmostEqual(value, separate[rule], places=14)
+            # Оценка Ричардсона близка к настоящей ошибке
+            self.assertAlmostEqual(
+                res.errors[rule], abs(exact - value), delta=0.05 * abs(exact - value)
+            )
+        self.assertLess(abs(res.extrapolated - exact), 1e-13)
+        # При нечётном n Симпсона нет, остальные правила — те же
+        odd = integrate_compare(DEFAULT_EXPR, 0.0, 1.0, 7, chunk_size=3)
+        self.assertNotIn("simpson", odd.values)
+        self.assertAlmostEqual(
+            odd.values["left"],
+            integrate_rectangle(DEFAULT_EXPR, 0.0, 1.0, 7, mode="left")[0],
+            places=14,
+        )
+
+    def test_accumulators(self):
+        # 10^6 одинаковых слагаемых 0.1 одним блоком: подряд ошибка накапливается
+        errors = {}
+        for acc in ("naive", "neumaier", "pairwise"):
+            val, _ = integrate_rectangle(
+                "0.1",
+                0.0,
+                1.0,
+                10**6,
+                mode="midpoint",
+                accumulator=acc,
+                chunk_size=10**6,
+            )
+            errors[acc] = abs(val - 0.1)
+        self.assertGreater(errors["naive"], 1e-13)
+        self.assertLess(errors["neumaier"], 1e-16)
+        self.assertLess(errors["pairwise"], 1e-15)
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        val, _ = integrate_simpson(
+            DEFAULT_EXPR, 0.0, 1.0, 1000, accumulator="neumaier", chunk_size=300
+        )
+        self.assertAlmostEqual(val, exact, places=13)
+        res = integrate_monte_carlo(
+            DEFAULT_EXPR, 0.0, 1.0, samples=20_000, seed=1, accumulator="naive"
+        )
+        self.assertLess(abs(res.value - exact), 4 * res.stderr)
+        with self.assertRaises(ValueError):
+            integrate_trapezoidal("x", 0.0, 1.0, 10, accumulator="kahan")
+        with self.assertRaises(ValueError):
+            integrate_trapezoidal("x", 0.0, 1.0, 10, precision="float16")
+
+    @unittest.skipIf(np is None, "нужен NumPy")
+    def test_float32_precision(self):
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        for fn in (integrate_trapezoidal, integrate_simpson):
+            val, steps = fn(DEFAULT_EXPR, 0.0, 1.0, 10**5, precision="float32")
+            # Ошибка — от округления f до float32, а не от сложения 10^5 слагаемых
+            self.assertLess(abs(val - exact), 1e-8)
+        _, steps = integrate_trapezoidal(
+            DEFAULT_EXPR, 0.0, 1.0, 10, verbose=True, precision="float32"
+        )
+        self.assertEqual(steps.term.dtype, np.float32)
+
     def test_monte_carlo(self):
         exact = exact_integral_exp_expr(0.0, 1.0)
-        val = integrate_monte_carlo(DEFAULT_EXPR, 0.0, 1.0, samples=100_000, seed=42)
-        self.assertAlmostEqual(val, exact, places=3)
+        res = integrate_monte_carlo(DEFAULT_EXPR, 0.0, 1.0, samples=100_000, seed=42)
+        self.assertAlmostEqual(res.value, exact, places=3)
+        self.assertLess(res.stderr, 1e-3)
+        self.assertLess(res.ci[0], exact)
+        self.assertGreater(res.ci[1], exact)
+
+    @unittest.skipIf(np is None, "нужен NumPy")
+    def test_monte_carlo_samplers(self):
+        exact = exact_integral_exp_expr(0.0, 1.0)
+        plain = integrate_monte_carlo(DEFAULT_EXPR, 0.0, 1.0, samples=2**14, seed=3)
+        for sampler in ("sobol", "halton", "antithetic", "stratified", "control"):
+            res = integrate_monte_carlo(
+                DEFAULT_EXPR, 0.0, 1.0, samples=2**14, seed=3, sampler=sampler
+            )
+            self.assertAlmostEqual(res.value, exact, places=3)
+            # Та же выборка — ошибка меньше, чем у обычного Монте‑Карло
+            self.assertLess(res.stderr, plain.stderr)
+        sobol = integrate_monte_carlo(
+            DEFAULT_EXPR, 0.0, 1.0, samples=2**14, seed=3, sampler="sobol"
+        )
+        self.assertAlmostEqual(sobol.value, exact, places=7)
+        self.assertEqual(sobol.samples, 2**14)
+        # Остаток samples % replicates не отбрасывается молча
+        with self.assertRaises(ValueError):
+            integrate_monte_carlo(DEFAULT_EXPR, 0.0, 1.0, samples=1000, sampler="sobol")
+
+    def test_monte_carlo_leaves_global_random(self):
+        random.seed(123)
+        expected = random.random()
+        random.seed(123)
+        integrate_monte_carlo(DEFAULT_EXPR, 0.0, 1.0, samples=1000, seed=5)
+        self.assertEqual(random.random(), expected)
 
 
 if __name__ == "__main__":
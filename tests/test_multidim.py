@@ -0,0 +1,49 @@
+import math
+import unittest
+
+try:
+    import numpy as np
+
+    from multidim import _smolyak_grid, integrate_nd
+except ImportError:  # pragma: no cover
+    np = None
+
+EXPR_3D = "sin(x)*exp(y)*z"
+EXACT_3D = (1 - math.cos(1.0)) * (math.e - 1) * 0.5
+
+
+@unittest.skipIf(np is None, "нужен NumPy")
+class TestIntegrateND(unittest.TestCase):
+    def test_tensor_rules(self):
+        box = [(0.0, 1.0)] * 3
+        res = integrate_nd(EXPR_3D, box, method="simpson", n=20, chunk_size=1000)
+        self.assertAlmostEqual(res.value, EXACT_3D, places=6)
+        self.assertEqual(res.evals, 21**3)
+        res = integrate_nd(EXPR_3D, box, method="gauss", n=8)
+        self.assertAlmostEqual(res.value, EXACT_3D, places=12)
+
+    def test_sparse_grid(self):
+        res = integrate_nd(EXPR_3D, [(0.0, 1.0)] * 3, method="sparse", level=5)
+        self.assertAlmostEqual(res.value, EXACT_3D, places=10)
+        # Разреженная сетка намного меньше тензорной того же уровня (17^3)
+        self.assertLess(res.evals, 17**3 // 10)
+        # Общие узлы уровней (в том числе центр 0) объединяются в один
+        for (dim, level), size in {(2, 3): 13, (3, 4): 69}.items():
+            nodes, _ = _smolyak_grid(dim, level)
+            self.assertEqual(len(nodes), size)
+            self.assertEqual(len(np.unique(nodes.round(12), axis=0)), size)
+
+    def test_sampling(self):
+        for method in ("mc", "sobol", "halton"):
+            res = integrate_nd(
+                "x*y", [(0.0, 1.0), (0.0, 2.0)], method=method, samples=2**14, seed=2
+            )
+            self.assertAlmostEqual(res.value, 1.0, delta=5 * res.error + 1e-12)
+
+    def test_scalar_callable(self):
+        res = integrate_nd(lambda x, y: math.exp(x) * y, [(0.0, 1.0), (0.0, 2.0)])
+        self.assertAlmostEqual(res.value, 2 * (math.e - 1), places=6)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
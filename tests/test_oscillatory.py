@@ -0,0 +1,44 @@
+import math
+import unittest
+
+from oscillatory import find_oscillation, integrate_oscillatory
+
+
+def exact_exp_sin(w):
+    # ∫ exp(-x)·sin(w·x) dx от 0 до 1
+    return (w - math.exp(-1.0) * (w * math.cos(w) + math.sin(w))) / (1.0 + w * w)
+
+
+class TestOscillatory(unittest.TestCase):
+    def test_find_oscillation(self):
+        osc = find_oscillation("exp(-x)*cos(2*pi*50*x + 1)/(1 + x)")
+        self.assertEqual(osc.kind, "cos")
+        self.assertAlmostEqual(osc.omega, 100 * math.pi, places=12)
+        self.assertEqual(osc.phase, 1.0)
+        self.assertEqual(osc.amplitude, "exp(-x) / (1 + x)")
+        self.assertEqual(find_oscillation("sin(x)*sin(100*x)").amplitude, "sin(x)")
+        self.assertIsNone(find_oscillation("sin(x*x)"))
+        self.assertIsNone(find_oscillation("x**2 + sin(3*x)"))
+
+    def test_cost_does_not_grow_with_omega(self):
+        for w in (10.0, 1e3, 1e6):
+            res = integrate_oscillatory(f"sin({w}*x)*exp(-x)", 0.0, 1.0)
+            self.assertEqual(res.method, "filon")
+            self.assertTrue(res.converged)
+            self.assertLessEqual(res.evals, 1025)
+            self.assertAlmostEqual(res.value, exact_exp_sin(w), delta=1e-12)
+        # Частота задана явно, выражение — только амплитуда
+        res = integrate_oscillatory("exp(-x)", 0.0, 1.0, omega=1e3)
+        self.assertAlmostEqual(res.value, exact_exp_sin(1e3), delta=1e-12)
+
+    def test_fallback(self):
+        res = integrate_oscillatory("x**2", 0.0, 1.0)
+        self.assertEqual(res.method, "adaptive")
+        self.assertIsNone(res.omega)
+        self.assertAlmostEqual(res.value, 1.0 / 3.0, places=14)
+        with self.assertRaises(ValueError):
+            integrate_oscillatory("exp(-x)", 0.0, math.inf, omega=5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
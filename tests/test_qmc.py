@@ -0,0 +1,36 @@
+import unittest
+
+try:
+    import numpy as np
+
+    from qmc import halton_points, sobol_points, sobol_scramble
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "нужен NumPy")
+class TestQMC(unittest.TestCase):
+    def test_sobol_reference_points(self):
+        pts = sobol_points(0, 4, 2)
+        expected = [[0.0, 0.0], [0.5, 0.5], [0.75, 0.25], [0.25, 0.75]]
+        self.assertEqual(pts.tolist(), expected)
+        # Блоки стыкуются: диапазон индексов равен срезу общей последовательности
+        self.assertTrue(
+            np.array_equal(sobol_points(5, 3, 3), sobol_points(0, 8, 3)[5:])
+        )
+
+    def test_scrambled_sobol_is_net(self):
+        rng = np.random.default_rng(1)
+        pts = sobol_points(0, 256, 2, sobol_scramble(2, rng))
+        # Каждый из 256 отрезков длины 1/256 по каждой оси содержит одну точку
+        for d in range(2):
+            cells = np.floor(pts[:, d] * 256).astype(int)
+            self.assertEqual(sorted(cells.tolist()), list(range(256)))
+
+    def test_halton(self):
+        pts = halton_points(0, 3, 2)
+        np.testing.assert_allclose(pts, [[0.5, 1 / 3], [0.25, 2 / 3], [0.75, 1 / 9]])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
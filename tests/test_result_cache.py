@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+from integrators import (
+    DEFAULT_EXPR,
+    canonical_expr,
+    integrate_adaptive,
+    integrate_monte_carlo,
+    integrate_simpson,
+)
+from result_cache import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+    def test_canonical_expr(self):
+        self.assertEqual(
+            canonical_expr("exp( x )/(1+exp(2*x))"),
+            canonical_expr("(exp(x))/(1 + exp(2*x))"),
+        )
+        self.assertNotEqual(canonical_expr("x+1"), canonical_expr("x+2"))
+
+    def test_deterministic_hits(self):
+        cache = ResultCache()
+        first, _ = integrate_simpson(DEFAULT_EXPR, 0, 1, 100, cache=cache)
+        # Другая запись выражения и пределов — тот же ключ
+        second, _ = integrate_simpson(
+            "exp(x) / (1 + exp(2*x))", 0.0, 1.0, n=100, cache=cache
+        )
+        self.assertEqual(first, second)
+        integrate_simpson(DEFAULT_EXPR, 0, 1, 200, cache=cache)
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "entries": 2})
+
+        res = integrate_adaptive("sqrt(x)", 0, 1, cache=cache)
+        self.assertEqual(integrate_adaptive("sqrt(x)", 0, 1, cache=cache), res)
+
+    def test_monte_carlo_only_seeded(self):
+        cache = ResultCache()
+        integrate_monte_carlo(DEFAULT_EXPR, 0, 1, samples=1000, cache=cache)
+        self.assertEqual(len(cache), 0)
+        res = integrate_monte_carlo(
+            DEFAULT_EXPR, 0, 1, samples=1000, seed=1, cache=cache
+        )
+        self.assertEqual(
+            integrate_monte_carlo(
+                DEFAULT_EXPR, 0, 1, samples=1000, seed=1, cache=cache
+            ),
+            res,
+        )
+        self.assertIsInstance(res.ci, tuple)
+
+    def test_lru_eviction_and_persistence(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            cache = ResultCache(path, max_entries=2)
+            for key in ("a", "b"):
+                cache.put(key, 1.0)
+            cache.get("a")  # "b" становится самым давним
+            cache.put("c", 2.0)
+            self.assertIsNone(cache.get("b"))
+            cache.close()
+            reopened = ResultCache(path, max_entries=2)
+            self.assertEqual(reopened.get("c"), 2.0)
+            self.assertEqual(len(reopened), 2)
+            # Замена значения не меняет счётчик записей, очистка обнуляет его
+            reopened.put("c", 3.0)
+            self.assertEqual((len(reopened), reopened.get("c")), (2, 3.0))
+            reopened.clear()
+            self.assertEqual(len(reopened), 0)
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
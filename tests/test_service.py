@@ -0,0 +1,80 @@
+import asyncio
+import math
+import unittest
+
+from integrators import integrate_simpson
+from service import IntegrationService, post_job, request
+
+
+class TestService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = IntegrationService(
+            workers=2, max_queue=2, block=64, progress_interval=0.0
+        )
+        self.host, self.port = await self.service.start()
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def test_result_and_stream(self):
+        job = {"id": 7, "expr": "exp(x)", "a": 0, "b": 1, "method": "simpson"}
+        status, body = await post_job(self.host, self.port, {**job, "n": 1000})
+        self.assertEqual(status, 200)
+        self.assertEqual(body["id"], 7)
+        # Блоки складываются так же, как в потоковом режиме интегратора
+        expected, _ = integrate_simpson("exp(x)", 0, 1, 1000, chunk_size=64)
+        self.assertEqual(body["value"], expected)
+
+        status, events = await post_job(
+            self.host, self.port, {**job, "n": 2000}, stream=True
+        )
+        kinds = [event["event"] for event in events]
+        self.assertEqual(kinds[0], "queued")
+        self.assertIn("started", kinds)
+        self.assertEqual(kinds[-1], "result")
+        progress = [event for event in events if event["event"] == "progress"]
+        self.assertEqual(progress[-1]["done"], progress[-1]["total"])
+        self.assertAlmostEqual(events[-1]["value"], math.e - 1, places=12)
+
+        status, body = await post_job(
+            self.host, self.port, {"expr": "x", "a": 0, "b": 1, "method": "adaptive"}
+        )
+        self.assertAlmostEqual(body["value"], 0.5, places=12)
+
+    async def test_coalescing_and_backpressure(self):
+        job = {"expr": "x*x", "a": 0, "b": 1, "method": "trapezoid", "n": 4000}
+        first, coalesced = self.service.submit(job)
+        self.assertFalse(coalesced)
+        # Та же каноническая форма выражения — то же вычисление
+        same, coalesced = self.service.submit({**job, "expr": "x * (x)", "id": 2})
+        self.assertIs(same, first)
+        self.assertTrue(coalesced)
+
+        self.service.submit({**job, "n": 10})
+        with self.assertRaises(asyncio.QueueFull):
+            self.service.submit({**job, "n": 20})
+        self.assertEqual(self.service.stats()["rejected"], 1)
+
+        result = await asyncio.shield(first.future)
+        self.assertAlmostEqual(result["value"], 1 / 3, places=7)
+        status, stats = await request(self.host, self.port, "GET", "/stats")
+        self.assertEqual((stats["submitted"], stats["coalesced"]), (2, 1))
+
+    async def test_bad_requests(self):
+        status, body = await post_job(
+            self.host, self.port, {"expr": "x+", "a": 0, "b": 1, "method": "mc"}
+        )
+        self.assertEqual(status, 400)
+        self.assertIn("error", body)
+        status, _ = await request(self.host, self.port, "GET", "/nowhere")
+        self.assertEqual(status, 404)
+        status, body = await post_job(
+            self.host,
+            self.port,
+            {"expr": "log(x-2)", "a": 0, "b": 1, "method": "trapezoid", "n": 10},
+        )
+        self.assertEqual(status, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
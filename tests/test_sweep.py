@@ -0,0 +1,55 @@
+import io
+import unittest
+
+try:
+    import numpy as np
+
+    from sweep import integrate_sweep, read_params, write_table
+except ImportError:  # pragma: no cover
+    np = None
+
+from integrators import compile_expr, integrate_rectangle, integrate_simpson
+
+EXPR = "exp(-y*x)*sin(z*x)"
+
+
+@unittest.skipIf(np is None, "нужен NumPy")
+class TestSweep(unittest.TestCase):
+    def test_matches_single_calls(self):
+        y = np.linspace(0.1, 3.0, 7)
+        z = np.array([1.0, 2.5, 4.0])
+        f = compile_expr(EXPR)
+        # Таблица y × z блоками меньше одной строки узлов
+        table = integrate_sweep(
+            EXPR, 0.0, 2.0, {"y": y[:, None], "z": z}, "simpson", 40, chunk_size=16
+        )
+        self.assertEqual(table.shape, (7, 3))
+        for i, yv in enumerate(y):
+            for j, zv in enumerate(z):
+                expected, _ = integrate_simpson(lambda x: f(x, yv, zv), 0.0, 2.0, 40)
+                self.assertAlmostEqual(table[i, j], expected, places=13)
+        for mode in ("left", "right", "midpoint"):
+            values = integrate_sweep("x*x + y", 0.0, 1.0, {"y": [0.0, 1.0]}, mode, 9)
+            expected, _ = integrate_rectangle("x*x", 0.0, 1.0, 9, mode=mode)
+            np.testing.assert_allclose(values, [expected, expected + 1.0], rtol=1e-14)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            integrate_sweep("x*w", 0.0, 1.0, {"w": [1.0]})
+        with self.assertRaises(ValueError):
+            integrate_sweep(EXPR, 0.0, 1.0, {"y": [1.0]}, "simpson", 5)
+        with self.assertRaises(ValueError):
+            integrate_sweep(EXPR, 0.0, float("inf"), {"y": [1.0]})
+
+    def test_csv_roundtrip(self):
+        params = read_params(io.StringIO("y, z\n1,2\n0.5,3\n"))
+        values = integrate_sweep("y*z", 0.0, 2.0, params, "trapezoid", 4)
+        out = io.StringIO()
+        write_table(out, params, values)
+        self.assertEqual(out.getvalue(), "y,z,value\n1.0,2.0,4.0\n0.5,3.0,3.0\n")
+        with self.assertRaises(ValueError):
+            read_params(io.StringIO("w\n1\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+
+    from tabulated import integrate_csv, integrate_samples, open_samples
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "нужен NumPy")
+class TestTabulated(unittest.TestCase):
+    def test_nonuniform_chunked(self):
+        rng = np.random.default_rng(1)
+        for n in (3, 4, 11, 100):
+            x = np.sort(rng.uniform(0.0, 2.0, n))
+            y = x**2
+            exact = (x[-1] ** 3 - x[0] ** 3) / 3.0
+            trap = integrate_samples(y, x)
+            for chunk in (1, 2, 3, 7):
+                # Симпсон точен для параболы при любой чётности и разбиении
+                val = integrate_samples(y, x, method="simpson", chunk_size=chunk)
+                self.assertAlmostEqual(val, exact, places=12)
+                self.assertAlmostEqual(
+                    integrate_samples(y, x, chunk_size=chunk), trap, places=12
+                )
+
+    def test_memmap_and_cumulative_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            x = np.linspace(0.0, 1.0, 1001)
+            path = os.path.join(tmp, "xy.bin")
+            np.column_stack([x, np.exp(x)]).tofile(path)
+            y, xs = open_samples(path, columns=2)
+            self.assertIsInstance(y, np.memmap)
+            val = integrate_samples(y, xs, method="simpson", chunk_size=100)
+            self.assertAlmostEqual(val, np.e - 1.0, places=12)
+
+            out = np.memmap(
+                os.path.join(tmp, "cum.bin"), dtype=float, mode="w+", shape=(1001,)
+            )
+            integrate_samples(y, xs, method="cumulative", chunk_size=64, out=out)
+            self.assertEqual(out[0], 0.0)
+            self.assertAlmostEqual(out[-1], integrate_samples(y, xs), places=12)
+            self.assertTrue(np.all(np.diff(out) > 0))
+            del out
+
+    def test_csv_matches_arrays(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            y = np.sin(np.linspace(0.0, 3.0, 501))
+            path = os.path.join(tmp, "y.csv")
+            np.savetxt(path, y)
+            for method in ("trapezoid", "simpson"):
+                self.assertAlmostEqual(
+                    integrate_csv(path, dx=0.006, method=method, chunk_size=50),
+                    integrate_samples(y, dx=0.006, method=method),
+                    places=13,
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
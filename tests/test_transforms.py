@@ -0,0 +1,56 @@
+import math
+import unittest
+
+from integrators import (
+    integrate_adaptive,
+    integrate_rectangle,
+    integrate_romberg,
+    integrate_simpson,
+    integrate_trapezoidal,
+)
+from transforms import integrate_tanh_sinh, transform_integrand
+
+
+class TestTransforms(unittest.TestCase):
+    def test_tanh_sinh_singular_and_infinite(self):
+        cases = (
+            ("1/sqrt(x)", 0.0, 1.0, 2.0),
+            ("log(x)", 0.0, 1.0, -1.0),
+            ("sqrt(x)*exp(-x)", 0.0, math.inf, math.sqrt(math.pi) / 2),
+            ("1/(1+x**2)", -math.inf, math.inf, math.pi),
+            ("exp(x)", 1.0, 0.0, 1.0 - math.e),
+        )
+        for expr, a, b, exact in cases:
+            res = integrate_tanh_sinh(expr, a, b)
+            self.assertTrue(res.converged, expr)
+            self.assertAlmostEqual(res.value, exact, places=13, msg=expr)
+            self.assertLess(res.evals, 500)
+
+    def test_singular_endpoint_detected(self):
+        # Раньше f(0) падал в math; теперь включается замена tanh-sinh
+        for integrate in (integrate_trapezoidal, integrate_simpson):
+            val, _ = integrate("1/sqrt(x)", 0.0, 1.0, 100)
+            self.assertAlmostEqual(val, 2.0, places=13)
+        val, _ = integrate_rectangle("1/sqrt(x)", 0.0, 1.0, 100, mode="left")
+        self.assertAlmostEqual(val, 2.0, places=13)
+        self.assertAlmostEqual(integrate_romberg("log(x)", 0.0, 1.0).value, -1.0, 12)
+
+    def test_infinite_bounds(self):
+        # Для двойной экспоненты лучшее правило — трапеции (сходятся быстрее h^k)
+        val, _ = integrate_trapezoidal(
+            "exp(-x)", 0.0, math.inf, 200, transform="tanh-sinh"
+        )
+        self.assertAlmostEqual(val, 1.0, places=13)
+        # Без transform бесконечный предел включает замену x = t/(1 - t)
+        val, _ = integrate_simpson("exp(-x)", 0.0, math.inf, 1000)
+        self.assertAlmostEqual(val, 1.0, places=13)
+        res = integrate_adaptive("exp(-x*x)", -math.inf, math.inf)
+        self.assertAlmostEqual(res.value, math.sqrt(math.pi), places=10)
+
+    def test_rational_needs_infinite_bound(self):
+        with self.assertRaises(ValueError):
+            transform_integrand("x", 0.0, 1.0, "rational")
+
+
+if __name__ == "__main__":
+    unittest.main()